@@ -0,0 +1,70 @@
+"""
+Async versions of the auth dependency and routes, mounted instead of the
+sync ones when CALCULATOR_ASYNC_DB is on.
+"""
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models, schemas, security
+from app.auth import create_access_token, credentials_exception, decode_token_email, oauth2_scheme
+from app.database_async import get_async_db
+
+router = APIRouter()
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    """Decode JWT token and return the current user"""
+    email = decode_token_email(token)
+    user = await db.scalar(select(models.User).where(models.User.email == email))
+    if user is None:
+        raise credentials_exception()
+    return user
+
+
+@router.get("/me", response_model=schemas.UserRead)
+async def read_current_user(current_user: models.User = Depends(get_current_user)):
+    """
+    Return the currently logged-in user's information.
+    """
+    return current_user
+
+
+@router.post("/register", response_model=schemas.Token)
+async def register_user(user_in: schemas.UserCreate, db: AsyncSession = Depends(get_async_db)):
+    if not user_in.username:
+        user_in.username = user_in.email
+
+    existing_user = await db.scalar(select(models.User).where(or_(
+        models.User.username == user_in.username,
+        models.User.email == user_in.email
+    )))
+    if existing_user:
+        raise HTTPException(status_code=400, detail="Username or email already exists")
+
+    user = models.User(
+        username=user_in.username,
+        email=user_in.email,
+        password_hash=security.hash_password(user_in.password),
+        created_at=datetime.now()
+    )
+    db.add(user)
+    try:
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    token = create_access_token({"sub": user.email})
+    return {"access_token": token, "token_type": "bearer"}
+
+
+@router.post("/login", response_model=schemas.Token)
+async def login(login_data: schemas.LoginRequest, db: AsyncSession = Depends(get_async_db)):
+    user = await db.scalar(select(models.User).where(models.User.username == login_data.username))
+    if not user or not security.verify_password(login_data.password, user.password_hash):
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+
+    token = create_access_token({"sub": user.email})
+    return {"access_token": token, "token_type": "bearer"}
@@ -4,7 +4,7 @@ from dataclasses import dataclass, field
 from datetime import datetime
 from decimal import Decimal, InvalidOperation
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, Iterable, List
 
 from app.exceptions import OperationError
 from app.operations import OperationFactory
@@ -35,9 +35,9 @@ class Calculation:
         This delegates to the Operation strategy pattern instead of duplicating logic.
         """
         try:
-            # Use the OperationFactory to get the appropriate operation
-            operation_instance = OperationFactory.create_operation(self.operation)
-            return operation_instance.execute(self.operand1, self.operand2)
+            # Use the OperationFactory dispatch table to get the shared operation
+            execute = OperationFactory.get_executor(self.operation)
+            return execute(self.operand1, self.operand2)
         except ValueError as e:
             # OperationFactory raises ValueError for unknown operations
             raise OperationError(str(e))
@@ -72,21 +72,54 @@ class Calculation:
                 timestamp=datetime.fromisoformat(data['timestamp'])
             )
 
-            # Compute what the result should be
-            computed_result = calc._compute_result()
-            
             # Verify the saved result matches the computed result
-            if saved_result != computed_result:
-                logging.warning(
-                    f"Loaded calculation result {saved_result} "
-                    f"differs from computed result {computed_result}"
-                )
+            calc.verify()
 
             return calc
 
         except (KeyError, InvalidOperation, ValueError) as e:
             raise OperationError(f"Invalid calculation data: {str(e)}")
 
+    @staticmethod
+    def from_columns(
+            operations: Iterable[str],
+            operands1: Iterable[str],
+            operands2: Iterable[str],
+            results: Iterable[str],
+            timestamps: Iterable[str]
+    ) -> List['Calculation']:
+        """
+        Create calculations from parallel columns of serialized values.
+        Saved results are trusted as-is; use verify() to check them.
+        """
+        try:
+            return [
+                Calculation(
+                    operation=operation,
+                    operand1=Decimal(operand1),
+                    operand2=Decimal(operand2),
+                    result=Decimal(result),
+                    timestamp=datetime.fromisoformat(timestamp)
+                )
+                for operation, operand1, operand2, result, timestamp
+                in zip(operations, operands1, operands2, results, timestamps)
+            ]
+        except (InvalidOperation, ValueError, TypeError) as e:
+            raise OperationError(f"Invalid calculation data: {str(e)}")
+
+    def verify(self) -> bool:
+        """
+        Recompute the result and log a warning if it differs from the stored one.
+        """
+        computed_result = self._compute_result()
+        if self.result != computed_result:
+            logging.warning(
+                f"Loaded calculation result {self.result} "
+                f"differs from computed result {computed_result}"
+            )
+            return False
+        return True
+
     def __str__(self) -> str:
         """
         Return string representation of calculation.
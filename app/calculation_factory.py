@@ -2,7 +2,9 @@
 
 from abc import ABC, abstractmethod
 from decimal import Decimal
-from typing import Dict, Type
+from typing import Callable, Dict, Optional, Type
+
+from app.result_cache import ResultCache
 
 class CalculationOperation(ABC):
     """Abstract base class for calculation operations"""
@@ -52,14 +54,33 @@ class CalculationFactory:
     "MULTIPLY": MultiplyOperation,
     "DIVIDE": DivideOperation,
     }
+
+    # Shared stateless instances and their execute functions, keyed by every case variant
+    _instances: Dict[str, CalculationOperation] = {}
+    _dispatch: Dict[str, Callable[[Decimal, Decimal], Decimal]] = {}
+
+    @classmethod
+    def _register_all(cls) -> None:
+        for name, op_class in cls._operations.items():
+            instance = op_class()
+            for alias in (name, name.lower(), name.capitalize()):
+                cls._instances[alias] = instance
+                cls._dispatch[alias] = instance.execute
+
+    @classmethod
+    def _unsupported(cls, operation_type: str) -> ValueError:
+        return ValueError(
+            f"Unsupported operation: {operation_type}. "
+            f"Supported operations: {', '.join(cls._operations.keys())}"
+        )
     
     @classmethod
     def create_operation(cls, operation_type: str) -> CalculationOperation:
         """
-        Create and return the appropriate calculation operation.
+        Return the shared instance of the appropriate calculation operation.
         
         Args:
-            operation_type: The type of operation to create
+            operation_type: The type of operation to create (case-insensitive)
             
         Returns:
             An instance of the appropriate CalculationOperation subclass
@@ -67,14 +88,27 @@ class CalculationFactory:
         Raises:
             ValueError: If operation_type is not supported
         """
-        
-        if operation_type not in cls._operations:
-            raise ValueError(
-                f"Unsupported operation: {operation_type}. "
-                f"Supported operations: {', '.join(cls._operations.keys())}"
-            )
-        
-        return cls._operations[operation_type]()
+        operation = cls._instances.get(operation_type)
+        if operation is None:
+            operation = cls._instances.get(str(operation_type).upper())
+            if operation is None:
+                raise cls._unsupported(operation_type)
+        return operation
+
+    @classmethod
+    def get_executor(cls, operation_type: str) -> Callable[[Decimal, Decimal], Decimal]:
+        """
+        Return the execute function for an operation type.
+
+        Raises:
+            ValueError: If operation_type is not supported
+        """
+        execute = cls._dispatch.get(operation_type)
+        if execute is None:
+            execute = cls._dispatch.get(str(operation_type).upper())
+            if execute is None:
+                raise cls._unsupported(operation_type)
+        return execute
     
     @classmethod
     def get_supported_operations(cls) -> list:
@@ -82,8 +116,13 @@ class CalculationFactory:
         return list(cls._operations.keys())
 
 
+CalculationFactory._register_all()
+
+
 # Helper function to perform calculation
-def perform_calculation(a: Decimal, b: Decimal, operation_type: str) -> Decimal:
+def perform_calculation(
+    a: Decimal, b: Decimal, operation_type: str, cache: Optional[ResultCache] = None
+) -> Decimal:
     """
     Perform a calculation using the factory pattern.
     
@@ -91,9 +130,12 @@ def perform_calculation(a: Decimal, b: Decimal, operation_type: str) -> Decimal:
         a: First operand
         b: Second operand
         operation_type: Type of operation to perform
+        cache: Optional result cache to consult first
         
     Returns:
         Result of the calculation
     """
-    operation = CalculationFactory.create_operation(operation_type)
-    return operation.execute(a, b)
\ No newline at end of file
+    execute = CalculationFactory.get_executor(operation_type)
+    if cache is None:
+        return execute(a, b)
+    return cache.execute(str(operation_type).upper(), execute, a, b)
\ No newline at end of file
@@ -1,30 +1,85 @@
-import pandas as pd
-from decimal import Decimal
+import csv
+import itertools
+import numpy as np
+import random
+import sqlite3
+import threading
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from decimal import Decimal, localcontext
 from pathlib import Path
-from typing import List, Optional, Union
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
 from datetime import datetime
 import logging
 
 from app.calculation import Calculation
 from app.calculator_config import CalculatorConfig
+from app.columnar_history import ColumnarHistory
 from app.input_validators import InputValidator
-from app.operations import Operation
-from app.exceptions import OperationError
-from app.history import HistoryObserver
-from app.calculator_memento import CalculatorMemento
+from app.operations import Operation, OperationFactory
+from app.exceptions import OperationError, ValidationError
+from app.expressions import CompiledExpression, compile_expression
+from app.history import AsyncObserverBus, HistoryObserver
+from app.result_cache import ResultCache, create_result_cache
+from app.metrics import (
+    BATCH_OPERATIONS_TOTAL, HISTORY_IO_SECONDS, OPERATION_ERRORS_TOTAL, OPERATION_SECONDS, RECORD_SECONDS
+)
+from app.history_journal import ArchiveWatermark, HistoryJournal, append_history_rows, calculation_row
+from app.history_binary import BinaryHistoryFile, write_binary_history
+from app.history_index import HistoryFilter, HistoryIndex
+from app.history_stream import iter_history_chunks, write_history
+from app.history_sqlite import SQLiteHistoryStore
+from app.history_shared import SharedHistoryFile
+from app.calculator_memento import CalculatorMemento, HistoryTimeline
 
 Number = Union[int, float, Decimal]
 
+
+@dataclass
+class BatchResult:
+    """Outcome of perform_many: one result per input pair, None where that pair failed"""
+    results: List[Optional[Number]]
+    errors: Dict[int, str] = field(default_factory=dict)
+
+    @property
+    def succeeded(self) -> int:
+        return len(self.results) - len(self.errors)
+
+
 class Calculator:
     def __init__(self, config: Optional[CalculatorConfig] = None):
         self.config = config or CalculatorConfig(base_dir=Path("."))
-        self.history: List[Calculation] = []
+        self._timeline = HistoryTimeline(self._new_history())
+        # Held while the history changes, so saves on other threads copy a
+        # consistent snapshot. The journal lock may be taken before this one,
+        # never after it.
+        self.lock = threading.RLock()
         self.undo_stack: List[CalculatorMemento] = []
         self.redo_stack: List[CalculatorMemento] = []
         self.observers: List[HistoryObserver] = []
+        self.observer_bus: Optional[AsyncObserverBus] = None
+        if self.config.async_observers:
+            self.observer_bus = AsyncObserverBus(
+                self.observers,
+                max_queue=self.config.observer_queue_size,
+                backpressure=self.config.observer_backpressure
+            )
+        self.result_cache: Optional[ResultCache] = create_result_cache(self.config)
+        self._history_index: Optional[HistoryIndex] = None
+        self._sqlite: Optional[SQLiteHistoryStore] = None
         self.operation_strategy: Optional[Operation] = None
+        self.last_load_seconds: Optional[float] = None
 
         self.config.history_dir.mkdir(parents=True, exist_ok=True)
+        self.journal = HistoryJournal(
+            self.config.history_file,
+            self.config.history_journal_file,
+            self.config.journal_compact_threshold
+        )
+        self.shared_history: Optional[SharedHistoryFile] = None
+        if self.config.history_shared:
+            self.shared_history = SharedHistoryFile(self.config.history_file, self.config.max_history_size)
         
         logging.info("Calculator initialized with configuration")
         
@@ -33,6 +88,27 @@ class Calculator:
         except Exception as e:
             logging.warning(f"Could not load existing history: {e}")
 
+    @property
+    def history(self) -> List[Calculation]:
+        return self._timeline.history
+
+    @history.setter
+    def history(self, history: List[Calculation]):
+        # Replacing the history starts a new timeline; existing mementos keep
+        # pointing at the old one so undo still works across a load.
+        if self.config.history_store == 'columnar' and not isinstance(history, ColumnarHistory):
+            history = self._new_history(history)
+        with self.lock:
+            self._timeline = HistoryTimeline(history)
+
+    def _new_history(self, calculations: Iterable[Calculation] = ()) -> List[Calculation]:
+        if self.config.history_store == 'columnar':
+            return ColumnarHistory(calculations)
+        return list(calculations)
+
+    def _snapshot(self) -> CalculatorMemento:
+        return CalculatorMemento(timeline=self._timeline, position=self._timeline.position)
+
     def set_operation(self, operation: Operation):
         self.operation_strategy = operation
         logging.info(f"Operation set: {operation}")
@@ -44,96 +120,593 @@ class Calculator:
         self.observers.remove(observer)
 
     def notify_observers(self, calculation: Calculation):
+        if self.observer_bus:
+            self.observer_bus.publish([calculation])
+            return
         for obs in self.observers:
             obs.update(calculation)
 
-    def perform_operation(self, a: Number, b: Number) -> Decimal:
-        if not self.operation_strategy:
-            raise OperationError("No operation set")
+    def notify_observers_batch(self, calculations: List[Calculation]):
+        if self.observer_bus:
+            self.observer_bus.publish(calculations)
+            return
+        for obs in self.observers:
+            obs.update_batch(calculations)
+
+    def flush_observers(self):
+        """Wait until asynchronous observers have processed every notification
+        and write any save they are holding back"""
+        if self.observer_bus:
+            self.observer_bus.flush()
+        for obs in self.observers:
+            flush = getattr(obs, 'flush', None)
+            if flush is not None:
+                flush()
 
-        validated_a = InputValidator.validate_number(a, self.config)
-        validated_b = InputValidator.validate_number(b, self.config)
+    def evaluate(self, operation: Operation, a: Number, b: Number) -> Calculation:
+        """Validate and run one operation without touching history, undo state or observers"""
+        name = str(operation)
+        start = time.perf_counter()
+        try:
+            validated_a = InputValidator.validate_number(a, self.config)
+            validated_b = InputValidator.validate_number(b, self.config)
 
-        result = self.operation_strategy.execute(validated_a, validated_b)
+            with self._decimal_context(operation):
+                result = self._executor(operation)(validated_a, validated_b)
+        except Exception:
+            OPERATION_ERRORS_TOTAL.inc(name)
+            raise
+        OPERATION_SECONDS.observe(time.perf_counter() - start, name)
 
-        calc = Calculation(
-            operation=str(self.operation_strategy),
+        return Calculation(
+            operation=name,
             operand1=validated_a,
             operand2=validated_b,
             result=result
         )
 
+    def _decimal_context(self, operation: Operation):
+        """Decimal context an operation runs in: power and root use config.precision"""
+        if operation.uses_precision:
+            return localcontext(prec=self.config.precision)
+        return nullcontext()
+
+    def _executor(self, operation: Operation):
+        """The operation's execute function, memoized when the result cache is on"""
+        if self.result_cache is None:
+            return operation.execute
+        return self.result_cache.wrap(str(operation), operation.execute)
 
+    def perform_operation(self, a: Number, b: Number) -> Decimal:
+        if not self.operation_strategy:
+            raise OperationError("No operation set")
 
-        # Save current state for undo/redo
-        self.undo_stack.append(CalculatorMemento(self.history.copy()))
-        self.redo_stack.clear()
+        calc = self.evaluate(self.operation_strategy, a, b)
+        self.record(calc)
+        return calc.result
 
-        # Update history and notify observers
-        self.history.append(calc)
+    def record(self, calc: Calculation) -> None:
+        """Add an already evaluated calculation to history as one undo step"""
+        start = time.perf_counter()
+        with self.lock:
+            # Save current state for undo/redo
+            self.undo_stack.append(self._snapshot())
+            self.redo_stack.clear()
+
+            # Update history; observers are notified outside the lock
+            self._timeline.append(calc)
+            if self.shared_history is not None:
+                self.shared_history.record([calc])
+            self._enforce_history_limit()
         self.notify_observers(calc)
+        RECORD_SECONDS.observe(time.perf_counter() - start)
+
+    def record_many(self, calculations: List[Calculation]) -> None:
+        """Add several evaluated calculations to history as a single undo step"""
+        if not calculations:
+            return
+        with self.lock:
+            self.undo_stack.append(self._snapshot())
+            self.redo_stack.clear()
+            self._timeline.extend(calculations)
+            if self.shared_history is not None:
+                self.shared_history.record(calculations)
+            self._enforce_history_limit()
+        self.notify_observers_batch(calculations)
+
+    def perform_many(
+            self,
+            operation: Operation,
+            a_values: Sequence[Number],
+            b_values: Sequence[Number],
+            mode: str = 'exact',
+            record: bool = True
+    ) -> BatchResult:
+        """Apply one operation to many operand pairs.
+
+        'exact' mode runs the Decimal operation in a tight loop, 'float' mode uses the
+        operation's NumPy kernel. Errors are reported per element. The batch is a single
+        undo step and observers are notified once with all successful calculations.
+        """
+        if len(a_values) != len(b_values):
+            raise ValidationError("Operand sequences must have the same length")
+        if mode == 'exact':
+            batch, calculations = self._perform_many_exact(operation, a_values, b_values, record)
+        elif mode == 'float':
+            batch, calculations = self._perform_many_float(operation, a_values, b_values, record)
+        else:
+            raise OperationError(f"Unknown batch mode: {mode}")
+        BATCH_OPERATIONS_TOTAL.inc(str(operation), amount=batch.succeeded)
+        OPERATION_ERRORS_TOTAL.inc(str(operation), amount=len(batch.errors))
+
+        self.record_many(calculations)
+        return batch
+
+    def _perform_many_exact(self, operation, a_values, b_values, record):
+        validate = InputValidator.validate_number
+        execute = self._executor(operation)
+        config = self.config
+        name = str(operation)
+        results: List[Optional[Decimal]] = []
+        errors: Dict[int, str] = {}
+        calculations: List[Calculation] = []
+        with self._decimal_context(operation):
+            for index, (a, b) in enumerate(zip(a_values, b_values)):
+                try:
+                    a = validate(a, config)
+                    b = validate(b, config)
+                    result = execute(a, b)
+                except (ValidationError, OperationError, ArithmeticError) as e:
+                    results.append(None)
+                    errors[index] = str(e)
+                    continue
+                results.append(result)
+                if record:
+                    calculations.append(Calculation(operation=name, operand1=a, operand2=b, result=result))
+        return BatchResult(results, errors), calculations
+
+    def _perform_many_float(self, operation, a_values, b_values, record):
+        try:
+            a = np.asarray(a_values, dtype=float)
+            b = np.asarray(b_values, dtype=float)
+        except (TypeError, ValueError) as e:
+            raise ValidationError(f"Invalid number in batch: {e}")
+
+        with np.errstate(all='ignore'):
+            values = operation.execute_array(a, b)
+            limit = float(self.config.max_input_value)
+            checks = [((np.abs(a) > limit) | (np.abs(b) > limit),
+                       f"Value exceeds maximum {self.config.max_input_value}")]
+            checks += operation.invalid_array(a, b)
+            checks.append((~np.isfinite(values), "Result is not a finite number"))
+
+        errors: Dict[int, str] = {}
+        failed = np.zeros(len(values), dtype=bool)
+        for mask, message in checks:
+            for index in np.flatnonzero(mask & ~failed):
+                errors[int(index)] = message
+            failed |= mask
 
-        return result
+        results: List[Optional[float]] = values.tolist()
+        for index in errors:
+            results[index] = None
+
+        calculations: List[Calculation] = []
+        if record:
+            name = str(operation)
+            calculations = [
+                Calculation(operation=name, operand1=Decimal(repr(x)), operand2=Decimal(repr(y)),
+                            result=Decimal(repr(r)))
+                for x, y, r, bad in zip(a.tolist(), b.tolist(), results, failed.tolist()) if not bad
+            ]
+        return BatchResult(results, errors), calculations
+
+    def evaluate_expression(self, expression: str, bindings: Optional[Mapping[str, Number]] = None) -> Decimal:
+        """Evaluate an infix expression such as "power(x, 2) + 1" without touching history"""
+        compiled = self._compile(expression)
+        return compiled.evaluate(self._validate_bindings(bindings or {}), self.config.precision)
+
+    def evaluate_expression_many(self, expression: str, bindings: Iterable[Mapping[str, Number]]) -> BatchResult:
+        """Evaluate one expression for many sets of bindings, parsing it once.
+        Errors are reported per set of bindings, like perform_many."""
+        compiled = self._compile(expression)
+        precision = self.config.precision
+        results: List[Optional[Decimal]] = []
+        errors: Dict[int, str] = {}
+        for index, variables in enumerate(bindings):
+            try:
+                results.append(compiled.evaluate(self._validate_bindings(variables), precision))
+            except (ValidationError, OperationError, ArithmeticError) as e:
+                results.append(None)
+                errors[index] = str(e)
+        return BatchResult(results, errors)
+
+    def _compile(self, expression: str) -> CompiledExpression:
+        compiled = compile_expression(expression)
+        for constant in compiled.constants:
+            InputValidator.validate_number(constant, self.config)
+        return compiled
+
+    def _validate_bindings(self, bindings: Mapping[str, Number]) -> Dict[str, Decimal]:
+        return {name: InputValidator.validate_number(value, self.config) for name, value in bindings.items()}
 
     def save_history(self) -> None:
-        """Save history to CSV using pandas"""
+        """Save history to CSV one row at a time, or to the binary format if configured"""
+        if self.config.history_format == 'binary':
+            self._save_binary_history()
+            return
+        if self.config.history_format == 'sqlite':
+            self._save_sqlite_history()
+            return
+        if self.shared_history is not None:
+            self._save_shared_history()
+            return
         try:
-            data = [{
-                'operation': str(c.operation),
-                'operand1': str(c.operand1),
-                'operand2': str(c.operand2),
-                'result': str(c.result),
-                'timestamp': c.timestamp.isoformat()
-            } for c in self.history]
-
-            df = pd.DataFrame(data)
-            df.to_csv(self.config.history_file, index=False)
+            with self.journal.lock, HISTORY_IO_SECONDS.time('save'):
+                history, offset = self._history_snapshot()
+                write_history(self.config.history_file, history)
+                # The full snapshot now contains everything the journal held
+                self.journal.clear()
+                self._history_saved(offset)
             logging.info(f"History saved to {self.config.history_file}")
         except Exception as e:
             logging.error(f"Failed to save history: {e}")
             raise OperationError(f"Failed to save history: {e}")
 
+    def _history_snapshot(self) -> Tuple[List[Calculation], int]:
+        """Copy the history, with the number of calculations evicted before it,
+        so it can be written while other threads keep recording"""
+        with self.lock:
+            return list(self.history), self._timeline.offset
+
+    def _history_saved(self, offset: int) -> None:
+        """Calculations evicted since the snapshot was taken are archived but still in the saved file"""
+        with self.lock:
+            self.archive_watermark.set(self._timeline.offset - offset)
+
+    def _save_binary_history(self) -> None:
+        path = self.config.history_binary_file
+        try:
+            with self.journal.lock, HISTORY_IO_SECONDS.time('save'):
+                history, offset = self._history_snapshot()
+                write_binary_history(path, history)
+                self._history_saved(offset)
+            logging.info(f"History saved to {path}")
+        except Exception as e:
+            logging.error(f"Failed to save history: {e}")
+            raise OperationError(f"Failed to save history: {e}")
+
+    def _save_sqlite_history(self) -> None:
+        store = self.sqlite_store
+        try:
+            # Syncing only writes the rows that changed, and archiving moves
+            # the table's live range, so this one runs under the lock
+            with self.lock, HISTORY_IO_SECONDS.time('save'):
+                written = store.sync(self.history)
+            logging.info(f"History saved to {store.path} ({written} rows written)")
+        except Exception as e:
+            logging.error(f"Failed to save history: {e}")
+            raise OperationError(f"Failed to save history: {e}")
+
+    def _save_shared_history(self) -> None:
+        try:
+            with HISTORY_IO_SECONDS.time('save'):
+                written = self.shared_history.write()
+            logging.info(f"Appended {written} calculations to shared history {self.config.history_file}")
+        except Exception as e:
+            logging.error(f"Failed to save history: {e}")
+            raise OperationError(f"Failed to save history: {e}")
+
+    @property
+    def sqlite_store(self) -> SQLiteHistoryStore:
+        """The SQLite history table, opened on first use"""
+        if self._sqlite is None:
+            self._sqlite = SQLiteHistoryStore(self.config.history_sqlite_file, self.config.history_chunk_size)
+        return self._sqlite
+
+    @property
+    def archive_watermark(self) -> ArchiveWatermark:
+        """How many leading calculations of the saved history are archived already"""
+        archive_file = self.config.history_archive_file
+        return ArchiveWatermark(archive_file.with_name(archive_file.name + '.start'))
+
+    def search_saved_history(
+            self,
+            filters: Sequence[HistoryFilter] = (),
+            start: int = 0,
+            count: Optional[int] = None,
+            include_archive: bool = False
+    ) -> Tuple[int, List[Tuple[int, Calculation]]]:
+        """
+        Query the SQLite history without loading it: the number of saved
+        calculations matching every filter and one page of them.
+        """
+        if self.config.history_format != 'sqlite':
+            raise OperationError("Searching saved history requires history_format 'sqlite'")
+        try:
+            return self.sqlite_store.search(filters, start, count, include_archive)
+        except Exception as e:
+            logging.error(f"Failed to search history: {e}")
+            raise OperationError(f"Failed to search history: {e}")
+
+    def append_history(self, calculation: Calculation) -> None:
+        """Append a single calculation to the history journal"""
+        with HISTORY_IO_SECONDS.time('append'):
+            self.journal.append(calculation)
+        logging.info(f"Calculation appended to {self.journal.journal_file}")
+
     def load_history(self) -> None:
-        """Load history from CSV using pandas"""
+        """Load history from CSV in chunks, followed by any journal entries,
+        or from the binary format if configured"""
         try:
-            if self.config.history_file.exists():
-                df = pd.read_csv(self.config.history_file)
-                self.history = [
-                    Calculation.from_dict({
-                        'operation': row['operation'],
-                        'operand1': row['operand1'],
-                        'operand2': row['operand2'],
-                        'result': row['result'],
-                        'timestamp': row['timestamp']
-                    })
-                    for _, row in df.iterrows()
-                ]
-                logging.info(f"Loaded {len(self.history)} calculations from history")
+            start = time.perf_counter()
+            loaded = self._read_history()
+            if loaded is not None:
+                with self.lock:
+                    self.history, archived = loaded
+                    evicted = self._enforce_history_limit()
+                if evicted or archived:
+                    # Rewrite the file so the archived rows are not spilled again
+                    self.save_history()
+                self.verify_history(self.config.load_verify_sample)
+                self.last_load_seconds = time.perf_counter() - start
+                HISTORY_IO_SECONDS.observe(self.last_load_seconds, 'load')
+                logging.info(
+                    f"Loaded {len(self.history)} calculations from history "
+                    f"in {self.last_load_seconds:.3f}s"
+                )
         except Exception as e:
             logging.error(f"Failed to load history: {e}")
             raise OperationError(f"Failed to load history: {e}")
 
-    def undo(self) -> bool:
-        if not self.undo_stack:
-            return False
-        memento = self.undo_stack.pop()
-        self.redo_stack.append(CalculatorMemento(self.history.copy()))
-        self.history = memento.history.copy()
-        return True
+    def _read_history(self) -> Optional[Tuple[List[Calculation], int]]:
+        """Read the saved calculations and how many of them are in the archive
+        rather than memory, or return None when nothing has been saved"""
+        chunk_size = self.config.history_chunk_size
+        if self.config.history_format == 'sqlite':
+            # The table keeps evicted calculations itself; only the live tail is read
+            store = self.sqlite_store
+            if not len(store):
+                return None
+            return self._new_history(store.load(self.config.max_history_size)), 0
+        if self.shared_history is not None:
+            return self._read_shared_history()
+        if self.config.history_format == 'binary':
+            path = self.config.history_binary_file
+            if not path.exists():
+                return None
+            with self.journal.lock, BinaryHistoryFile(path) as saved:
+                return self._read_bounded(saved[start:start + chunk_size] for start in range(0, len(saved), chunk_size))
+
+        with self.journal.lock:
+            files = [self.config.history_file]
+            if self.config.history_journal:
+                files += self.journal.pending_files()
+            files = [path for path in files if path.exists()]
+            if not files:
+                return None
+            return self._read_bounded(chunk for path in files for chunk in iter_history_chunks(path, chunk_size))
+
+    def _read_shared_history(self) -> Optional[Tuple[List[Calculation], int]]:
+        """Merge the calculations other processes appended to the shared file
+        since the last read after the current history; the first read takes
+        the whole file"""
+        history = self._new_history(self.history)
+        limit = self.config.max_history_size
+        merged = 0
+        for chunk in self.shared_history.iter_new(self.config.history_chunk_size):
+            history.extend(chunk)
+            merged += len(chunk)
+            # The shared file keeps every calculation, so older ones are
+            # dropped from memory instead of archived
+            if len(history) > limit:
+                del history[:len(history) - limit]
+        if not merged:
+            return None
+        return history, 0
+
+    def _read_bounded(self, chunks: Iterable[List[Calculation]]) -> Tuple[List[Calculation], int]:
+        """
+        Collect chunks of calculations, keeping at most max_history_size in
+        memory. Older ones are spilled to a scratch file and only appended
+        to the archive once everything has been read.
+
+        The saved files may still begin with calculations that were archived
+        when they were evicted at runtime; the archive watermark counts them
+        and they are skipped.
+        """
+        limit = self.config.max_history_size
+        archive_file = self.config.history_archive_file
+        spill_path = archive_file.with_name(archive_file.name + '.loading')
+        history = self._new_history()
+        archived = skipped = 0
+        spill = None
+        to_skip = self.archive_watermark.get()
+        try:
+            for chunk in chunks:
+                if skipped < to_skip:
+                    drop = min(to_skip - skipped, len(chunk))
+                    chunk = chunk[drop:]
+                    skipped += drop
+                history.extend(chunk)
+                excess = len(history) - limit
+                if excess > 0:
+                    if spill is None:
+                        spill = open(spill_path, 'w+', newline='', encoding='utf-8')
+                        writer = csv.writer(spill, lineterminator='\n')
+                    writer.writerows(calculation_row(c) for c in history[:excess])
+                    del history[:excess]
+                    archived += excess
+            if spill is not None:
+                spill.close()
+                with open(spill_path, newline='', encoding='utf-8') as f:
+                    append_history_rows(archive_file, csv.reader(f))
+                logging.info(f"Archived {archived} calculations to {archive_file}")
+        finally:
+            if spill is not None:
+                spill.close()
+                spill_path.unlink(missing_ok=True)
+        return history, archived + skipped
 
-    def redo(self) -> bool:
-        if not self.redo_stack:
+    def import_history(self, path: Union[str, Path]) -> int:
+        """
+        Append the calculations of a history CSV (plain, .gz or .xz) to the
+        current history, reading it in chunks. The import is one undo step.
+        """
+        path = Path(path)
+        imported = 0
+        try:
+            for chunk in iter_history_chunks(path, self.config.history_chunk_size):
+                if not chunk:
+                    continue
+                with self.lock:
+                    if not imported:
+                        self.undo_stack.append(self._snapshot())
+                        self.redo_stack.clear()
+                    self._timeline.extend(chunk)
+                    if self.shared_history is not None:
+                        self.shared_history.record(chunk)
+                    self._enforce_history_limit()
+                self.notify_observers_batch(chunk)
+                imported += len(chunk)
+        except OperationError:
+            raise
+        except Exception as e:
+            logging.error(f"Failed to import history: {e}")
+            raise OperationError(f"Failed to import history: {e}")
+        logging.info(f"Imported {imported} calculations from {path}")
+        return imported
+
+    def export_history(self, path: Union[str, Path], include_archive: bool = False) -> int:
+        """
+        Write the history to a CSV (plain, .gz or .xz) one row at a time,
+        optionally preceded by the archived calculations.
+        """
+        path = Path(path)
+        calculations: Iterable[Calculation] = self.history
+        chunk_size = self.config.history_chunk_size
+        archive_file = self.config.history_archive_file
+        chunks = None
+        if include_archive and self.config.history_format == 'sqlite':
+            chunks = self.sqlite_store.iter_chunks(chunk_size, archived=True)
+        elif include_archive and self.shared_history is not None:
+            # Everything written by any process, then what this one has not written yet
+            calculations = itertools.chain(
+                (c for chunk in iter_history_chunks(self.config.history_file, chunk_size) for c in chunk)
+                if self.config.history_file.exists() else (),
+                self.shared_history.pending()
+            )
+        elif include_archive and archive_file.exists():
+            chunks = iter_history_chunks(archive_file, chunk_size)
+        if chunks is not None:
+            calculations = itertools.chain((c for chunk in chunks for c in chunk), self.history)
+        try:
+            exported = write_history(path, calculations)
+        except Exception as e:
+            logging.error(f"Failed to export history: {e}")
+            raise OperationError(f"Failed to export history: {e}")
+        logging.info(f"Exported {exported} calculations to {path}")
+        return exported
+
+    def _enforce_history_limit(self) -> int:
+        """Keep at most max_history_size calculations in memory, spilling older ones to the archive file.
+        Callers hold the calculator lock."""
+        excess = len(self.history) - self.config.max_history_size
+        if excess <= 0:
+            return 0
+        evicted = self._timeline.evict(excess)
+        del self.undo_stack[:max(len(self.undo_stack) - self.config.max_history_size, 0)]
+        if self.shared_history is not None:
+            # Evicted calculations are already in the shared file or queued for it
+            return len(evicted)
+        try:
+            if self.config.history_format == 'sqlite':
+                # Archived rows stay in the table, before the live ones
+                archive = self.sqlite_store.path
+                self.sqlite_store.archive(evicted)
+            else:
+                archive = self.config.history_archive_file
+                append_history_rows(archive, (calculation_row(c) for c in evicted))
+                self.archive_watermark.advance(len(evicted))
+        except (OSError, sqlite3.Error) as e:
+            logging.error(f"Failed to archive history: {e}")
+            raise OperationError(f"Failed to archive history: {e}")
+        logging.info(f"Archived {len(evicted)} calculations to {archive}")
+        return len(evicted)
+
+    def verify_history(self, sample: Optional[int] = None) -> int:
+        """Recompute stored results and return how many differ.
+        Checks a random sample of `sample` calculations, or all of them when sample is None."""
+        history = self.history
+        if sample is not None and sample < len(history):
+            history = random.sample(history, sample)
+        mismatches = 0
+        for calc in history:
+            # Recompute power and root at the precision they were saved with
+            try:
+                context = self._decimal_context(OperationFactory.create_operation(calc.operation))
+            except ValueError:
+                context = nullcontext()
+            with context:
+                mismatches += not calc.verify()
+        if mismatches:
+            logging.warning(f"{mismatches} of {len(history)} verified calculations differ from their saved result")
+        return mismatches
+
+    def _jump(self, source: List[CalculatorMemento], target: List[CalculatorMemento], steps: int) -> bool:
+        """Move `steps` states from one stack to the other and restore only the last one"""
+        if not source or steps < 1:
             return False
-        memento = self.redo_stack.pop()
-        self.undo_stack.append(CalculatorMemento(self.history.copy()))
-        self.history = memento.history.copy()
+        memento = None
+        with self.lock:
+            for _ in range(min(steps, len(source))):
+                target.append(memento or self._snapshot())
+                memento = source.pop()
+            self._timeline = memento.restore()
+        self._rewrite_journaled_history()
         return True
 
+    def _rewrite_journaled_history(self) -> None:
+        """
+        The journal can only append, so after undo, redo or clear the saved
+        files would still replay the removed calculations on load. Auto-save
+        in journal mode rewrites the snapshot instead, which also empties the journal.
+        """
+        if self.config.history_journal and self.config.auto_save:
+            self.save_history()
+
+    def undo(self, steps: int = 1) -> bool:
+        return self._jump(self.undo_stack, self.redo_stack, steps)
+
+    def redo(self, steps: int = 1) -> bool:
+        return self._jump(self.redo_stack, self.undo_stack, steps)
+
     def show_history(self) -> List[str]:
         return [f"{c.operation}({c.operand1}, {c.operand2}) = {c.result}" for c in self.history]
 
+    def query_history(
+            self,
+            filters: Sequence[HistoryFilter] = (),
+            start: int = 0,
+            count: Optional[int] = None
+    ) -> Tuple[int, List[Tuple[int, Calculation]]]:
+        """
+        Return how many calculations match every filter, and the page of
+        matches from `start` to `start + count` with their history positions.
+        """
+        if self._history_index is None or self._history_index.history is not self.history:
+            timeline = self._timeline
+            # Eviction only advances the timeline offset, so it keeps the index
+            self._history_index = HistoryIndex(timeline.history, lambda: timeline.offset)
+        total, positions = self._history_index.query(filters, start, count)
+        history = self.history
+        return total, [(position, history[position]) for position in positions]
+
     def clear_history(self):
-        self.history.clear()
-        self.undo_stack.clear()
-        self.redo_stack.clear()
+        with self.lock:
+            self.history.clear()
+            self._timeline.redo.clear()
+            self.undo_stack.clear()
+            self.redo_stack.clear()
+        self._rewrite_journaled_history()
         logging.info("History cleared")
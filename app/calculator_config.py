@@ -31,7 +31,23 @@ class CalculatorConfig:
             auto_save: Optional[bool] = None,
             precision: Optional[int] = None,
             max_input_value: Optional[Number] = None,
-            default_encoding: Optional[str] = None
+            default_encoding: Optional[str] = None,
+            history_journal: Optional[bool] = None,
+            journal_compact_threshold: Optional[int] = None,
+            load_verify_sample: Optional[int] = None,
+            history_store: Optional[str] = None,
+            async_observers: Optional[bool] = None,
+            observer_queue_size: Optional[int] = None,
+            observer_backpressure: Optional[str] = None,
+            cache_size: Optional[int] = None,
+            cache_ttl: Optional[float] = None,
+            history_format: Optional[str] = None,
+            history_chunk_size: Optional[int] = None,
+            autosave_interval: Optional[float] = None,
+            autosave_max_pending: Optional[int] = None,
+            history_shared: Optional[bool] = None,
+            history_sink_queue_size: Optional[int] = None,
+            history_sink_backpressure: Optional[str] = None
     ):
         """
         Initialize configuration of environment variables
@@ -62,6 +78,84 @@ class CalculatorConfig:
             'CALCULATOR_DEFAULT_ENCODING', 'utf-8'
         )
 
+        history_journal_env = os.getenv('CALCULATOR_HISTORY_JOURNAL', 'false').lower()
+        self.history_journal = history_journal if history_journal is not None else (
+            history_journal_env == 'true' or history_journal_env == '1'
+        )
+
+        self.journal_compact_threshold = journal_compact_threshold or int(
+            os.getenv('CALCULATOR_JOURNAL_COMPACT_THRESHOLD', '1000')
+        )
+
+        # Number of loaded rows to re-verify; 0 turns verification off
+        self.load_verify_sample = load_verify_sample if load_verify_sample is not None else int(
+            os.getenv('CALCULATOR_LOAD_VERIFY_SAMPLE', '100')
+        )
+
+        # In-memory history layout: 'list' of Calculation objects or 'columnar' arrays
+        self.history_store = (history_store or os.getenv(
+            'CALCULATOR_HISTORY_STORE', 'list'
+        )).lower()
+
+        async_observers_env = os.getenv('CALCULATOR_ASYNC_OBSERVERS', 'false').lower()
+        self.async_observers = async_observers if async_observers is not None else (
+            async_observers_env == 'true' or async_observers_env == '1'
+        )
+
+        self.observer_queue_size = observer_queue_size or int(
+            os.getenv('CALCULATOR_OBSERVER_QUEUE_SIZE', '1000')
+        )
+
+        # What to do when the observer queue is full: 'block' or 'drop'
+        self.observer_backpressure = (observer_backpressure or os.getenv(
+            'CALCULATOR_OBSERVER_BACKPRESSURE', 'block'
+        )).lower()
+
+        # Entries in the operation result cache; 0 turns caching off
+        self.cache_size = cache_size if cache_size is not None else int(
+            os.getenv('CALCULATOR_CACHE_SIZE', '0')
+        )
+
+        # Seconds a cached result stays valid; 0 keeps results until evicted
+        self.cache_ttl = cache_ttl if cache_ttl is not None else float(
+            os.getenv('CALCULATOR_CACHE_TTL', '0')
+        )
+
+        # On-disk history format: 'csv', the memory-mappable 'binary' or an 'sqlite' table
+        self.history_format = (history_format or os.getenv(
+            'CALCULATOR_HISTORY_FORMAT', 'csv'
+        )).lower()
+
+        # Calculations read at a time when loading, importing or exporting history
+        self.history_chunk_size = history_chunk_size or int(
+            os.getenv('CALCULATOR_HISTORY_CHUNK_SIZE', '10000')
+        )
+
+        # Seconds autosave may hold back a write to coalesce it with later
+        # ones; 0 saves after every calculation
+        self.autosave_interval = autosave_interval if autosave_interval is not None else float(
+            os.getenv('CALCULATOR_AUTOSAVE_INTERVAL', '0')
+        )
+        self.autosave_max_pending = autosave_max_pending or int(
+            os.getenv('CALCULATOR_AUTOSAVE_MAX_PENDING', '100')
+        )
+
+        # Several processes append to one history CSV under a file lock
+        # instead of each rewriting it
+        history_shared_env = os.getenv('CALCULATOR_HISTORY_SHARED', 'false').lower()
+        self.history_shared = history_shared if history_shared is not None else (
+            history_shared_env == 'true' or history_shared_env == '1'
+        )
+
+        # Calculations the web process may queue for recording, and what to
+        # do when the queue is full: 'block' or 'drop'
+        self.history_sink_queue_size = history_sink_queue_size or int(
+            os.getenv('CALCULATOR_HISTORY_SINK_QUEUE_SIZE', '10000')
+        )
+        self.history_sink_backpressure = (history_sink_backpressure or os.getenv(
+            'CALCULATOR_HISTORY_SINK_BACKPRESSURE', 'block'
+        )).lower()
+
     @property
     def log_dir(self) -> Path:
         """
@@ -93,6 +187,50 @@ class CalculatorConfig:
         )).resolve()
     
 
+    @property
+    def history_binary_file(self) -> Path:
+        """
+        get binary history file path
+        """
+        history_file = self.history_file
+        return Path(os.getenv(
+            'CALCULATOR_HISTORY_BINARY_FILE',
+            str(history_file.with_name(history_file.stem + ".bin"))
+        )).resolve()
+
+    @property
+    def history_sqlite_file(self) -> Path:
+        """
+        get SQLite history database path
+        """
+        history_file = self.history_file
+        return Path(os.getenv(
+            'CALCULATOR_HISTORY_SQLITE_FILE',
+            str(history_file.with_name(history_file.stem + ".db"))
+        )).resolve()
+
+    @property
+    def history_journal_file(self) -> Path:
+        """
+        get history journal file path
+        """
+        history_file = self.history_file
+        return Path(os.getenv(
+            'CALCULATOR_HISTORY_JOURNAL_FILE',
+            str(history_file.with_name(history_file.stem + ".journal.csv"))
+        )).resolve()
+
+    @property
+    def history_archive_file(self) -> Path:
+        """
+        get path of the file holding calculations evicted from memory
+        """
+        history_file = self.history_file
+        return Path(os.getenv(
+            'CALCULATOR_HISTORY_ARCHIVE_FILE',
+            str(history_file.with_name(history_file.stem + ".archive.csv"))
+        )).resolve()
+
     @property
     def log_file(self) -> Path:
         """
@@ -117,6 +255,36 @@ class CalculatorConfig:
             raise ConfigurationError("precision must be positive")
         if self.max_input_value <= 0:
             raise ConfigurationError("max_input_value must be positive")
+        if self.journal_compact_threshold <= 0:
+            raise ConfigurationError("journal_compact_threshold must be positive")
+        if self.load_verify_sample < 0:
+            raise ConfigurationError("load_verify_sample cannot be negative")
+        if self.history_store not in ('list', 'columnar'):
+            raise ConfigurationError("history_store must be 'list' or 'columnar'")
+        if self.observer_queue_size <= 0:
+            raise ConfigurationError("observer_queue_size must be positive")
+        if self.observer_backpressure not in ('block', 'drop'):
+            raise ConfigurationError("observer_backpressure must be 'block' or 'drop'")
+        if self.cache_size < 0:
+            raise ConfigurationError("cache_size must not be negative")
+        if self.cache_ttl < 0:
+            raise ConfigurationError("cache_ttl must not be negative")
+        if self.history_format not in ('csv', 'binary', 'sqlite'):
+            raise ConfigurationError("history_format must be 'csv', 'binary' or 'sqlite'")
+        if self.history_format != 'csv' and self.history_journal:
+            raise ConfigurationError("history_journal requires history_format 'csv'")
+        if self.history_chunk_size <= 0:
+            raise ConfigurationError("history_chunk_size must be positive")
+        if self.autosave_interval < 0:
+            raise ConfigurationError("autosave_interval must not be negative")
+        if self.autosave_max_pending <= 0:
+            raise ConfigurationError("autosave_max_pending must be positive")
+        if self.history_shared and (self.history_format != 'csv' or self.history_journal):
+            raise ConfigurationError("history_shared requires history_format 'csv' without history_journal")
+        if self.history_sink_queue_size <= 0:
+            raise ConfigurationError("history_sink_queue_size must be positive")
+        if self.history_sink_backpressure not in ('block', 'drop'):
+            raise ConfigurationError("history_sink_backpressure must be 'block' or 'drop'")
     
     
     
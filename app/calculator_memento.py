@@ -1,18 +1,117 @@
-from dataclasses import dataclass, field
 import datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from app.calculation import Calculation
 
 
-@dataclass
+class HistoryTimeline:
+    """
+    Shared backing store for the calculator history and its mementos.
+
+    The timeline is the current history followed by the calculations that
+    have been undone (kept in ``redo`` in reverse order). Mementos only store
+    a position on this timeline, so saving state never copies the history and
+    moving between states only touches the entries in between. Positions are
+    absolute: ``offset`` counts the entries evicted from the front.
+    """
+
+    def __init__(self, history: Optional[List[Calculation]] = None):
+        self.history = history if history is not None else []
+        self.redo: List[Calculation] = []
+        self.offset = 0
+
+    def __len__(self) -> int:
+        return len(self.history) + len(self.redo)
+
+    @property
+    def position(self) -> int:
+        """
+        Length of the current history on this timeline
+        """
+        return self.offset + len(self.history)
+
+    def append(self, calculation: Calculation) -> None:
+        """
+        Add a new calculation, discarding any undone calculations
+        """
+        self.redo.clear()
+        self.history.append(calculation)
+
+    def extend(self, calculations: List[Calculation]) -> None:
+        """
+        Add several calculations as a single step
+        """
+        self.redo.clear()
+        self.history.extend(calculations)
+
+    def seek(self, position: int) -> None:
+        """
+        Move the current history to the given position on the timeline
+        """
+        position = max(0, min(position - self.offset, len(self)))
+        while len(self.history) > position:
+            self.redo.append(self.history.pop())
+        while len(self.history) < position:
+            self.history.append(self.redo.pop())
+
+    def snapshot(self, position: int) -> List[Calculation]:
+        """
+        Return the history as it was at the given position
+        """
+        position = max(0, min(position - self.offset, len(self)))
+        current = len(self.history)
+        if position <= current:
+            return list(self.history[:position])
+        return list(self.history) + self.redo[::-1][:position - current]
+
+    def evict(self, count: int) -> List[Calculation]:
+        """
+        Remove and return the oldest calculations from the history.
+        Deleting from the front of a list shifts the remaining references,
+        so this is linear in the history length (a single memmove).
+        """
+        evicted = list(self.history[:count])
+        del self.history[:count]
+        self.offset += len(evicted)
+        return evicted
+
+
 class CalculatorMemento:
     """
     MEMENTO pattern allows for undo/redo functions
     """
 
-    history: List[Calculation]  # List of Calculation instances representing the calculator's history
-    timestamp: datetime.datetime = field(default_factory=datetime.datetime.now)  # Time when the memento was created
+    def __init__(
+            self,
+            history: Optional[List[Calculation]] = None,
+            timestamp: Optional[datetime.datetime] = None,
+            timeline: Optional[HistoryTimeline] = None,
+            position: Optional[int] = None
+    ):
+        """
+        Create a memento either from a list of calculations or from a
+        position on a shared timeline. Only the latter is used by the
+        calculator, which makes saving state O(1).
+        """
+        if timeline is None:
+            timeline = HistoryTimeline(history if history is not None else [])
+        self.timeline = timeline
+        self.position = timeline.position if position is None else position
+        self.timestamp = timestamp or datetime.datetime.now()  # Time when the memento was created
+
+    @property
+    def history(self) -> List[Calculation]:
+        """
+        List of Calculation instances representing the calculator's history
+        """
+        return self.timeline.snapshot(self.position)
+
+    def restore(self) -> HistoryTimeline:
+        """
+        Move the timeline back to this memento's state and return it
+        """
+        self.timeline.seek(self.position)
+        return self.timeline
 
     def to_dict(self) -> Dict[str, Any]:
         """
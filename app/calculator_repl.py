@@ -5,7 +5,10 @@ import logging
 
 from app.calculator import Calculator
 from app.exceptions import OperationError, ValidationError
-from app.history import AutoSaveObserver, LoggingObserver
+from app.expressions import compile_expression
+from app.history import AutoSaveObserver, LoggingObserver, exit_on_signals
+from app.history_index import parse_filter
+from app.metrics import REGISTRY
 from app.operations import OperationFactory
 
 from colorama import init, Fore, Style
@@ -14,6 +17,41 @@ from colorama import init, Fore, Style
 init(autoreset=True)
 
 
+def parse_bindings(text: str) -> dict:
+    """Parse variable bindings typed as "x=2, y=3" """
+    bindings = {}
+    for part in text.split(','):
+        if not part.strip():
+            continue
+        name, sep, value = part.partition('=')
+        if not sep or not name.strip():
+            raise ValidationError(f"Invalid binding: {part.strip()}")
+        bindings[name.strip()] = value.strip()
+    return bindings
+
+
+HISTORY_PAGE_SIZE = 20
+
+
+def parse_history_args(text: str):
+    """
+    Parse the arguments of the history command: an optional 1-based start
+    entry and page size, then filters such as op=add or result>=10.
+    Returns (filters, start, count) with a 0-based start.
+    """
+    numbers = []
+    filters = []
+    for token in text.split():
+        if token.isdigit() and not filters and len(numbers) < 2:
+            numbers.append(int(token))
+        else:
+            filters.append(parse_filter(token))
+    start = numbers[0] if numbers else 1
+    count = numbers[1] if len(numbers) > 1 else HISTORY_PAGE_SIZE
+    if start < 1 or count < 1:
+        raise ValidationError("History start and page size must be positive")
+    return filters, start - 1, count
+
 
 def calculator_repl():
     """
@@ -26,7 +64,10 @@ def calculator_repl():
 
         # Add observers for logging and auto-saving
         calc.add_observer(LoggingObserver())
-        calc.add_observer(AutoSaveObserver(calc))
+        autosave = AutoSaveObserver(calc)
+        calc.add_observer(autosave)
+        # SIGTERM and SIGHUP still run the final autosave flush at exit
+        exit_on_signals()
 
         print(Fore.GREEN+f"Calculator started. Type 'help' for commands.")
 
@@ -37,16 +78,23 @@ def calculator_repl():
                 if command == 'help':
                     print(Fore.GREEN+f"\nAvailable commands:")
                     print(Fore.GREEN+f"  add, subtract, multiply, divide, power, root - Perform calculations")
-                    print(Fore.GREEN+f"  history - Show calculation history")
+                    print(Fore.GREEN+f"  eval - Evaluate an expression such as power(x, 2) + root(y, 3)")
+                    print(Fore.GREEN+f"  history [start] [count] [filters] - Show calculation history a page at a time")
+                    print(Fore.GREEN+f"      filters: op=add a>=1 b<5 result=2 time>=2025-01-01T09:00")
                     print(Fore.GREEN+f"  clear - Clear calculation history")
                     print(Fore.GREEN+f"  undo - Undo the last calculation")
                     print(Fore.GREEN+f"  redo - Redo the last undone calculation")
+                    print(Fore.GREEN+f"  stats - Show operation and history I/O timings")
                     print(Fore.GREEN+f"  save - Save calculation history to file")
                     print(Fore.GREEN+f"  load - Load calculation history from file")
+                    print(Fore.GREEN+f"  export - Write the full history, archive included, to a .csv, .csv.gz or .csv.xz file")
+                    print(Fore.GREEN+f"  import - Append calculations from a .csv, .csv.gz or .csv.xz file")
                     print(Fore.GREEN+f"  exit - Exit the calculator")
                     continue
 
                 if command == 'exit':
+                    # Let background observers finish before the final save
+                    calc.flush_observers()
                     try:
                         calc.save_history()
                         print(Fore.GREEN+f"History saved successfully.")
@@ -55,14 +103,25 @@ def calculator_repl():
                     print("Goodbye!")
                     break
 
-                if command == 'history':
-                    history = calc.show_history()
-                    if not history:
-                        print(Fore.RED + f"No calculations in history")
+                if command == 'history' or command.startswith('history '):
+                    try:
+                        filters, start, count = parse_history_args(command[len('history'):])
+                    except ValidationError as e:
+                        print(Fore.RED+f"Error: {e}")
+                        continue
+                    total, page = calc.query_history(filters, start, count)
+                    if not page:
+                        if total:
+                            print(Fore.RED + f"No calculations past entry {total}")
+                        else:
+                            print(Fore.RED + f"No calculations in history")
                     else:
-                        print(Fore.GREEN+f"\nCalculation History:")
-                        for i, entry in enumerate(history, 1):
-                            print(Fore.BLUE+f"{i}. {entry}")
+                        print(Fore.GREEN+f"\nCalculation History ({start + 1}-{start + len(page)} of {total}):")
+                        for position, calculation in page:
+                            print(Fore.BLUE+f"{position + 1}. {calculation}")
+                        if start + len(page) < total:
+                            filter_text = "".join(f" {token}" for token in command.split()[1:] if not token.isdigit())
+                            print(Fore.GREEN+f"Type 'history {start + len(page) + 1} {count}{filter_text}' for more")
                     continue
 
                 if command == 'clear':
@@ -84,6 +143,18 @@ def calculator_repl():
                         print(Fore.YELLOW+f"Nothing to redo")
                     continue
 
+                if command == 'stats':
+                    lines = REGISTRY.summary_lines()
+                    if not lines:
+                        print(Fore.YELLOW+f"No statistics recorded yet")
+                    for line in lines:
+                        print(Fore.BLUE+line)
+                    scheduler = getattr(autosave, 'scheduler', None)
+                    if scheduler is not None:
+                        print(Fore.BLUE+f"autosave: {scheduler.requests} requests, "
+                              f"{scheduler.writes} writes ({scheduler.coalesced} saved)")
+                    continue
+
                 if command == 'save':
                     try:
                         calc.save_history()
@@ -100,6 +171,38 @@ def calculator_repl():
                         print(Fore.RED+f"Error loading history: {e}")
                     continue
 
+                if command in ('export', 'import'):
+                    # Read the path separately so its case is kept
+                    path = input(Fore.CYAN+f"File path: "+ Style.RESET_ALL).strip()
+                    if not path or path.lower() == 'cancel':
+                        print(Fore.YELLOW+f"Operation cancelled")
+                        continue
+                    try:
+                        if command == 'export':
+                            count = calc.export_history(path, include_archive=True)
+                            print(Fore.GREEN+f"Exported {count} calculations to {path}")
+                        else:
+                            count = calc.import_history(path)
+                            print(Fore.GREEN+f"Imported {count} calculations from {path}")
+                    except OperationError as e:
+                        print(Fore.RED+f"Error: {e}")
+                    continue
+
+                if command == 'eval':
+                    expression = input(Fore.CYAN+f"Expression: "+ Style.RESET_ALL)
+                    if expression.lower() == 'cancel':
+                        print(Fore.YELLOW+f"Operation cancelled")
+                        continue
+                    try:
+                        bindings = {}
+                        if compile_expression(expression).variables:
+                            bindings = parse_bindings(input(Fore.CYAN+f"Variables (x=1, y=2): "+ Style.RESET_ALL))
+                        result = calc.evaluate_expression(expression, bindings)
+                        print(Fore.GREEN+f"\nResult: {result.normalize()}")
+                    except (ValidationError, OperationError) as e:
+                        print(Fore.RED+f"Error: {e}")
+                    continue
+
                 if command in ['add', 'subtract', 'multiply', 'divide', 'power', 'root', 'integerdivision', 'modulus', 'percentage', 'absolutedifference']:
                     print("\nEnter numbers (or 'cancel' to abort):")
                     a = input(Fore.CYAN +f"First number: " + Style.RESET_ALL)
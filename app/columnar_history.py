@@ -0,0 +1,198 @@
+from array import array
+from collections.abc import MutableSequence
+from datetime import datetime, timedelta
+from decimal import Context, Decimal
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+from app.calculation import Calculation
+
+_EPOCH = datetime(1970, 1, 1)
+_EXACT = Context(prec=18)
+_MAX_DIGITS = 18
+_OVERFLOW = -32768  # exponent marker for values kept as Decimal objects
+
+# Operation names are interned once per process and stored as small codes
+_OPERATION_NAMES: List[str] = []
+_OPERATION_CODES: Dict[str, int] = {}
+
+
+def _operation_code(name: str) -> int:
+    code = _OPERATION_CODES.get(name)
+    if code is None:
+        code = _OPERATION_CODES[name] = len(_OPERATION_NAMES)
+        _OPERATION_NAMES.append(name)
+    return code
+
+
+def timestamp_ns(timestamp: datetime) -> int:
+    """Nanoseconds since the epoch of a naive local timestamp, as stored in the timestamp columns"""
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone().replace(tzinfo=None)
+    delta = timestamp - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000_000 + delta.microseconds * 1000
+
+
+class DecimalColumn:
+    """
+    Column of Decimals stored as an int64 coefficient and an int16 exponent.
+
+    Values with more than 18 digits, special values and negative zero do not
+    fit and are kept as Decimal objects in a side table instead.
+    """
+
+    def __init__(self):
+        self.coefficients = array('q')
+        self.exponents = array('h')
+        self.overflow: Dict[int, Decimal] = {}
+        self._next_key = 0
+
+    def __len__(self) -> int:
+        return len(self.coefficients)
+
+    def append(self, value: Decimal) -> None:
+        sign, digits, exponent = value.as_tuple()
+        if (isinstance(exponent, int) and len(digits) <= _MAX_DIGITS
+                and _OVERFLOW < exponent < 32768 and not (sign and not any(digits))):
+            self.coefficients.append(int(value.scaleb(-exponent, _EXACT)))
+            self.exponents.append(exponent)
+        else:
+            self.overflow[self._next_key] = value
+            self.coefficients.append(self._next_key)
+            self.exponents.append(_OVERFLOW)
+            self._next_key += 1
+
+    def get(self, index: int) -> Decimal:
+        exponent = self.exponents[index]
+        if exponent == _OVERFLOW:
+            return self.overflow[self.coefficients[index]]
+        return Decimal(self.coefficients[index]).scaleb(exponent, _EXACT)
+
+    def delete(self, index: Union[int, slice]) -> None:
+        positions = range(len(self))[index] if isinstance(index, slice) else [index]
+        for position in positions:
+            if self.exponents[position] == _OVERFLOW:
+                del self.overflow[self.coefficients[position]]
+        del self.coefficients[index]
+        del self.exponents[index]
+
+    def slice(self, index: slice) -> 'DecimalColumn':
+        column = DecimalColumn()
+        column.coefficients = self.coefficients[index]
+        column.exponents = self.exponents[index]
+        column.overflow = {
+            key: self.overflow[key]
+            for key, exponent in zip(column.coefficients, column.exponents)
+            if exponent == _OVERFLOW
+        }
+        column._next_key = self._next_key
+        return column
+
+    def copy(self) -> 'DecimalColumn':
+        return self.slice(slice(None))
+
+
+class ColumnarHistory(MutableSequence):
+    """
+    Array-backed calculation history.
+
+    Stores each field of a calculation in its own compact column and only
+    builds Calculation objects when entries are read, so a long history
+    costs a few dozen bytes per entry instead of several hundred.
+    Supports the list operations the calculator relies on.
+    """
+
+    def __init__(self, calculations: Optional[Iterable[Calculation]] = None):
+        self._operations = array('H')
+        self._timestamps = array('q')
+        self._operands1 = DecimalColumn()
+        self._operands2 = DecimalColumn()
+        self._results = DecimalColumn()
+        if calculations is not None:
+            self.extend(calculations)
+
+    def __len__(self) -> int:
+        return len(self._operations)
+
+    def _materialize(self, index: int) -> Calculation:
+        return Calculation(
+            operation=_OPERATION_NAMES[self._operations[index]],
+            operand1=self._operands1.get(index),
+            operand2=self._operands2.get(index),
+            result=self._results.get(index),
+            timestamp=_EPOCH + timedelta(microseconds=self._timestamps[index] // 1000)
+        )
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            history = ColumnarHistory()
+            history._operations = self._operations[index]
+            history._timestamps = self._timestamps[index]
+            history._operands1 = self._operands1.slice(index)
+            history._operands2 = self._operands2.slice(index)
+            history._results = self._results.slice(index)
+            return history
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("history index out of range")
+        return self._materialize(index)
+
+    def __iter__(self) -> Iterator[Calculation]:
+        for index in range(len(self)):
+            yield self._materialize(index)
+
+    def __setitem__(self, index, value):
+        # Rare for a history; rebuild rather than patch every column in place
+        items = list(self)
+        items[index] = value
+        self.clear()
+        self.extend(items)
+
+    def __delitem__(self, index) -> None:
+        del self._operations[index]
+        del self._timestamps[index]
+        self._operands1.delete(index)
+        self._operands2.delete(index)
+        self._results.delete(index)
+
+    def insert(self, index: int, value: Calculation) -> None:
+        if index >= len(self):
+            self.append(value)
+            return
+        items = list(self)
+        items.insert(index, value)
+        self.clear()
+        self.extend(items)
+
+    def append(self, calculation: Calculation) -> None:
+        self._timestamps.append(timestamp_ns(calculation.timestamp))
+        self._operands1.append(Decimal(calculation.operand1))
+        self._operands2.append(Decimal(calculation.operand2))
+        self._results.append(Decimal(calculation.result))
+        # The operations column defines the length, so fill it last for concurrent readers
+        self._operations.append(_operation_code(str(calculation.operation)))
+
+    def extend(self, calculations: Iterable[Calculation]) -> None:
+        if calculations is self:
+            calculations = list(calculations)
+        for calculation in calculations:
+            self.append(calculation)
+
+    def pop(self, index: int = -1) -> Calculation:
+        calculation = self[index]
+        del self[index]
+        return calculation
+
+    def clear(self) -> None:
+        del self[:]
+
+    def copy(self) -> 'ColumnarHistory':
+        return self[:]
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, (list, tuple, ColumnarHistory)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __repr__(self) -> str:
+        return f"ColumnarHistory({len(self)} calculations)"
@@ -1,4 +1,7 @@
 import os
+
+import anyio
+from fastapi import Depends
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 
@@ -36,14 +39,35 @@ Base = declarative_base()
 
 # Production DB
 SQLALCHEMY_DATABASE_URL = "sqlite:///./app.db"
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+POOL_SIZE = int(os.getenv("CALCULATOR_DB_POOL_SIZE", "5"))
+MAX_OVERFLOW = int(os.getenv("CALCULATOR_DB_MAX_OVERFLOW", "10"))
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    pool_size=POOL_SIZE,
+    max_overflow=MAX_OVERFLOW,
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Sync routes run on a threadpool larger than the connection pool, and a
+# request keeps its connection while it waits for a thread again (e.g. to
+# serialize the response). Under load every thread could end up blocked on
+# the pool behind requests that are queued for a thread, until the pool
+# times out. At most one request per pooled connection holds a session;
+# the others wait for a slot on the event loop, where waiting is free.
+MAX_SESSIONS = POOL_SIZE + MAX_OVERFLOW
+_session_slots = anyio.Semaphore(MAX_SESSIONS)
+
 # Test DB (in-memory)
 TestingEngine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=TestingEngine)
 
-def get_db():
+async def session_slot():
+    async with _session_slots:
+        yield
+
+
+def get_db(_slot: None = Depends(session_slot)):
     db = SessionLocal()
     try:
         yield db
@@ -0,0 +1,35 @@
+"""
+Async engine and sessions for the API, used when CALCULATOR_ASYNC_DB is on.
+
+Needs sqlalchemy[asyncio] and the async driver for the database:
+aiosqlite for SQLite, asyncpg for PostgreSQL.
+"""
+import os
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.database import SQLALCHEMY_DATABASE_URL
+
+# Sync drivers and the async driver that replaces each of them
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
+
+def async_database_url(url: str) -> str:
+    """The URL of the same database through its async driver"""
+    scheme, separator, rest = url.partition("://")
+    return _ASYNC_DRIVERS.get(scheme, scheme) + separator + rest
+
+
+ASYNC_DATABASE_URL = os.getenv("CALCULATOR_ASYNC_DATABASE_URL", async_database_url(SQLALCHEMY_DATABASE_URL))
+async_engine = create_async_engine(ASYNC_DATABASE_URL)
+# Objects stay readable after commit, the way routes return them
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,146 @@
+from decimal import Context, Decimal, Overflow, localcontext, getcontext
+from typing import Optional
+
+from app.exceptions import OperationError
+
+# Extra digits carried while computing so the final rounding is correct
+_GUARD_DIGITS = 10
+_MAX_NEWTON_STEPS = 100
+# Largest coefficient size (digits * degree) checked for an exact root
+_MAX_EXACT_CHECK_DIGITS = 4_000
+# Integer degrees above this many bits use exp(ln(value) / degree) instead of
+# Newton iteration; no value Decimal can hold has an exact root that large
+_MAX_NEWTON_DEGREE_BITS = 64
+
+
+def decimal_power(base: Decimal, exponent: Decimal, precision: Optional[int] = None) -> Decimal:
+    """
+    Raise base to exponent, rounded to `precision` significant digits.
+
+    Integer exponents use exponentiation by squaring; other exponents fall
+    back to Decimal's correctly rounded power. Defaults to the precision of
+    the current decimal context.
+    """
+    precision = precision or getcontext().prec
+    try:
+        with localcontext() as ctx:
+            if exponent == exponent.to_integral_value():
+                n = int(exponent)
+                ctx.prec = precision + _GUARD_DIGITS + n.bit_length()
+                result = _power_by_squaring(base, abs(n))
+                if n < 0:
+                    if result == 0:
+                        raise OperationError("Division by zero")
+                    result = 1 / result
+            else:
+                if base < 0:
+                    raise OperationError("Fractional power of negative number is undefined")
+                ctx.prec = precision + _GUARD_DIGITS
+                result = base ** exponent
+            ctx.prec = precision
+            return +result
+    except Overflow:
+        raise OperationError("Result is too large")
+
+
+def decimal_root(value: Decimal, degree: Decimal, precision: Optional[int] = None) -> Decimal:
+    """
+    Return the degree-th root of a non-negative value, rounded to `precision` digits.
+
+    Integer degrees use Newton iteration and return exact roots without
+    trailing zeros; other degrees are computed as value ** (1 / degree),
+    and huge integer degrees through logarithms.
+    """
+    precision = precision or getcontext().prec
+    if value < 0:
+        raise OperationError("Cannot calculate root of negative number")
+    if degree == 0:
+        raise OperationError("Zero root is undefined")
+    if degree != degree.to_integral_value():
+        with localcontext() as ctx:
+            ctx.prec = precision + _GUARD_DIGITS
+            exponent = 1 / degree
+        return decimal_power(value, exponent, precision)
+
+    n = int(degree)
+    if value == 0:
+        if n < 0:
+            raise OperationError("Division by zero")
+        return Decimal(0)
+
+    if abs(n).bit_length() > _MAX_NEWTON_DEGREE_BITS:
+        root = _log_root(value, abs(n), precision)
+    else:
+        root = _newton_root(value, abs(n), precision)
+    if n < 0:
+        with localcontext() as ctx:
+            ctx.prec = precision
+            root = 1 / root
+    return root
+
+
+def _power_by_squaring(base: Decimal, exponent: int) -> Decimal:
+    result = Decimal(1)
+    while exponent:
+        if exponent & 1:
+            result *= base
+        exponent >>= 1
+        if exponent:
+            base *= base
+    return result
+
+
+def _newton_root(value: Decimal, degree: int, precision: int) -> Decimal:
+    if degree == 1:
+        with localcontext() as ctx:
+            ctx.prec = precision
+            return +value
+    with localcontext() as ctx:
+        ctx.prec = precision + _GUARD_DIGITS + degree.bit_length()
+        x = _initial_root(value, degree)
+        # Converged once a step changes x by less than the digits we keep
+        tolerance = Decimal(1).scaleb(x.adjusted() - precision - 2)
+        for _ in range(_MAX_NEWTON_STEPS):
+            following = ((degree - 1) * x + value / _power_by_squaring(x, degree - 1)) / degree
+            converged = abs(following - x) <= tolerance
+            x = following
+            if converged:
+                break
+        ctx.prec = precision
+        root = +x
+    exact = _exact_root(root, value, degree, precision)
+    return exact if exact is not None else root
+
+
+def _log_root(value: Decimal, degree: int, precision: int) -> Decimal:
+    # The estimate for Newton iteration needs the degree as a float, which these overflow
+    with localcontext() as ctx:
+        ctx.prec = precision + _GUARD_DIGITS
+        root = (value.ln() / degree).exp()
+        ctx.prec = precision
+        return +root
+
+
+def _initial_root(value: Decimal, degree: int) -> Decimal:
+    # Estimate from the float mantissa and decimal exponent so huge values do not overflow
+    exponent = value.adjusted()
+    quotient, remainder = divmod(exponent, degree)
+    mantissa = float(value.scaleb(-exponent))
+    return Decimal(mantissa ** (1.0 / degree) * 10.0 ** (remainder / degree)).scaleb(quotient)
+
+
+def _exact_root(root: Decimal, value: Decimal, degree: int, precision: int) -> Optional[Decimal]:
+    """Return root without trailing zeros if it raised to degree is exactly value"""
+    candidate = root.normalize()
+    sign, digits, exponent = candidate.as_tuple()
+    if len(digits) * degree > _MAX_EXACT_CHECK_DIGITS:
+        return None
+    coefficient = int(''.join(map(str, digits)))
+    power = coefficient ** degree
+    exact = Context(prec=len(digits) * degree + 1)
+    if Decimal(power).scaleb(exponent * degree, exact) != value:
+        return None
+    # normalize() turns 100 into 1E+2; keep whole roots that fit the precision in plain notation
+    if 0 < exponent and len(digits) + exponent <= precision:
+        return Decimal(coefficient * 10 ** exponent)
+    return candidate
@@ -0,0 +1,235 @@
+import re
+from dataclasses import dataclass, field
+from decimal import Decimal, localcontext
+from functools import lru_cache
+from typing import Callable, FrozenSet, Iterable, List, Mapping, Optional, Tuple
+
+from app.exceptions import ValidationError
+from app.operations import OperationFactory
+
+# A compiled node takes the variable bindings and the precision for power/root
+Node = Callable[[Mapping[str, Decimal], Optional[int]], Decimal]
+
+_TOKEN = re.compile(r"""
+    \s*(?:
+        (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+      | (?P<name>[A-Za-z_]\w*)
+      | (?P<symbol>//|\*\*|[-+*/%^(),])
+    )""", re.VERBOSE)
+
+# Infix operators and the operation each one maps to
+_ADDITIVE = {'+': 'add', '-': 'subtract'}
+_MULTIPLICATIVE = {'*': 'multiply', '/': 'divide', '//': 'integerdivision', '%': 'modulus'}
+_POWER = ('^', '**')
+
+# Deepest nesting of parentheses, calls, unary signs and powers accepted
+MAX_DEPTH = 100
+
+
+@dataclass(frozen=True)
+class CompiledExpression:
+    """
+    An expression parsed once into nested closures over the operation
+    executors. Evaluating it again with new bindings skips parsing.
+    """
+    text: str
+    variables: FrozenSet[str]
+    constants: Tuple[Decimal, ...]
+    _root: Node = field(repr=False, compare=False)
+
+    def evaluate(self, bindings: Optional[Mapping[str, Decimal]] = None, precision: Optional[int] = None) -> Decimal:
+        """Evaluate with Decimal variable bindings; power and root round to `precision` if given"""
+        return self._root(bindings or {}, precision)
+
+    def evaluate_many(self, bindings: Iterable[Mapping[str, Decimal]], precision: Optional[int] = None) -> List[Decimal]:
+        """Evaluate once per set of bindings"""
+        root = self._root
+        return [root(variables, precision) for variables in bindings]
+
+
+@lru_cache(maxsize=256)
+def compile_expression(text: str) -> CompiledExpression:
+    """
+    Parse an infix expression such as ``power(x, 2) + root(y, 3) / 2``.
+
+    Supports + - * / // % and ^ (or **), unary minus, parentheses, numbers,
+    variables, and every OperationFactory operation called as a two-argument
+    function. Results are cached by expression text.
+    """
+    parser = _Parser(text)
+    root = parser.parse()
+    return CompiledExpression(text, frozenset(parser.variables), tuple(parser.constants), root)
+
+
+def _tokenize(text: str) -> List[Tuple[str, str]]:
+    tokens = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = _TOKEN.match(text, position)
+        if not match:
+            raise ValidationError(f"Invalid expression: unexpected character '{text[position:].lstrip()[0]}'")
+        tokens.append((match.lastgroup, match.group(match.lastgroup)))
+        position = match.end()
+    return tokens
+
+
+def _constant(value: Decimal) -> Node:
+    return lambda variables, precision: value
+
+
+def _variable(name: str) -> Node:
+    def node(variables, precision):
+        try:
+            return variables[name]
+        except KeyError:
+            raise ValidationError(f"Unbound variable: {name}")
+    return node
+
+
+def _negate(operand: Node) -> Node:
+    return lambda variables, precision: -operand(variables, precision)
+
+
+def _executor(name: str) -> Callable[[Decimal, Decimal, Optional[int]], Decimal]:
+    operation = OperationFactory.create_operation(name)
+    execute = operation.execute
+    if not operation.uses_precision:
+        return lambda a, b, precision: execute(a, b)
+
+    def apply(a, b, precision):
+        if precision is None:
+            return execute(a, b)
+        with localcontext(prec=precision):
+            return execute(a, b)
+    return apply
+
+
+def _binary(name: str, left: Node, right: Node) -> Node:
+    apply = _executor(name)
+    return lambda variables, precision: apply(left(variables, precision), right(variables, precision), precision)
+
+
+def _chain(first: Node, steps: List[Tuple[str, Node]]) -> Node:
+    """A left-associative run such as ``a + b - c + ...`` folded in a loop,
+    so long flat expressions do not nest one closure call per term"""
+    if not steps:
+        return first
+    if len(steps) == 1:
+        return _binary(steps[0][0], first, steps[0][1])
+    applied = [(_executor(name), operand) for name, operand in steps]
+
+    def node(variables, precision):
+        value = first(variables, precision)
+        for apply, operand in applied:
+            value = apply(value, operand(variables, precision), precision)
+        return value
+    return node
+
+
+class _Parser:
+    """Recursive descent parser that builds the closures as it goes"""
+
+    def __init__(self, text: str):
+        self.tokens = _tokenize(text)
+        self.position = 0
+        self.depth = 0
+        self.variables = set()
+        self.constants = []
+
+    def parse(self) -> Node:
+        if not self.tokens:
+            raise ValidationError("Invalid expression: empty")
+        node = self.additive()
+        if self.position < len(self.tokens):
+            raise ValidationError(f"Invalid expression: unexpected '{self.tokens[self.position][1]}'")
+        return node
+
+    def peek(self) -> Optional[str]:
+        if self.position < len(self.tokens):
+            return self.tokens[self.position][1]
+        return None
+
+    def take(self) -> Tuple[str, str]:
+        if self.position >= len(self.tokens):
+            raise ValidationError("Invalid expression: unexpected end")
+        token = self.tokens[self.position]
+        self.position += 1
+        return token
+
+    def expect(self, symbol: str) -> None:
+        kind, value = self.take()
+        if value != symbol:
+            raise ValidationError(f"Invalid expression: expected '{symbol}' but found '{value}'")
+
+    def additive(self) -> Node:
+        first = self.multiplicative()
+        steps = []
+        while self.peek() in _ADDITIVE:
+            name = _ADDITIVE[self.take()[1]]
+            steps.append((name, self.multiplicative()))
+        return _chain(first, steps)
+
+    def multiplicative(self) -> Node:
+        first = self.unary()
+        steps = []
+        while self.peek() in _MULTIPLICATIVE:
+            name = _MULTIPLICATIVE[self.take()[1]]
+            steps.append((name, self.unary()))
+        return _chain(first, steps)
+
+    def unary(self) -> Node:
+        # Every nested subexpression is parsed through here
+        if self.depth >= MAX_DEPTH:
+            raise ValidationError(f"Invalid expression: nested more than {MAX_DEPTH} levels deep")
+        self.depth += 1
+        try:
+            return self._unary()
+        finally:
+            self.depth -= 1
+
+    def _unary(self) -> Node:
+        if self.peek() == '-':
+            self.take()
+            return _negate(self.unary())
+        if self.peek() == '+':
+            self.take()
+            return self.unary()
+        return self.power()
+
+    def power(self) -> Node:
+        base = self.atom()
+        if self.peek() in _POWER:
+            self.take()
+            # Right associative and binds tighter than unary minus on its left: -2^2 == -4
+            return _binary('power', base, self.unary())
+        return base
+
+    def atom(self) -> Node:
+        kind, value = self.take()
+        if kind == 'number':
+            number = Decimal(value)
+            self.constants.append(number)
+            return _constant(number)
+        if kind == 'name':
+            if self.peek() == '(':
+                return self.call(value)
+            self.variables.add(value)
+            return _variable(value)
+        if value == '(':
+            node = self.additive()
+            self.expect(')')
+            return node
+        raise ValidationError(f"Invalid expression: unexpected '{value}'")
+
+    def call(self, name: str) -> Node:
+        try:
+            operation = str(OperationFactory.create_operation(name))
+        except ValueError:
+            raise ValidationError(f"Unknown function: {name}")
+        self.expect('(')
+        left = self.additive()
+        self.expect(',')
+        right = self.additive()
+        self.expect(')')
+        return _binary(operation, left, right)
@@ -1,7 +1,14 @@
 from abc import ABC, abstractmethod
+import atexit
 import logging
-from typing import Any
+import queue
+import signal
+import sys
+import threading
+import time
+from typing import Any, Callable, Iterable, List, Optional
 from app.calculation import Calculation
+from app.metrics import AUTOSAVE_REQUESTS_TOTAL, AUTOSAVE_WRITES_TOTAL, HISTORY_SINK_DROPPED_TOTAL
 
 
 class HistoryObserver(ABC):
@@ -10,6 +17,11 @@ class HistoryObserver(ABC):
         """Handle new calculation"""
         pass # pragma: no cover
 
+    def update_batch(self, calculations: List[Calculation]):
+        """Handle several calculations at once; override to avoid per-item work"""
+        for calculation in calculations:
+            self.update(calculation)
+
 class LoggingObserver(HistoryObserver):
     """Observer that logs calculations to file"""
     def update(self, calculation: Calculation) -> None:
@@ -21,17 +33,352 @@ class LoggingObserver(HistoryObserver):
             f"{calculation.result}"
         )
 
+    def update_batch(self, calculations: List[Calculation]) -> None:
+        logging.info(f"Batch of {len(calculations)} calculations performed")
+
+class AutoSaveScheduler:
+    """Coalesces save requests into fewer writes on a background thread.
+
+    The first request after a write starts the clock; the save runs once
+    `interval` seconds have passed or `max_pending` requests have piled up,
+    whichever comes first. Every save writes the whole current history, so
+    one write covers all the requests before it. Pending requests are
+    flushed on close, which runs at interpreter exit.
+    """
+    def __init__(self, save: Callable[[], None], interval: float = 1.0, max_pending: int = 100):
+        if interval <= 0 or max_pending <= 0:
+            raise ValueError("interval and max_pending must be positive")
+        self.interval = interval
+        self.max_pending = max_pending
+        self.requests = 0
+        self.writes = 0
+        self.failures = 0
+        self._save = save
+        self._pending = 0
+        self._deadline: Optional[float] = None
+        self._closed = False
+        self._condition = threading.Condition()
+        self._save_lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+
+    @property
+    def coalesced(self) -> int:
+        """Writes avoided compared with saving on every request"""
+        return self.requests - self.writes - self._pending - self.failures
+
+    def request(self) -> None:
+        """Ask for a save; returns immediately"""
+        with self._condition:
+            self.requests += 1
+            self._pending += 1
+            AUTOSAVE_REQUESTS_TOTAL.inc()
+            started = self._deadline is None
+            if started:
+                self._deadline = time.monotonic() + self.interval
+            if self._worker is None and not self._closed:
+                self._worker = threading.Thread(target=self._run, name="autosave", daemon=True)
+                self._worker.start()
+                atexit.register(self.close)
+            # The worker waits without a timeout while nothing is pending
+            if started or self._pending >= self.max_pending:
+                self._condition.notify()
+
+    def flush(self) -> bool:
+        """Save now if anything is pending; returns whether a write happened"""
+        with self._save_lock:
+            with self._condition:
+                if not self._pending:
+                    return False
+                pending = self._pending
+                self._pending = 0
+                self._deadline = None
+            try:
+                self._save()
+            except Exception as e:
+                self.failures += pending
+                logging.error(f"Autosave failed: {e}")
+                return False
+            self.writes += 1
+            AUTOSAVE_WRITES_TOTAL.inc()
+            return True
+
+    def close(self) -> None:
+        """Stop the worker and write whatever is still pending"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+            worker = self._worker
+        if worker is not None and worker is not threading.current_thread():
+            worker.join()
+        self.flush()
+        if self.requests:
+            logging.info(
+                f"Autosave wrote {self.writes} times for {self.requests} requests "
+                f"({self.coalesced} writes coalesced)"
+            )
+
+    def _due(self) -> bool:
+        return self._pending >= self.max_pending or (
+            self._deadline is not None and time.monotonic() >= self._deadline)
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._closed and not self._due():
+                    timeout = None if self._deadline is None else self._deadline - time.monotonic()
+                    self._condition.wait(timeout)
+                if self._closed:
+                    return
+            self.flush()
+
+
 class AutoSaveObserver(HistoryObserver):
-    """Observer that automatically saves calculations"""
+    """Observer that automatically saves calculations.
+
+    With a positive autosave_interval in the config, full saves go through
+    an AutoSaveScheduler instead of happening on every calculation.
+    """
     def __init__(self, calculator: Any):
         if not hasattr(calculator, 'config') or not hasattr(calculator, 'save_history'):
             raise TypeError("Calculator must have config and save history attributes")
         self.calculator = calculator
+        self.scheduler: Optional[AutoSaveScheduler] = None
+        interval = getattr(calculator.config, 'autosave_interval', 0)
+        if interval:
+            self.scheduler = AutoSaveScheduler(
+                calculator.save_history,
+                interval,
+                getattr(calculator.config, 'autosave_max_pending', 100)
+            )
+
+    def _save(self) -> None:
+        if self.scheduler is not None:
+            self.scheduler.request()
+        else:
+            self.calculator.save_history()
+
+    def flush(self) -> None:
+        """Write any save the scheduler is still holding back"""
+        if self.scheduler is not None:
+            self.scheduler.flush()
 
     def update(self, calculation: Calculation) -> None:
         """ Observer to trigger autosave"""
         if calculation is None:
             raise AttributeError("Calculation cannot be None")
         if self.calculator.config.auto_save:
-            self.calculator.save_history()
-            logging.info("History auto-saved")
\ No newline at end of file
+            if getattr(self.calculator.config, 'history_journal', False):
+                # Journal mode only writes the new record instead of the whole history
+                self.calculator.append_history(calculation)
+            else:
+                self._save()
+            logging.info("History auto-saved")
+
+    def update_batch(self, calculations: List[Calculation]) -> None:
+        """ Save once for a whole batch"""
+        if not calculations:
+            return
+        if self.calculator.config.auto_save:
+            if getattr(self.calculator.config, 'history_journal', False):
+                for calculation in calculations:
+                    self.calculator.append_history(calculation)
+            else:
+                self._save()
+            logging.info(f"History auto-saved after batch of {len(calculations)}")
+
+
+def exit_on_signals(signals: Optional[Iterable[int]] = None) -> None:
+    """Turn termination signals (SIGTERM and SIGHUP by default) into a normal
+    exit so atexit flushes still run. Handlers someone else installed are
+    left alone, and signals the platform lacks, like SIGHUP on Windows, are skipped."""
+    if threading.current_thread() is not threading.main_thread():
+        return
+    if signals is None:
+        signals = (getattr(signal, name, None) for name in ('SIGTERM', 'SIGHUP'))
+    for signum in signals:
+        if signum is not None and signal.getsignal(signum) == signal.SIG_DFL:
+            signal.signal(signum, lambda number, frame: sys.exit(128 + number))
+
+
+class QueuedHistorySink:
+    """Records calculations into a calculator from a single background thread.
+
+    Callers only put the calculation on a queue, so request handlers never
+    share or lock the calculator's history; the worker drains whatever has
+    queued up and records it as one batch. The queue is bounded: when
+    recording falls behind, 'block' makes callers wait and 'drop' discards
+    the calculation and counts it.
+    """
+    BACKPRESSURE_MODES = ('block', 'drop')
+
+    def __init__(
+            self,
+            calculator: Any,
+            max_batch: int = 1000,
+            max_queue: int = 10000,
+            backpressure: str = 'block'
+    ):
+        if not hasattr(calculator, 'record_many'):
+            raise TypeError("Calculator must have a record_many method")
+        if backpressure not in self.BACKPRESSURE_MODES:
+            raise ValueError(f"Unknown backpressure mode: {backpressure}")
+        self.calculator = calculator
+        self.max_batch = max_batch
+        self.backpressure = backpressure
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._worker: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def submit(self, calculation: Calculation) -> None:
+        """Queue a calculation to be recorded"""
+        if self._worker is None:
+            self._start()
+        if self.backpressure == 'block':
+            self._queue.put(calculation)
+            return
+        try:
+            self._queue.put_nowait(calculation)
+        except queue.Full:
+            self.dropped += 1
+            HISTORY_SINK_DROPPED_TOTAL.inc()
+            logging.warning("History sink queue full, dropped a calculation")
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until everything submitted so far has been recorded"""
+        if self._worker is None:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self) -> None:
+        """Record what is queued and stop the worker; a later submit restarts it"""
+        with self._start_lock:
+            if self._worker is not None:
+                self._queue.put(None)
+                self._worker.join()
+                self._worker = None
+
+    def _start(self) -> None:
+        with self._start_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="history-sink", daemon=True)
+                self._worker.start()
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            batch: List[Calculation] = []
+            waiters: List[threading.Event] = []
+            item = self._queue.get()
+            while True:
+                if item is None:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    batch.append(item)
+                if stop or len(batch) >= self.max_batch:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                try:
+                    self.calculator.record_many(batch)
+                except Exception as e:
+                    logging.error(f"Failed to record {len(batch)} calculations: {e}")
+            for waiter in waiters:
+                waiter.set()
+
+
+
+class AsyncObserverBus:
+    """Delivers calculations to observers from a background thread.
+
+    Notifications go on a bounded queue so slow observers (like autosave
+    doing disk I/O) do not add to operation latency. Everything waiting on
+    the queue is handed to each observer through update_batch, so observers
+    that override it receive whole batches. When the queue is full,
+    'block' makes the caller wait and 'drop' discards the notification.
+    """
+    BACKPRESSURE_MODES = ('block', 'drop')
+
+    def __init__(
+            self,
+            observers: List[HistoryObserver],
+            max_queue: int = 1000,
+            backpressure: str = 'block',
+            max_batch: int = 100
+    ):
+        if backpressure not in self.BACKPRESSURE_MODES:
+            raise ValueError(f"Unknown backpressure mode: {backpressure}")
+        self.observers = observers
+        self.backpressure = backpressure
+        self.max_batch = max_batch
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._worker: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def publish(self, calculations: List[Calculation]) -> None:
+        """Queue calculations for delivery to every observer"""
+        if self._worker is None:
+            self._start()
+        if self.backpressure == 'block':
+            self._queue.put(calculations)
+            return
+        try:
+            self._queue.put_nowait(calculations)
+        except queue.Full:
+            self.dropped += len(calculations)
+            logging.warning(f"Observer queue full, dropped {len(calculations)} notifications")
+
+    def flush(self) -> None:
+        """Block until every queued notification has been delivered"""
+        if self._worker is not None:
+            self._queue.join()
+
+    def close(self) -> None:
+        """Deliver what is queued and stop the worker"""
+        with self._start_lock:
+            if self._worker is not None:
+                self._queue.put(None)
+                self._worker.join()
+                self._worker = None
+
+    def _start(self) -> None:
+        with self._start_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="observer-bus", daemon=True)
+                self._worker.start()
+                atexit.register(self.close)
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            items = [self._queue.get()]
+            while len(items) < self.max_batch:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            batch: List[Calculation] = []
+            for item in items:
+                if item is None:
+                    stop = True
+                else:
+                    batch.extend(item)
+            if batch:
+                self._deliver(batch)
+            for _ in items:
+                self._queue.task_done()
+
+    def _deliver(self, batch: List[Calculation]) -> None:
+        for observer in list(self.observers):
+            try:
+                observer.update_batch(batch)
+            except Exception as e:
+                logging.error(f"Observer {observer.__class__.__name__} failed: {e}")
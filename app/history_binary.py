@@ -0,0 +1,232 @@
+import csv
+import mmap
+import os
+import struct
+from collections.abc import Sequence
+from decimal import Context, Decimal
+from pathlib import Path
+from typing import Iterable, Iterator, List, Union
+
+import numpy as np
+import pandas as pd
+
+from app.calculation import Calculation
+from app.columnar_history import timestamp_ns
+from app.exceptions import OperationError
+from app.history_journal import HISTORY_FIELDS, calculation_row
+
+MAGIC = b"CALCHIST"
+VERSION = 1
+
+# magic, version, record size, operation names length, record count, heap length
+_HEADER = struct.Struct("<8sHHIQQ")
+
+# A Decimal is a signed 128-bit coefficient split in two 64-bit halves and an
+# int32 exponent. Values that do not fit are stored as text in the heap at the
+# end of the file; their low half is the heap offset and high half the length.
+_VALUE_FIELDS = ("lo", "hi", "exp")
+RECORD = np.dtype([
+    ("operation", "<u2"),
+    ("timestamp", "<i8"),
+    *((f"{column}_{part}", kind)
+      for column in ("operand1", "operand2", "result")
+      for part, kind in zip(_VALUE_FIELDS, ("<u8", "<i8", "<i4"))),
+])
+
+_HEAP = -2 ** 31  # exponent marker for values stored as text
+_MAX_DIGITS = 38
+_EXACT = Context(prec=_MAX_DIGITS)
+_LOW_MASK = 2 ** 64 - 1
+_CHUNK = 10_000
+
+
+def _records_offset(names_length: int) -> int:
+    # Keep the records 8-byte aligned so the int64 columns map cleanly
+    return (_HEADER.size + names_length + 7) // 8 * 8
+
+
+def _encode_values(values: Iterable[Decimal], heap: bytearray):
+    lows, highs, exponents = [], [], []
+    for value in values:
+        # Parsing the plain string form is about twice as fast as as_tuple()
+        text = str(value)
+        negative = text.startswith("-")
+        point = text.find(".")
+        digits = text[negative:] if point < 0 else text[negative:point] + text[point + 1:]
+        # Scientific notation, specials, negative zero and long values go to the heap
+        if len(digits) <= _MAX_DIGITS and digits.isdigit() and not (negative and not digits.strip("0")):
+            coefficient = -int(digits) if negative else int(digits)
+            lows.append(coefficient & _LOW_MASK)
+            highs.append(coefficient >> 64)
+            exponents.append(0 if point < 0 else point + 1 - len(text))
+        else:
+            encoded = text.encode("ascii")
+            lows.append(len(heap))
+            highs.append(len(encoded))
+            exponents.append(_HEAP)
+            heap += encoded
+    return lows, highs, exponents
+
+
+def write_binary_history(path: Path, calculations: Sequence) -> int:
+    """
+    Write calculations to a binary history file, replacing it atomically.
+    Returns the number of records written.
+    """
+    names: List[str] = []
+    codes = {}
+    operations, timestamps = [], []
+    columns = ([], [], [])
+    for calculation in calculations:
+        name = str(calculation.operation)
+        code = codes.get(name)
+        if code is None:
+            code = codes[name] = len(names)
+            names.append(name)
+        operations.append(code)
+        timestamps.append(timestamp_ns(calculation.timestamp))
+        columns[0].append(calculation.operand1)
+        columns[1].append(calculation.operand2)
+        columns[2].append(calculation.result)
+
+    records = np.zeros(len(operations), dtype=RECORD)
+    records["operation"] = operations
+    records["timestamp"] = timestamps
+    heap = bytearray()
+    for column, values in zip(("operand1", "operand2", "result"), columns):
+        for part, encoded in zip(_VALUE_FIELDS, _encode_values(values, heap)):
+            records[f"{column}_{part}"] = encoded
+
+    encoded_names = "\n".join(names).encode("utf-8")
+    padding = _records_offset(len(encoded_names)) - _HEADER.size - len(encoded_names)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(path.name + ".tmp")
+    with open(temp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, RECORD.itemsize, len(encoded_names), len(records), len(heap)))
+        f.write(encoded_names)
+        f.write(b"\0" * padding)
+        f.write(records.tobytes())
+        f.write(heap)
+    os.replace(temp_path, path)
+    return len(records)
+
+
+class BinaryHistoryFile(Sequence):
+    """
+    Read-only view of a binary history file through mmap.
+
+    Records are fixed width, so indexing or slicing decodes only the
+    records asked for and the operating system pages in only the parts of
+    the file that are touched.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        with open(path, "rb") as f:
+            try:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise OperationError(f"Not a binary history file: {path}")
+        try:
+            self._open()
+        except Exception:
+            self.close()
+            raise
+
+    def _open(self) -> None:
+        if len(self._mmap) < _HEADER.size:
+            raise OperationError(f"Not a binary history file: {self.path}")
+        magic, version, record_size, names_length, count, heap_length = _HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            raise OperationError(f"Not a binary history file: {self.path}")
+        if version != VERSION or record_size != RECORD.itemsize:
+            raise OperationError(f"Unsupported binary history version {version} in {self.path}")
+        names = self._mmap[_HEADER.size:_HEADER.size + names_length].decode("utf-8")
+        self.operations = names.split("\n") if names else []
+        offset = _records_offset(names_length)
+        self._heap_offset = offset + count * RECORD.itemsize
+        if len(self._mmap) < self._heap_offset + heap_length:
+            raise OperationError(f"Truncated binary history file: {self.path}")
+        self._records = np.frombuffer(self._mmap, dtype=RECORD, count=count, offset=offset)
+
+    def __enter__(self) -> 'BinaryHistoryFile':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        # The record array borrows the mapping, so drop it before unmapping
+        self._records = None
+        if not self._mmap.closed:
+            self._mmap.close()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return self._decode(self._records[index])
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("history index out of range")
+        return self._decode(self._records[index:index + 1])[0]
+
+    def __iter__(self) -> Iterator[Calculation]:
+        for start in range(0, len(self), _CHUNK):
+            yield from self._decode(self._records[start:start + _CHUNK])
+
+    def calculations(self) -> List[Calculation]:
+        """Decode every record"""
+        return self._decode(self._records)
+
+    def _values(self, records, column: str) -> List[Decimal]:
+        values = []
+        heap = self._mmap
+        for low, high, exponent in zip(*(records[f"{column}_{part}"].tolist() for part in _VALUE_FIELDS)):
+            if exponent == _HEAP:
+                start = self._heap_offset + low
+                values.append(Decimal(heap[start:start + high].decode("ascii")))
+            else:
+                values.append(Decimal((high << 64) | low).scaleb(exponent, _EXACT))
+        return values
+
+    def _decode(self, records) -> List[Calculation]:
+        names = self.operations
+        return [
+            Calculation(
+                operation=names[code],
+                operand1=operand1,
+                operand2=operand2,
+                result=result,
+                timestamp=timestamp
+            )
+            for code, timestamp, operand1, operand2, result in zip(
+                records["operation"].tolist(),
+                # numpy turns datetime64[us] into naive datetimes without a Python loop
+                (records["timestamp"] // 1000).astype("datetime64[us]").tolist(),
+                self._values(records, "operand1"),
+                self._values(records, "operand2"),
+                self._values(records, "result"),
+            )
+        ]
+
+
+def csv_to_binary(csv_path: Path, binary_path: Path) -> int:
+    """Convert a history CSV in the save_history layout to the binary format"""
+    df = pd.read_csv(csv_path, dtype=str, keep_default_na=False)
+    calculations = Calculation.from_columns(*(df[column].astype(str).tolist() for column in HISTORY_FIELDS))
+    return write_binary_history(binary_path, calculations)
+
+
+def binary_to_csv(binary_path: Path, csv_path: Path) -> int:
+    """Convert a binary history file back to the CSV layout load_history reads"""
+    temp_path = csv_path.with_name(csv_path.name + ".tmp")
+    with BinaryHistoryFile(binary_path) as history, open(temp_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(HISTORY_FIELDS)
+        writer.writerows(calculation_row(calculation) for calculation in history)
+        count = len(history)
+    os.replace(temp_path, csv_path)
+    return count
@@ -0,0 +1,229 @@
+import operator
+import re
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.calculation import Calculation
+from app.exceptions import ValidationError
+
+# Filter names accepted by parse_filter and the attribute each one reads
+FILTER_FIELDS = {
+    'op': 'operation',
+    'a': 'operand1',
+    'b': 'operand2',
+    'result': 'result',
+    'time': 'timestamp',
+}
+
+_FILTER = re.compile(r"^\s*(?P<name>[a-z]+)\s*(?P<comparison>>=|<=|=|>|<)\s*(?P<value>\S.*?)\s*$", re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class HistoryFilter:
+    """
+    Condition on one calculation attribute: equal to an operation name, or a
+    numeric or time range with inclusive or exclusive bounds.
+    """
+    field: str
+    low: Any = None
+    high: Any = None
+    include_low: bool = True
+    include_high: bool = True
+
+    def matches(self, calculation: Calculation) -> bool:
+        return self.contains(getattr(calculation, self.field))
+
+    def contains(self, value: Any) -> bool:
+        if self.low is not None and (value < self.low if self.include_low else value <= self.low):
+            return False
+        if self.high is not None and (value > self.high if self.include_high else value >= self.high):
+            return False
+        return True
+
+    def intersect(self, other: 'HistoryFilter') -> 'HistoryFilter':
+        """The filter matching what both this and another filter on the same field match"""
+        low, include_low = self.low, self.include_low
+        if other.low is not None and (low is None or other.low > low or (other.low == low and not other.include_low)):
+            low, include_low = other.low, other.include_low
+        high, include_high = self.high, self.include_high
+        if other.high is not None and (high is None or other.high < high
+                                       or (other.high == high and not other.include_high)):
+            high, include_high = other.high, other.include_high
+        return HistoryFilter(self.field, low, high, include_low, include_high)
+
+
+def parse_filter(text: str) -> HistoryFilter:
+    """Parse a filter such as ``op=add``, ``result>=10`` or ``time<2025-01-01T12:00``"""
+    match = _FILTER.match(text)
+    if not match or match.group('name').lower() not in FILTER_FIELDS:
+        raise ValidationError(f"Invalid filter: {text} (use {', '.join(FILTER_FIELDS)} with =, <, <=, >, >=)")
+    field = FILTER_FIELDS[match.group('name').lower()]
+    comparison = match.group('comparison')
+    raw = match.group('value')
+
+    if field == 'operation':
+        if comparison != '=':
+            raise ValidationError(f"Invalid filter: {text} (operations only support =)")
+        return HistoryFilter(field, raw.lower(), raw.lower())
+    try:
+        value = datetime.fromisoformat(raw) if field == 'timestamp' else Decimal(raw)
+    except (ValueError, InvalidOperation):
+        raise ValidationError(f"Invalid filter value: {raw}")
+    if field == 'timestamp' and value.tzinfo is not None:
+        # Calculations are stamped in naive local time
+        value = value.astimezone().replace(tzinfo=None)
+
+    if comparison == '=':
+        return HistoryFilter(field, value, value)
+    if comparison in ('>', '>='):
+        return HistoryFilter(field, low=value, include_low=comparison == '>=')
+    return HistoryFilter(field, high=value, include_high=comparison == '<=')
+
+
+def _same(a: Calculation, b: Calculation) -> bool:
+    return a == b and a.timestamp == b.timestamp
+
+
+class HistoryIndex:
+    """
+    Indexes over a history list, built the first time a query needs them.
+
+    Operation names map to their positions; every other field gets a
+    sorted list of (value, position) pairs searched with bisect, so a
+    query costs a logarithmic lookup plus the matches it returns.
+    Appending calculations extends the built indexes in place.
+
+    Positions are absolute: `evicted` returns how many calculations have
+    been dropped from the front of the history so far, and entries below
+    that count are skipped at query time. Evictions therefore keep the
+    indexes; they are compacted once the stale entries outnumber the live
+    ones. Without `evicted`, changing the first entry forces a rebuild.
+    Any other change (undo, loading) is detected on the next query and
+    the indexes are rebuilt lazily.
+    """
+
+    def __init__(self, history: Sequence[Calculation], evicted: Optional[Callable[[], int]] = None):
+        self.history = history
+        self.evicted = evicted
+        self._reset()
+
+    def _reset(self, base: int = 0) -> None:
+        # Absolute positions of the first indexed entry, the first live one
+        # and the one after the last indexed entry
+        self._start = self._base = self._end = base
+        self._first: Optional[Calculation] = None
+        self._last: Optional[Calculation] = None
+        self._operations: Optional[Dict[str, List[int]]] = None
+        self._sorted: Dict[str, Tuple[List[Any], List[int]]] = {}
+
+    def _sync(self) -> None:
+        history = self.history
+        base = self.evicted() if self.evicted is not None else 0
+        live = self._end - base
+        if (live <= 0 or live > len(history)
+                or not _same(history[live - 1], self._last)
+                or (self.evicted is None and not _same(history[0], self._first))
+                or base - self._start > live):
+            self._reset(base)
+        self._base = base
+        covered = self._end - base
+        if covered == len(history):
+            return
+        added = history[covered:]
+        if self._operations is not None:
+            for position, calculation in enumerate(added, self._end):
+                self._operations.setdefault(str(calculation.operation), []).append(position)
+        for field, (keys, positions) in self._sorted.items():
+            for position, calculation in enumerate(added, self._end):
+                value = getattr(calculation, field)
+                index = bisect_right(keys, value)
+                keys.insert(index, value)
+                positions.insert(index, position)
+        self._end = base + len(history)
+        self._first = history[0]
+        self._last = history[-1]
+
+    def _indexed(self) -> Sequence[Calculation]:
+        return self.history[:self._end - self._base]
+
+    def _operation_index(self) -> Dict[str, List[int]]:
+        if self._operations is None:
+            operations: Dict[str, List[int]] = {}
+            for position, calculation in enumerate(self._indexed(), self._base):
+                operations.setdefault(str(calculation.operation), []).append(position)
+            self._operations = operations
+        return self._operations
+
+    def _sorted_index(self, field: str) -> Tuple[List[Any], List[int]]:
+        index = self._sorted.get(field)
+        if index is None:
+            getter = operator.attrgetter(field)
+            pairs = sorted(
+                ((getter(calculation), position)
+                 for position, calculation in enumerate(self._indexed(), self._base)),
+                key=operator.itemgetter(0)
+            )
+            index = self._sorted[field] = ([value for value, _ in pairs], [position for _, position in pairs])
+        return index
+
+    def _range(self, history_filter: HistoryFilter) -> Tuple[List[int], int, int]:
+        """The positions list of an index and the bounds of the slice matching one filter"""
+        if history_filter.field == 'operation':
+            if history_filter.low != history_filter.high:
+                return [], 0, 0
+            positions = self._operation_index().get(history_filter.low, [])
+            return positions, 0, len(positions)
+        keys, positions = self._sorted_index(history_filter.field)
+        start, stop = 0, len(keys)
+        if history_filter.low is not None:
+            bound = bisect_left if history_filter.include_low else bisect_right
+            start = bound(keys, history_filter.low)
+        if history_filter.high is not None:
+            bound = bisect_right if history_filter.include_high else bisect_left
+            stop = bound(keys, history_filter.high)
+        return positions, start, max(start, stop)
+
+    def candidates(self, history_filter: HistoryFilter) -> List[int]:
+        """Positions matching one filter, in history order"""
+        self._sync()
+        positions, start, stop = self._range(history_filter)
+        base = self._base
+        if history_filter.field == 'operation':
+            # Operation lists are in position order, so evicted entries lead
+            return [position - base for position in positions[bisect_left(positions, base, start, stop):stop]]
+        return sorted(position - base for position in positions[start:stop] if position >= base)
+
+    def query(self, filters: Sequence[HistoryFilter] = (), start: int = 0,
+              count: Optional[int] = None) -> Tuple[int, List[int]]:
+        """
+        Return how many calculations match every filter and the positions
+        of the matches from `start` to `start + count`, in history order.
+        """
+        self._sync()
+        stop = None if count is None else start + count
+        if not filters:
+            total = len(self.history)
+            return total, list(range(total)[start:stop])
+
+        # One range per field, so a<=5 a>=2 is a single index lookup
+        merged: Dict[str, HistoryFilter] = {}
+        for history_filter in filters:
+            current = merged.get(history_filter.field)
+            merged[history_filter.field] = history_filter if current is None else current.intersect(history_filter)
+        filters = list(merged.values())
+
+        # Drive the query from the most selective index and check the rest directly
+        ranges = [self._range(history_filter) for history_filter in filters]
+        driver = min(range(len(filters)), key=lambda i: ranges[i][2] - ranges[i][1])
+        positions = self.candidates(filters[driver])
+        others = [history_filter for i, history_filter in enumerate(filters) if i != driver]
+        if others:
+            history = self.history
+            positions = [
+                position for position in positions
+                if all(history_filter.matches(history[position]) for history_filter in others)
+            ]
+        return len(positions), positions[start:stop]
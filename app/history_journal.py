@@ -0,0 +1,180 @@
+import csv
+import logging
+import threading
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from app.calculation import Calculation
+from app.exceptions import OperationError
+
+HISTORY_FIELDS = ['operation', 'operand1', 'operand2', 'result', 'timestamp']
+
+
+def calculation_row(calculation: Calculation) -> List[str]:
+    """
+    Return a calculation as a row in the history CSV layout
+    """
+    return [
+        str(calculation.operation),
+        str(calculation.operand1),
+        str(calculation.operand2),
+        str(calculation.result),
+        calculation.timestamp.isoformat()
+    ]
+
+
+def append_history_rows(path: Path, rows: Iterable[List[str]]) -> int:
+    """
+    Append rows to a history CSV file, writing the header if the file is new
+    """
+    write_header = not path.exists() or path.stat().st_size == 0
+    written = 0
+    with open(path, 'a', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        if write_header:
+            writer.writerow(HISTORY_FIELDS)
+        for row in rows:
+            writer.writerow(row)
+            written += 1
+    return written
+
+
+class ArchiveWatermark:
+    """
+    Number of leading calculations in the saved history that are already in
+    the archive, kept in a small file next to the archive.
+
+    Calculations evicted at runtime are archived before the saved history is
+    rewritten without them, so a load skips this many rows instead of
+    archiving them again. Rewriting the saved history resets it to zero.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    def get(self) -> int:
+        try:
+            return max(int(self.path.read_text(encoding='utf-8')), 0)
+        except FileNotFoundError:
+            return 0
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable archive watermark {self.path}: {e}")
+            return 0
+
+    def set(self, count: int) -> None:
+        """
+        Record that the first `count` saved calculations are archived
+        """
+        if count:
+            self.path.write_text(str(count), encoding='utf-8')
+        else:
+            self.path.unlink(missing_ok=True)
+
+    def advance(self, count: int) -> None:
+        """
+        Record that `count` more saved calculations were archived
+        """
+        self.set(self.get() + count)
+
+
+class HistoryJournal:
+    """
+    Append-only journal of calculations not yet merged into the history file.
+
+    Each calculation is appended as a single CSV row, so recording costs the
+    same no matter how long the history is. Once the journal reaches the
+    compaction threshold its rows are appended to the main history file on
+    a background thread.
+    """
+
+    def __init__(self, history_file: Path, journal_file: Path, compact_threshold: int = 1000):
+        self.history_file = history_file
+        self.journal_file = journal_file
+        self.compacting_file = journal_file.with_name(journal_file.name + ".compacting")
+        self.compact_threshold = compact_threshold
+        self.lock = threading.RLock()
+        self._pending = None
+        self._compaction: Optional[threading.Thread] = None
+
+    def pending_files(self) -> List[Path]:
+        """
+        Journal files holding rows that are not in the history file yet, oldest first
+        """
+        return [path for path in (self.compacting_file, self.journal_file) if path.exists()]
+
+    def append(self, calculation: Calculation) -> None:
+        """
+        Append one calculation to the journal
+        """
+        try:
+            with self.lock:
+                if self._pending is None:
+                    self._pending = self._count_rows(self.journal_file)
+                append_history_rows(self.journal_file, [calculation_row(calculation)])
+                self._pending += 1
+                should_compact = self._pending >= self.compact_threshold
+        except OSError as e:
+            logging.error(f"Failed to append to history journal: {e}")
+            raise OperationError(f"Failed to append to history journal: {e}")
+
+        if should_compact:
+            self.compact_async()
+
+    def compact(self) -> int:
+        """
+        Merge the journal into the history file and return the number of rows merged
+        """
+        with self.lock:
+            if self.journal_file.exists() and not self.compacting_file.exists():
+                self.journal_file.replace(self.compacting_file)
+                self._pending = 0
+            if not self.compacting_file.exists():
+                return 0
+
+            with open(self.compacting_file, newline='', encoding='utf-8') as f:
+                reader = csv.reader(f)
+                next(reader, None)
+                merged = append_history_rows(self.history_file, reader)
+            self.compacting_file.unlink()
+
+        logging.info(f"Compacted {merged} journal entries into {self.history_file}")
+        return merged
+
+    def compact_async(self) -> threading.Thread:
+        """
+        Run compaction on a background thread unless one is already running
+        """
+        with self.lock:
+            if self._compaction is None or not self._compaction.is_alive():
+                self._compaction = threading.Thread(target=self._compact_quietly, daemon=True)
+                self._compaction.start()
+            return self._compaction
+
+    def wait(self) -> None:
+        """
+        Wait for a running background compaction to finish
+        """
+        if self._compaction is not None:
+            self._compaction.join()
+
+    def clear(self) -> None:
+        """
+        Drop the journal, used once the history file has been rewritten in full
+        """
+        with self.lock:
+            for path in self.pending_files():
+                path.unlink()
+            self._pending = 0
+
+    def _compact_quietly(self) -> None:
+        try:
+            self.compact()
+        except Exception as e:
+            logging.error(f"Background journal compaction failed: {e}")
+
+    @staticmethod
+    def _count_rows(path: Path) -> int:
+        if not path.exists():
+            return 0
+        with open(path, encoding='utf-8') as f:
+            return max(sum(1 for _ in f) - 1, 0)
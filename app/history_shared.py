@@ -0,0 +1,141 @@
+import csv
+import io
+import threading
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Deque, Iterable, Iterator, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+from app.calculation import Calculation
+from app.exceptions import OperationError
+from app.history_journal import HISTORY_FIELDS, calculation_row
+
+_HEADER = (",".join(HISTORY_FIELDS) + "\n").encode("utf-8")
+
+
+def _decode(lines: List[bytes]) -> List[Calculation]:
+    rows = list(csv.reader(io.StringIO(b"".join(lines).decode("utf-8"))))
+    if not rows:
+        return []
+    return Calculation.from_columns(*zip(*rows))
+
+
+class SharedHistoryFile:
+    """
+    History CSV that several processes append to at the same time.
+
+    Writers never rewrite the file: each one takes an exclusive advisory
+    lock (fcntl.flock on a side file), appends the calculations it has
+    recorded since its last write and releases the lock, so concurrent
+    writers only wait for each other's appends. Every process remembers
+    the byte offset it has read up to; rows past that offset were written
+    by other processes and are handed out by iter_new to merge on load.
+
+    A write has to read past those rows first. They are held for the next
+    iter_new, but only the last `max_incoming`, since loading keeps no
+    more than that many calculations anyway.
+    """
+
+    def __init__(self, path: Path, max_incoming: Optional[int] = None):
+        if fcntl is None:
+            raise OperationError("Shared history needs fcntl file locking, which this platform lacks")
+        self.path = path
+        self.lock_path = path.with_name(path.name + ".lock")
+        self.offset = 0
+        self.lock = threading.RLock()
+        self._pending: List[Calculation] = []
+        self._incoming: Deque[Calculation] = deque(maxlen=max_incoming)
+
+    @contextmanager
+    def locked(self) -> Iterator[None]:
+        """Hold the file lock, excluding other threads and other processes"""
+        with self.lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.lock_path, "a") as lock_file:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def record(self, calculations: Iterable[Calculation]) -> None:
+        """Queue calculations for the next write"""
+        with self.lock:
+            self._pending.extend(calculations)
+
+    def pending(self) -> List[Calculation]:
+        """Calculations recorded by this process but not written yet"""
+        with self.lock:
+            return list(self._pending)
+
+    def write(self) -> int:
+        """Append the queued calculations to the file; returns how many were written"""
+        with self.locked():
+            if not self._pending:
+                return 0
+            # Rows other processes appended since our last read come first in
+            # the file; keep them for the next iter_new
+            for chunk in self._read_after():
+                self._incoming.extend(chunk)
+            buffer = io.StringIO()
+            csv.writer(buffer, lineterminator="\n").writerows(calculation_row(c) for c in self._pending)
+            with open(self.path, "a+b") as f:
+                self._drop_partial_row(f)
+                if f.tell() == 0:
+                    f.write(_HEADER)
+                f.write(buffer.getvalue().encode("utf-8"))
+                self.offset = f.tell()
+            written = len(self._pending)
+            self._pending = []
+            return written
+
+    def iter_new(self, chunk_size: int = 10_000) -> Iterator[List[Calculation]]:
+        """
+        Yield the calculations other processes appended since this one last
+        read or wrote, chunk_size at a time; the first call reads the whole file.
+        """
+        with self.locked():
+            incoming = list(self._incoming)
+            self._incoming.clear()
+            if incoming:
+                yield incoming
+            yield from self._read_after(chunk_size)
+
+    def _read_after(self, chunk_size: int = 10_000) -> Iterator[List[Calculation]]:
+        if not self.path.exists():
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            lines: List[bytes] = []
+            for line in f:
+                # A row without its newline was cut off by a writer that died
+                # mid-append; the next write drops it
+                if not line.endswith(b"\n"):
+                    break
+                if self.offset == 0 and line == _HEADER:
+                    self.offset = len(line)
+                    continue
+                lines.append(line)
+                if len(lines) >= chunk_size:
+                    yield _decode(lines)
+                    self.offset += sum(len(line) for line in lines)
+                    lines = []
+            if lines:
+                yield _decode(lines)
+                self.offset += sum(len(line) for line in lines)
+
+    @staticmethod
+    def _drop_partial_row(f) -> None:
+        end = f.seek(0, 2)
+        if not end:
+            return
+        f.seek(max(end - 4096, 0))
+        tail = f.read()
+        if not tail.endswith(b"\n"):
+            f.truncate(end - len(tail) + tail.rfind(b"\n") + 1)
+        f.seek(0, 2)
@@ -0,0 +1,231 @@
+import sqlite3
+import threading
+from decimal import Decimal
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from app.calculation import Calculation
+from app.history_index import HistoryFilter
+from app.history_journal import calculation_row
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    position INTEGER PRIMARY KEY,
+    operation TEXT NOT NULL,
+    operand1 TEXT NOT NULL,
+    operand2 TEXT NOT NULL,
+    result TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    operand1_value REAL,
+    operand2_value REAL,
+    result_value REAL
+);
+CREATE INDEX IF NOT EXISTS ix_history_operation ON history (operation, position);
+CREATE INDEX IF NOT EXISTS ix_history_timestamp ON history (timestamp);
+CREATE INDEX IF NOT EXISTS ix_history_result_value ON history (result_value);
+CREATE TABLE IF NOT EXISTS history_meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+"""
+
+_COLUMNS = "operation, operand1, operand2, result, timestamp"
+_INSERT = "INSERT OR REPLACE INTO history VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+_SELECT_ROW = f"SELECT {_COLUMNS} FROM history WHERE position = ?"
+_SELECT_FROM = f"SELECT {_COLUMNS} FROM history WHERE position >= ? ORDER BY position"
+_DELETE_FROM = "DELETE FROM history WHERE position >= ?"
+_END = "SELECT COALESCE(MAX(position) + 1, 0) FROM history"
+_GET_START = "SELECT value FROM history_meta WHERE key = 'start'"
+_SET_START = "INSERT OR REPLACE INTO history_meta VALUES ('start', ?)"
+
+# Decimal columns are stored as exact text next to a REAL copy that range
+# filters can use with an index; float() is monotonic, so the REAL
+# comparison never drops a match and the exact check removes the extras.
+_FILTER_COLUMNS = {
+    'operation': 'operation',
+    'timestamp': 'timestamp',
+    'operand1': 'operand1_value',
+    'operand2': 'operand2_value',
+    'result': 'result_value',
+}
+_TEXT_INDEX = {'operand1': 1, 'operand2': 2, 'result': 3}
+
+
+def _row(position: int, calculation: Calculation) -> tuple:
+    return (position, *calculation_row(calculation),
+            float(calculation.operand1), float(calculation.operand2), float(calculation.result))
+
+
+def _decode(rows: Sequence[tuple]) -> List[Calculation]:
+    if not rows:
+        return []
+    return Calculation.from_columns(*zip(*rows))
+
+
+class SQLiteHistoryStore:
+    """
+    History kept in an SQLite table in WAL mode, one row per calculation
+    keyed by its position.
+
+    Rows from `start` on are the live history, mirroring what the
+    calculator holds in memory; rows before it are the archive of
+    calculations evicted from memory. Syncing only rewrites the rows after
+    the first difference, so saving after an append inserts one row and
+    saving after an undo truncates the table.
+    """
+
+    def __init__(self, path: Path, batch_size: int = 1000):
+        self.path = path
+        self.batch_size = batch_size
+        self.lock = threading.RLock()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Transactions are explicit; statements are parameterized and reused
+        # from the connection's prepared statement cache
+        self._connection = sqlite3.connect(str(path), isolation_level=None, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+        self._end = self._connection.execute(_END).fetchone()[0]
+        row = self._connection.execute(_GET_START).fetchone()
+        self._start = row[0] if row else 0
+
+    def close(self) -> None:
+        self._connection.close()
+
+    @property
+    def start(self) -> int:
+        """Position of the first live calculation"""
+        return self._start
+
+    def __len__(self) -> int:
+        """Number of live calculations"""
+        return self._end - self._start
+
+    def _insert(self, position: int, calculations: Iterable[Calculation]) -> int:
+        rows = (_row(position, calculation) for position, calculation in enumerate(calculations, position))
+        written = 0
+        while True:
+            batch = list(islice(rows, self.batch_size))
+            if not batch:
+                return written
+            self._connection.executemany(_INSERT, batch)
+            written += len(batch)
+
+    def load(self, limit: int) -> List[Calculation]:
+        """Return the last `limit` live calculations, archiving any before them"""
+        with self.lock:
+            first = max(self._start, self._end - limit)
+            if first != self._start:
+                self._connection.execute(_SET_START, (first,))
+                self._start = first
+            return _decode(self._connection.execute(_SELECT_FROM, (first,)).fetchall())
+
+    def sync(self, history: Sequence[Calculation]) -> int:
+        """Make the live rows equal to `history`; returns the number of rows written"""
+        with self.lock:
+            start = self._start
+            position = min(self._end, start + len(history))
+            # Walk back over rows replaced since the last sync, e.g. by undo and a new calculation
+            while position > start:
+                row = self._connection.execute(_SELECT_ROW, (position - 1,)).fetchone()
+                if row is not None and list(row) == calculation_row(history[position - 1 - start]):
+                    break
+                position -= 1
+            self._connection.execute("BEGIN")
+            try:
+                if position < self._end:
+                    self._connection.execute(_DELETE_FROM, (position,))
+                written = self._insert(position, history[position - start:])
+                self._connection.execute("COMMIT")
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._end = start + len(history)
+            return written
+
+    def archive(self, calculations: Sequence[Calculation]) -> None:
+        """Move the first live calculations, which memory no longer holds, into the archive"""
+        with self.lock:
+            start = self._start + len(calculations)
+            self._connection.execute("BEGIN")
+            try:
+                self._insert(self._start, calculations)
+                self._connection.execute(_SET_START, (start,))
+                self._connection.execute("COMMIT")
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._start = start
+            self._end = max(self._end, start)
+
+    def iter_chunks(self, chunk_size: int = 10_000, archived: bool = False) -> Iterator[List[Calculation]]:
+        """Yield the live calculations, or the archived ones, in order and chunk_size at a time"""
+        position, stop = (0, self._start) if archived else (self._start, None)
+        while True:
+            with self.lock:
+                if stop is None:
+                    stop = self._end
+                rows = self._connection.execute(
+                    f"SELECT position, {_COLUMNS} FROM history "
+                    f"WHERE position >= ? AND position < ? ORDER BY position LIMIT ?",
+                    (position, stop, chunk_size)
+                ).fetchall()
+            if not rows:
+                return
+            position = rows[-1][0] + 1
+            yield _decode([row[1:] for row in rows])
+
+    def search(
+            self,
+            filters: Sequence[HistoryFilter] = (),
+            start: int = 0,
+            count: Optional[int] = None,
+            include_archive: bool = False
+    ) -> Tuple[int, List[Tuple[int, Calculation]]]:
+        """
+        Return how many saved calculations match every filter and the page
+        of matches from `start` to `start + count` with their positions.
+        Only the matching rows are read.
+        """
+        clauses = ["position >= ?"]
+        params: list = [0 if include_archive else self._start]
+        exact = []
+        for history_filter in filters:
+            column = _FILTER_COLUMNS[history_filter.field]
+            low, high = history_filter.low, history_filter.high
+            if history_filter.field in _TEXT_INDEX:
+                exact.append((_TEXT_INDEX[history_filter.field], history_filter))
+                low = None if low is None else float(low)
+                high = None if high is None else float(high)
+                low_op, high_op = ">=", "<="
+            else:
+                if history_filter.field == 'timestamp':
+                    low = None if low is None else low.isoformat()
+                    high = None if high is None else high.isoformat()
+                low_op = ">=" if history_filter.include_low else ">"
+                high_op = "<=" if history_filter.include_high else "<"
+            if low is not None:
+                clauses.append(f"{column} {low_op} ?")
+                params.append(low)
+            if high is not None:
+                clauses.append(f"{column} {high_op} ?")
+                params.append(high)
+        where = " AND ".join(clauses)
+        stop = None if count is None else start + count
+
+        with self.lock:
+            if not exact:
+                total = self._connection.execute(f"SELECT COUNT(*) FROM history WHERE {where}", params).fetchone()[0]
+                rows = self._connection.execute(
+                    f"SELECT position, {_COLUMNS} FROM history WHERE {where} ORDER BY position LIMIT ? OFFSET ?",
+                    (*params, -1 if count is None else count, start)
+                ).fetchall()
+            else:
+                total = 0
+                rows = []
+                cursor = self._connection.execute(
+                    f"SELECT position, {_COLUMNS} FROM history WHERE {where} ORDER BY position", params)
+                for row in cursor:
+                    if all(history_filter.contains(Decimal(row[1 + index])) for index, history_filter in exact):
+                        if start <= total and (stop is None or total < stop):
+                            rows.append(row)
+                        total += 1
+        return total, list(zip((row[0] for row in rows), _decode([row[1:] for row in rows])))
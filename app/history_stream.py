@@ -0,0 +1,62 @@
+import csv
+import gzip
+import lzma
+import os
+from pathlib import Path
+from typing import IO, Iterable, Iterator, List
+
+import pandas as pd
+
+from app.calculation import Calculation
+from app.history_journal import HISTORY_FIELDS, calculation_row
+
+DEFAULT_CHUNK_SIZE = 10_000
+
+# Compression is picked from the file suffix: history.csv.gz, history.csv.xz
+_COMPRESSION = {'.gz': 'gzip', '.xz': 'xz'}
+_OPENERS = {'gzip': gzip.open, 'xz': lzma.open}
+
+
+def history_compression(path: Path):
+    """The compression used for a history file, or None for plain CSV"""
+    return _COMPRESSION.get(path.suffix.lower())
+
+
+def open_history_file(path: Path, mode: str = 'r', compression=None) -> IO[str]:
+    """Open a history CSV as text, compressing or decompressing on the fly"""
+    compression = compression or history_compression(path)
+    if compression is None:
+        return open(path, mode, newline='', encoding='utf-8')
+    return _OPENERS[compression](path, mode + 't', newline='', encoding='utf-8')
+
+
+def iter_history_chunks(path: Path, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[Calculation]]:
+    """
+    Yield the calculations of a history CSV, plain or compressed, in lists
+    of at most chunk_size, so only one chunk is held in memory at a time.
+    """
+    with pd.read_csv(path, dtype=str, keep_default_na=False, chunksize=chunk_size,
+                     compression=history_compression(path)) as reader:
+        for frame in reader:
+            yield Calculation.from_columns(*(frame[column].tolist() for column in HISTORY_FIELDS))
+
+
+def write_history(path: Path, calculations: Iterable[Calculation]) -> int:
+    """
+    Write calculations to a history CSV, plain or compressed, one row at a
+    time. The file is replaced atomically. Returns the number of rows written.
+    """
+    temp_path = path.with_name(path.name + '.tmp')
+    written = 0
+    try:
+        with open_history_file(temp_path, 'w', history_compression(path)) as f:
+            writer = csv.writer(f, lineterminator='\n')
+            writer.writerow(HISTORY_FIELDS)
+            for calculation in calculations:
+                writer.writerow(calculation_row(calculation))
+                written += 1
+        os.replace(temp_path, path)
+    finally:
+        if temp_path.exists():
+            temp_path.unlink()
+    return written
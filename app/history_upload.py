@@ -0,0 +1,121 @@
+import codecs
+import csv
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import AsyncIterable, AsyncIterator, Dict, List, Optional
+
+from app import models
+from app.exceptions import ValidationError
+from app.history_journal import HISTORY_FIELDS
+
+# REPL operations the web models can store; the others are counted as skipped
+REPL_OPERATION_TYPES = {
+    'add': models.OperationType.ADD,
+    'subtract': models.OperationType.SUBTRACT,
+    'multiply': models.OperationType.MULTIPLY,
+    'divide': models.OperationType.DIVIDE,
+}
+
+_REQUIRED_FIELDS = HISTORY_FIELDS[:4]
+
+# History rows are around a hundred characters; longer lines are rejected
+# rather than buffered while waiting for their newline
+MAX_LINE_LENGTH = 4096
+
+
+class HistoryUpload:
+    """
+    Incremental parser for a history CSV written by the REPL.
+
+    Bytes are fed in as they arrive and only the last, unfinished line is
+    buffered between feeds, and lines longer than MAX_LINE_LENGTH are
+    rejected, so an upload of any size is parsed in constant memory. Rows become insert parameters for models.Calculation; rows with
+    an operation the web models lack, or with values the columns cannot
+    hold, are counted instead.
+    """
+
+    def __init__(self, user_id: int):
+        self.user_id = user_id
+        self.rows = 0
+        self.imported = 0
+        self.invalid = 0
+        self.unsupported: Dict[str, int] = {}
+        self._decoder = codecs.getincrementaldecoder('utf-8-sig')()
+        self._tail = ''
+        self._columns: Optional[Dict[str, int]] = None
+
+    def progress(self) -> dict:
+        return {
+            'rows': self.rows,
+            'imported': self.imported,
+            'invalid': self.invalid,
+            'unsupported': dict(self.unsupported),
+        }
+
+    def feed(self, data: bytes, final: bool = False) -> List[dict]:
+        """Parse the complete lines received so far; returns their insert parameters"""
+        try:
+            text = self._tail + self._decoder.decode(data, final)
+        except UnicodeDecodeError:
+            raise ValidationError("History upload is not UTF-8 text")
+        lines = text.split('\n')
+        self._tail = '' if final else lines.pop()
+        if len(self._tail) > MAX_LINE_LENGTH or any(len(line) > MAX_LINE_LENGTH for line in lines):
+            raise ValidationError(f"History upload has a line longer than {MAX_LINE_LENGTH} characters")
+        records = csv.reader(line.rstrip('\r') for line in lines if line.strip())
+        values = []
+        for record in records:
+            if self._columns is None:
+                self._read_header(record)
+                continue
+            row = self._row(record)
+            if row is not None:
+                values.append(row)
+        if final and self._columns is None:
+            raise ValidationError("History upload is empty")
+        return values
+
+    def _read_header(self, record: List[str]) -> None:
+        columns = {name.strip().lower(): index for index, name in enumerate(record)}
+        missing = [name for name in _REQUIRED_FIELDS if name not in columns]
+        if missing:
+            raise ValidationError(f"History upload is missing columns: {', '.join(missing)}")
+        self._columns = columns
+
+    def _row(self, record: List[str]) -> Optional[dict]:
+        self.rows += 1
+        columns = self._columns
+        try:
+            operation = record[columns['operation']].strip().lower()
+            operation_type = REPL_OPERATION_TYPES.get(operation)
+            if operation_type is None:
+                self.unsupported[operation] = self.unsupported.get(operation, 0) + 1
+                return None
+            a, b, result = (Decimal(record[columns[name]]) for name in ('operand1', 'operand2', 'result'))
+            if not (all(value.is_finite() for value in (a, b, result))
+                    and models.fits_numeric_columns(a, b, result)):
+                raise ValueError(operation)
+            timestamp = record[columns['timestamp']].strip() if 'timestamp' in columns else ''
+            created_at = datetime.fromisoformat(timestamp) if timestamp else datetime.now()
+        except (IndexError, ValueError, InvalidOperation):
+            self.invalid += 1
+            return None
+        return {
+            'a': float(a), 'b': float(b), 'type': operation_type, 'result': float(result),
+            'created_at': created_at, 'user_id': self.user_id,
+        }
+
+
+async def iter_upload_batches(
+        chunks: AsyncIterable[bytes], upload: HistoryUpload, batch_size: int
+) -> AsyncIterator[List[dict]]:
+    """Parse an uploaded body as it streams in, yielding insert parameters batch_size rows at a time"""
+    batch: List[dict] = []
+    async for data in chunks:
+        batch.extend(upload.feed(data))
+        while len(batch) >= batch_size:
+            yield batch[:batch_size]
+            batch = batch[batch_size:]
+    batch.extend(upload.feed(b'', final=True))
+    if batch:
+        yield batch
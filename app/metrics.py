@@ -0,0 +1,317 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+# Upper bounds in seconds, from 10 microseconds to 10 seconds
+DEFAULT_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+def _format_labels(names: Sequence[str], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Shards:
+    """
+    Per-thread dicts of series, so recording never takes a lock.
+    Readers merge the shards of every thread that has recorded something.
+    """
+
+    def __init__(self):
+        self.local = threading.local()
+        self._shards: List[dict] = []
+        self._lock = threading.Lock()
+
+    def mine(self) -> dict:
+        try:
+            return self.local.values
+        except AttributeError:
+            values = self.local.values = {}
+            with self._lock:
+                self._shards.append(values)
+            return values
+
+    def all(self) -> List[dict]:
+        with self._lock:
+            return list(self._shards)
+
+    def clear(self) -> None:
+        for values in self.all():
+            values.clear()
+
+
+class Counter:
+    """Monotonic counter with one series per combination of label values"""
+
+    def __init__(self, registry: 'MetricsRegistry', name: str, help: str, label_names: Sequence[str] = ()):
+        self.registry = registry
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self._shards = _Shards()
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        if not self.registry.enabled:
+            return
+        try:
+            values = self._shards.local.values
+        except AttributeError:
+            values = self._shards.mine()
+        values[labels] = values.get(labels, 0) + amount
+
+    def values(self) -> Dict[Tuple[str, ...], float]:
+        merged: Dict[Tuple[str, ...], float] = {}
+        for shard in self._shards.all():
+            for labels, value in list(shard.items()):
+                merged[labels] = merged.get(labels, 0) + value
+        return merged
+
+    def value(self, *labels: str) -> float:
+        return self.values().get(labels, 0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self.values().items()):
+            lines.append(f"{self.name}{_format_labels(self.label_names, labels)} {value:g}")
+        return lines
+
+    def clear(self) -> None:
+        self._shards.clear()
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram. Observing a value is one bisect and two additions
+    on the calling thread's own series; bucket counts are only merged and
+    made cumulative when read.
+    """
+
+    def __init__(
+            self,
+            registry: 'MetricsRegistry',
+            name: str,
+            help: str,
+            label_names: Sequence[str] = (),
+            buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        self.registry = registry
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._bounds = self.buckets + (float('inf'),)
+        # Each series is a count per bucket (+Inf included) followed by the sum
+        self._shards = _Shards()
+
+    def observe(self, value: float, *labels: str) -> None:
+        if not self.registry.enabled:
+            return
+        try:
+            values = self._shards.local.values
+        except AttributeError:
+            values = self._shards.mine()
+        series = values.get(labels)
+        if series is None:
+            series = values[labels] = [0] * len(self._bounds) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        """Observe how long the block takes"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def _merged(self) -> Dict[Tuple[str, ...], List[float]]:
+        merged: Dict[Tuple[str, ...], List[float]] = {}
+        for shard in self._shards.all():
+            for labels, series in list(shard.items()):
+                total = merged.get(labels)
+                if total is None:
+                    merged[labels] = list(series)
+                else:
+                    merged[labels] = [a + b for a, b in zip(total, series)]
+        return merged
+
+    def count(self, *labels: str) -> int:
+        series = self._merged().get(labels)
+        return sum(series[:-1]) if series else 0
+
+    def total(self, *labels: str) -> float:
+        series = self._merged().get(labels)
+        return series[-1] if series else 0.0
+
+    def quantile(self, fraction: float, *labels: str) -> float:
+        """Upper bound of the bucket holding the given quantile"""
+        series = self._merged().get(labels)
+        if not series:
+            return 0.0
+        target = fraction * sum(series[:-1])
+        seen = 0
+        for bound, count in zip(self._bounds, series):
+            seen += count
+            if seen >= target:
+                return bound
+        return float('inf')
+
+    def series(self) -> List[Tuple[str, ...]]:
+        return sorted(self._merged())
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self._merged().items()):
+            cumulative = 0
+            for bound, count in zip(self._bounds, series):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float('inf') else f'le="{bound:g}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, labels, le)} {cumulative}")
+            label_text = _format_labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{label_text} {series[-1]:.9g}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+    def clear(self) -> None:
+        self._shards.clear()
+
+
+class MetricsRegistry:
+    """Holds the metrics of one process and renders them in Prometheus text format"""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._metrics: Dict[str, object] = {}
+
+    def counter(self, name: str, help: str, label_names: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(self, name, help, label_names))
+
+    def histogram(self, name: str, help: str, label_names: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(self, name, help, label_names, buckets))
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        for metric in self._metrics.values():
+            metric.clear()
+
+    def summary_lines(self) -> List[str]:
+        """Human readable summary of every histogram series, used by the REPL 'stats' command"""
+        lines = []
+        for metric in self._metrics.values():
+            if not isinstance(metric, Histogram):
+                continue
+            for labels in metric.series():
+                count = metric.count(*labels)
+                name = metric.name + (f"[{', '.join(labels)}]" if labels else "")
+                lines.append(
+                    f"{name}: count={count} avg={metric.total(*labels) / count * 1e3:.3f}ms "
+                    f"p50<={metric.quantile(0.5, *labels) * 1e3:g}ms p95<={metric.quantile(0.95, *labels) * 1e3:g}ms"
+                )
+        return lines
+
+
+_enabled_env = os.getenv('CALCULATOR_METRICS', 'true').lower()
+REGISTRY = MetricsRegistry(enabled=_enabled_env == 'true' or _enabled_env == '1')
+
+# The _count of this histogram is the number of successful single evaluations
+OPERATION_SECONDS = REGISTRY.histogram(
+    "calculator_operation_seconds", "Time to validate and execute one operation", ("operation",))
+OPERATION_ERRORS_TOTAL = REGISTRY.counter(
+    "calculator_operation_errors_total", "Operations rejected or failed", ("operation",))
+BATCH_OPERATIONS_TOTAL = REGISTRY.counter(
+    "calculator_batch_operations_total", "Operations evaluated successfully through perform_many", ("operation",))
+RECORD_SECONDS = REGISTRY.histogram(
+    "calculator_record_seconds", "Time to add a calculation to history and notify observers")
+HISTORY_IO_SECONDS = REGISTRY.histogram(
+    "calculator_history_io_seconds", "Time spent reading and writing history files", ("action",))
+AUTOSAVE_REQUESTS_TOTAL = REGISTRY.counter(
+    "calculator_autosave_requests_total", "Calculations that asked for the history to be saved")
+AUTOSAVE_WRITES_TOTAL = REGISTRY.counter(
+    "calculator_autosave_writes_total", "History saves the autosave scheduler actually wrote")
+HISTORY_SINK_DROPPED_TOTAL = REGISTRY.counter(
+    "calculator_history_sink_dropped_total", "Calculations not recorded because the history sink queue was full")
+HTTP_REQUESTS_TOTAL = REGISTRY.counter(
+    "http_requests_total", "HTTP requests by route and status", ("method", "route", "status"))
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "http_request_seconds", "HTTP request latency by route", ("method", "route"))
+DB_QUERY_SECONDS = REGISTRY.histogram(
+    "db_query_seconds", "Database statement latency by statement type", ("statement",))
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request count and latency per route template,
+    so /calculations/1 and /calculations/2 share one series.
+    """
+
+    def __init__(self, app, registry: MetricsRegistry = REGISTRY):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.registry.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = getattr(scope.get("route"), "path", "unmatched")
+            method = scope["method"]
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - start, method, route)
+            HTTP_REQUESTS_TOTAL.inc(method, route, str(status))
+
+
+def instrument_engine(engine) -> None:
+    """Time every statement an SQLAlchemy engine executes"""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _stop(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info["query_start"].pop()
+        DB_QUERY_SECONDS.observe(time.perf_counter() - start, statement.lstrip().split(None, 1)[0].upper())
+
+    @event.listens_for(engine, "handle_error")
+    def _failed(exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("query_start"):
+            connection.info["query_start"].pop()
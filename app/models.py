@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, DateTime, Numeric, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, DateTime, Numeric, DateTime, ForeignKey, Index, Enum as SQLEnum
 from sqlalchemy.orm import declarative_base, relationship
 from datetime import datetime
+from decimal import Decimal
 import enum
 
 Base = declarative_base()
@@ -30,8 +31,33 @@ class Calculation(Base):
     b = Column(Numeric(precision=10, scale=2), nullable=False)
     type = Column(SQLEnum(OperationType), nullable=False)
     result = Column(Numeric(precision=10, scale=2), nullable=False)
-    created_at = Column(DateTime, default=datetime.now)
+    created_at = Column(DateTime, default=datetime.now, nullable=False)
 
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     user = relationship("User", back_populates="calculations")
 
+    # Listing pages through one user's rows in (created_at, id) order,
+    # optionally for one type; result ranges get their own index
+    __table_args__ = (
+        Index("ix_calculations_user_created", "user_id", "created_at", "id"),
+        Index("ix_calculations_user_type_created", "user_id", "type", "created_at", "id"),
+        Index("ix_calculations_user_result", "user_id", "result"),
+    )
+
+
+# Numeric(precision, scale) columns hold values below 10 ** (precision - scale)
+_NUMERIC = Calculation.__table__.c.result.type
+VALUE_LIMIT = Decimal(10) ** (_NUMERIC.precision - _NUMERIC.scale)
+
+
+def fits_numeric_columns(*values) -> bool:
+    """Whether finite values can be stored in the calculation's a, b and result columns"""
+    return all(round(abs(value), _NUMERIC.scale) < VALUE_LIMIT for value in values)
+
+
+def create_indexes(bind) -> None:
+    """Add indexes declared since a table was created; create_all skips existing tables"""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=bind, checkfirst=True)
+
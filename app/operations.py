@@ -1,11 +1,27 @@
 from decimal import Decimal
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+from app.decimal_engine import decimal_power, decimal_root
 from app.exceptions import OperationError
 
 class Operation:
     """Base class for all operations."""
+    # Operations that round to the calculator's configured precision
+    uses_precision = False
+
     def execute(self, a: Decimal, b: Decimal) -> Decimal:
         raise NotImplementedError
 
+    def execute_array(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        """Float kernel applied to whole arrays of operands."""
+        raise NotImplementedError
+
+    def invalid_array(self, a: np.ndarray, b: np.ndarray) -> List[Tuple[np.ndarray, str]]:
+        """Masks of elements execute() would reject, with the matching error message."""
+        return []
+
     def __str__(self) -> str:
         return self.__class__.__name__.replace("Operation", "").lower()
 
@@ -14,16 +30,25 @@ class AddOperation(Operation):
     def execute(self, a: Decimal, b: Decimal) -> Decimal:
         return a + b
 
+    def execute_array(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        return a + b
+
 
 class SubtractOperation(Operation):
     def execute(self, a: Decimal, b: Decimal) -> Decimal:
         return a - b
 
+    def execute_array(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        return a - b
+
 
 class MultiplyOperation(Operation):
     def execute(self, a: Decimal, b: Decimal) -> Decimal:
         return a * b
 
+    def execute_array(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        return a * b
+
 
 class DivideOperation(Operation):
     def execute(self, a: Decimal, b: Decimal) -> Decimal:
@@ -31,27 +56,56 @@ class DivideOperation(Operation):
             raise OperationError("Division by zero")
         return a / b
 
+    def execute_array(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        return a / b
+
+    def invalid_array(self, a: np.ndarray, b: np.ndarray) -> List[Tuple[np.ndarray, str]]:
+        return [(b == 0, "Division by zero")]
+
 
 class PowerOperation(Operation):
+    uses_precision = True
+
     def execute(self, a: Decimal, b: Decimal) -> Decimal:
         if b < 0:
             raise OperationError("Negative exponents not supported")
-        return Decimal(pow(float(a), float(b)))
+        return decimal_power(a, b)
+
+    def execute_array(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        return np.power(a, b)
+
+    def invalid_array(self, a: np.ndarray, b: np.ndarray) -> List[Tuple[np.ndarray, str]]:
+        return [(b < 0, "Negative exponents not supported")]
 
 
 class RootOperation(Operation):
+    uses_precision = True
+
     def execute(self, a: Decimal, b: Decimal) -> Decimal:
         if a < 0:
             raise OperationError("Cannot calculate root of negative number")
         if b == 0:
             raise OperationError("Zero root is undefined")
-        return Decimal(pow(float(a), 1 / float(b)))
+        return decimal_root(a, b)
+
+    def execute_array(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        return np.power(a, 1 / b)
+
+    def invalid_array(self, a: np.ndarray, b: np.ndarray) -> List[Tuple[np.ndarray, str]]:
+        return [(a < 0, "Cannot calculate root of negative number"), (b == 0, "Zero root is undefined")]
 
 class ModulusOperation(Operation):
     def execute(self, a: Decimal, b: Decimal) -> Decimal:
         if b == 0:
             raise OperationError("Division by zero")
         return a % b
+
+    def execute_array(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        # Decimal % keeps the sign of the dividend, like C fmod
+        return np.fmod(a, b)
+
+    def invalid_array(self, a: np.ndarray, b: np.ndarray) -> List[Tuple[np.ndarray, str]]:
+        return [(b == 0, "Division by zero")]
     
 class IntegerDivisionOperation(Operation):
     """Perform division that results in an integer quotient, discarding any fractional part."""
@@ -59,12 +113,25 @@ class IntegerDivisionOperation(Operation):
         if b == 0:
             raise OperationError("Division by zero")
         return a // b
+
+    def execute_array(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        # Decimal // truncates towards zero
+        return np.trunc(a / b)
+
+    def invalid_array(self, a: np.ndarray, b: np.ndarray) -> List[Tuple[np.ndarray, str]]:
+        return [(b == 0, "Division by zero")]
     
 class PercentageOperation(Operation):
     def execute(self, a: Decimal, b: Decimal) -> Decimal:
         if b == 0:
             raise OperationError("Division by zero")
         return (a / b) * 100
+
+    def execute_array(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        return (a / b) * 100
+
+    def invalid_array(self, a: np.ndarray, b: np.ndarray) -> List[Tuple[np.ndarray, str]]:
+        return [(b == 0, "Division by zero")]
     
 class AbsoluteDifferenceOperation(Operation):
     def execute(self, a: Decimal, b: Decimal):
@@ -73,8 +140,16 @@ class AbsoluteDifferenceOperation(Operation):
             diff = -diff
         return diff
 
+    def execute_array(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        return np.abs(a - b)
+
 class OperationFactory:
-    """Factory for creating operation instances by name."""
+    """Factory for operation instances by name.
+
+    Operations are stateless, so one shared instance per operation is
+    created up front and every case variant of its name is precomputed;
+    lookups are a single dict access with no allocation.
+    """
     _operations = {
         'add': AddOperation,
         'subtract': SubtractOperation,
@@ -88,9 +163,35 @@ class OperationFactory:
         'absolutedifference': AbsoluteDifferenceOperation
     }
 
+    _instances: Dict[str, Operation] = {}
+    _dispatch: Dict[str, Callable[[Decimal, Decimal], Decimal]] = {}
+
+    @classmethod
+    def _register_all(cls) -> None:
+        for name, op_class in cls._operations.items():
+            instance = op_class()
+            for alias in (name, name.upper(), name.capitalize()):
+                cls._instances[alias] = instance
+                cls._dispatch[alias] = instance.execute
+
     @classmethod
     def create_operation(cls, name: str) -> Operation:
-        op_class = cls._operations.get(name.lower())
-        if not op_class:
-            raise ValueError(f"Unknown operation: {name}")
-        return op_class()
+        operation = cls._instances.get(name)
+        if operation is None:
+            operation = cls._instances.get(name.lower())
+            if operation is None:
+                raise ValueError(f"Unknown operation: {name}")
+        return operation
+
+    @classmethod
+    def get_executor(cls, name: str) -> Callable[[Decimal, Decimal], Decimal]:
+        """Return the execute function for an operation name"""
+        execute = cls._dispatch.get(name)
+        if execute is None:
+            execute = cls._dispatch.get(name.lower())
+            if execute is None:
+                raise ValueError(f"Unknown operation: {name}")
+        return execute
+
+
+OperationFactory._register_all()
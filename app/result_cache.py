@@ -0,0 +1,80 @@
+import threading
+import time
+from collections import OrderedDict
+from decimal import Decimal, getcontext
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class ResultCache:
+    """
+    Bounded LRU cache of operation results with an optional time-to-live.
+
+    Keys are the operation name, both operands and the active decimal
+    precision. Decimal operands hash and compare by value, so 2 and 2.00
+    share an entry. Errors are never cached.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        if max_size <= 0:
+            raise ValueError("max_size must be positive")
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._clock = clock
+        self._entries: "OrderedDict[Tuple[Hashable, ...], Tuple[Decimal, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def execute(self, name: str, execute: Callable[[Any, Any], Decimal], a: Any, b: Any) -> Decimal:
+        """Return the cached result of execute(a, b), computing and storing it on a miss"""
+        key = (name, a, b, getcontext().prec)
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+
+        result = execute(a, b)
+        expires = now + self.ttl if self.ttl else float('inf')
+        with self._lock:
+            self._entries[key] = (result, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return result
+
+    def wrap(self, name: str, execute: Callable[[Any, Any], Decimal]) -> Callable[[Any, Any], Decimal]:
+        """Return a memoized version of an execute function"""
+        return lambda a, b: self.execute(name, execute, a, b)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'size': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+        }
+
+
+def create_result_cache(config) -> Optional[ResultCache]:
+    """Build the cache described by a CalculatorConfig, or None when caching is off"""
+    if config.cache_size <= 0:
+        return None
+    return ResultCache(config.cache_size, config.cache_ttl or None)
@@ -1,14 +1,51 @@
-from fastapi import APIRouter, Depends, HTTPException
+import base64
+import binascii
+import csv
+import io
+import json
+import math
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import InvalidOperation
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter, ValidationError as PydanticValidationError
+from sqlalchemy import Select, insert, select, tuple_
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import AsyncIterator, Awaitable, Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
 
 from app import models, schemas
 from app.database import get_db
 from app.calculation_factory import perform_calculation
+from app.calculator_config import CalculatorConfig
 from app.auth import get_current_user
+from app.exceptions import ValidationError
+from app.history_upload import HistoryUpload, iter_upload_batches
+from app.result_cache import create_result_cache
 
 router = APIRouter(prefix="/calculations", tags=["calculations"])
 
+# Shared by all requests; None unless CALCULATOR_CACHE_SIZE is set
+result_cache = create_result_cache(CalculatorConfig())
+
+# Largest number of calculations accepted by POST /calculations/batch
+MAX_BATCH_SIZE = int(os.getenv("CALCULATOR_API_MAX_BATCH_SIZE", "10000"))
+# Largest request body it reads; checked while the body arrives, before any parsing
+MAX_BATCH_BYTES = int(os.getenv("CALCULATOR_API_MAX_BATCH_BYTES", str(MAX_BATCH_SIZE * 256)))
+
+# Page size of GET /calculations/user/{user_id}: default and largest allowed
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Rows fetched from the database cursor and written to the response at a time
+EXPORT_BATCH_SIZE = 1000
+
+# Uploaded history rows inserted and committed at a time
+IMPORT_BATCH_SIZE = 5000
+
 
 # ---------------------------------------------------------
 # CREATE (Add)
@@ -20,7 +57,7 @@ def create_calculation(
     current_user: models.User = Depends(get_current_user)
 ):
     # calc.type is already uppercase from the Pydantic validator
-    result = perform_calculation(calc.a, calc.b, calc.type)
+    result = perform_calculation(calc.a, calc.b, calc.type, cache=result_cache)
 
     db_calc = models.Calculation(
         a=calc.a,
@@ -36,18 +73,369 @@ def create_calculation(
 
 
 # ---------------------------------------------------------
-# BROWSE (Get all user’s calculations)
+# CREATE MANY (Batch)
+# ---------------------------------------------------------
+# Rows come back in parameter order so ids can be matched to items
+BATCH_INSERT = insert(models.Calculation).returning(models.Calculation.id, sort_by_parameter_order=True)
+
+
+BATCH_BODY = TypeAdapter(List[schemas.CalculationCreate])
+
+
+def batch_too_large() -> HTTPException:
+    return HTTPException(
+        status_code=413, detail=f"At most {MAX_BATCH_SIZE} calculations and {MAX_BATCH_BYTES} bytes per batch"
+    )
+
+
+async def batch_body(request: Request) -> List[schemas.CalculationCreate]:
+    """
+    The batch request body. Oversized bodies are refused with 413 from the
+    Content-Length header or as soon as more bytes arrive, so the list is
+    only parsed once its size is known to be acceptable.
+    """
+    length = request.headers.get("content-length", "")
+    if length.isdigit() and int(length) > MAX_BATCH_BYTES:
+        raise batch_too_large()
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > MAX_BATCH_BYTES:
+            raise batch_too_large()
+    try:
+        calcs = BATCH_BODY.validate_json(bytes(body))
+    except PydanticValidationError as e:
+        raise RequestValidationError([{**error, "loc": ("body", *error["loc"])} for error in e.errors()])
+    if len(calcs) > MAX_BATCH_SIZE:
+        raise batch_too_large()
+    return calcs
+
+
+# The body is read by batch_body, so its schema is declared here for the docs
+BATCH_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": {
+            "type": "array", "items": {"$ref": "#/components/schemas/CalculationCreate"}
+        }}},
+    }
+}
+
+
+def evaluate_batch(
+    calcs: List[schemas.CalculationCreate], user_id: int
+) -> Tuple[List[schemas.CalculationBatchItem], List[dict]]:
+    """Evaluate every item; returns the per-item outcomes and the rows to insert for the successful ones"""
+
+    items: List[schemas.CalculationBatchItem] = []
+    rows = []
+    for index, calc in enumerate(calcs):
+        try:
+            result = perform_calculation(calc.a, calc.b, calc.type, cache=result_cache)
+            if not math.isfinite(result):
+                raise ValueError("Result is not a finite number")
+            if not models.fits_numeric_columns(calc.a, calc.b, result):
+                raise ValueError(f"Values must be smaller than {models.VALUE_LIMIT:,} in magnitude to be stored")
+        except (ValueError, ArithmeticError, InvalidOperation) as e:
+            items.append(schemas.CalculationBatchItem(index=index, error=str(e)))
+            continue
+        items.append(schemas.CalculationBatchItem(index=index, result=result))
+        rows.append({"a": calc.a, "b": calc.b, "type": calc.type, "result": result, "user_id": user_id})
+    return items, rows
+
+
+def batch_response(
+    items: List[schemas.CalculationBatchItem], rows: List[dict], ids: List[int]
+) -> schemas.CalculationBatchRead:
+    stored = iter(ids)
+    for item in items:
+        if item.error is None:
+            item.id = next(stored)
+    return schemas.CalculationBatchRead(created=len(rows), failed=len(items) - len(rows), items=items)
+
+
+@router.post("/batch", response_model=schemas.CalculationBatchRead, openapi_extra=BATCH_OPENAPI)
+def create_calculations_batch(
+    calcs: List[schemas.CalculationCreate] = Depends(batch_body),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """Evaluate many calculations and store the successful ones with one bulk INSERT in one transaction."""
+    items, rows = evaluate_batch(calcs, current_user.id)
+    ids = []
+    if rows:
+        try:
+            ids = db.scalars(BATCH_INSERT, rows).all()
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+    return batch_response(items, rows, ids)
+
+
+# ---------------------------------------------------------
+# IMPORT (Upload a REPL history CSV)
 # ---------------------------------------------------------
+IMPORT_INSERT = insert(models.Calculation)
+
+
+async def first_import_batch(batches: AsyncIterator[List[dict]]) -> Optional[List[dict]]:
+    """Read up to the first batch, so a body that is not REPL history gets a 400 before streaming starts"""
+    try:
+        return await anext(batches, None)
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def import_progress(upload: HistoryUpload, **extra) -> str:
+    return json.dumps({**upload.progress(), **extra}) + "\n"
+
+
+async def iter_import(
+    first: Optional[List[dict]],
+    batches: AsyncIterator[List[dict]],
+    upload: HistoryUpload,
+    insert_batch: Callable[[List[dict]], Awaitable[None]],
+) -> AsyncIterator[str]:
+    """Insert the batches as they are parsed, with one progress line after each commit"""
+    batch = first
+    try:
+        while batch is not None:
+            await insert_batch(batch)
+            upload.imported += len(batch)
+            yield import_progress(upload)
+            batch = await anext(batches, None)
+    except Exception as e:
+        yield import_progress(upload, error=str(e))
+        return
+    yield import_progress(upload, done=True)
+
+
+def insert_import_batch(db: Session, rows: List[dict]) -> None:
+    try:
+        db.execute(IMPORT_INSERT, rows)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+
+@router.post("/import")
+async def import_history(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Import a history CSV saved by the REPL, sent as the raw request body.
+    The body is parsed as it arrives and stored IMPORT_BATCH_SIZE rows per
+    INSERT and commit; the response streams one NDJSON progress line per
+    batch and a final line with "done" (or "error" if a batch failed, in
+    which case the earlier batches stay imported).
+    """
+    upload = HistoryUpload(current_user.id)
+    batches = iter_upload_batches(request.stream(), upload, IMPORT_BATCH_SIZE)
+    first = await first_import_batch(batches)
+
+    async def insert_batch(rows: List[dict]) -> None:
+        await run_in_threadpool(insert_import_batch, db, rows)
+
+    return StreamingResponse(iter_import(first, batches, upload, insert_batch), media_type="application/x-ndjson")
+
+
+# ---------------------------------------------------------
+# BROWSE (Page through a user's calculations)
+# ---------------------------------------------------------
+@dataclass
+class CalculationListParams:
+    type: Optional[str]
+    min_a: Optional[float]
+    max_a: Optional[float]
+    min_b: Optional[float]
+    max_b: Optional[float]
+    min_result: Optional[float]
+    max_result: Optional[float]
+    created_after: Optional[datetime]
+    created_before: Optional[datetime]
+    cursor: Optional[Tuple[datetime, int]]
+    limit: int
+    descending: bool
+
+
+def encode_cursor(calc: models.Calculation) -> str:
+    """Opaque cursor pointing just past a calculation in (created_at, id) order"""
+    return base64.urlsafe_b64encode(f"{calc.created_at.isoformat()}|{calc.id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        created_at, calc_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(calc_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def calculation_list_params(
+    type: Optional[str] = None,
+    min_a: Optional[float] = None,
+    max_a: Optional[float] = None,
+    min_b: Optional[float] = None,
+    max_b: Optional[float] = None,
+    min_result: Optional[float] = None,
+    max_result: Optional[float] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+) -> CalculationListParams:
+    """Query parameters of the listing; the type is matched case-insensitively"""
+    if type is not None:
+        type = type.upper()
+        if type not in models.OperationType.__members__:
+            raise HTTPException(status_code=422, detail="Unsupported operation")
+    return CalculationListParams(
+        type, min_a, max_a, min_b, max_b, min_result, max_result, created_after, created_before,
+        None if cursor is None else decode_cursor(cursor), limit, order == "desc"
+    )
+
+
+def user_calculations_query(user_id: int, params: CalculationListParams) -> Select:
+    """
+    One page of a user's calculations in (created_at, id) order, plus one
+    extra row that tells whether another page follows. The cursor is a
+    keyset condition, so every page costs an index seek however deep it is.
+    """
+    calc = models.Calculation
+    query = select(calc).where(calc.user_id == user_id)
+    if params.type is not None:
+        query = query.where(calc.type == params.type)
+    for column, low, high in (
+        (calc.a, params.min_a, params.max_a),
+        (calc.b, params.min_b, params.max_b),
+        (calc.result, params.min_result, params.max_result),
+        (calc.created_at, params.created_after, None),
+    ):
+        if low is not None:
+            query = query.where(column >= low)
+        if high is not None:
+            query = query.where(column <= high)
+    if params.created_before is not None:
+        query = query.where(calc.created_at < params.created_before)
+
+    key = tuple_(calc.created_at, calc.id)
+    if params.cursor is not None:
+        query = query.where(key < params.cursor if params.descending else key > params.cursor)
+    if params.descending:
+        query = query.order_by(calc.created_at.desc(), calc.id.desc())
+    else:
+        query = query.order_by(calc.created_at, calc.id)
+    return query.limit(params.limit + 1)
+
+
+def calculation_page(
+    rows: Sequence[models.Calculation], params: CalculationListParams, response: Response
+) -> Sequence[models.Calculation]:
+    """Trim the extra row and point X-Next-Cursor at the following page, if any"""
+    if len(rows) > params.limit:
+        rows = rows[:params.limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(rows[-1])
+    return rows
+
+
 @router.get("/user/{user_id}", response_model=List[schemas.CalculationRead])
 def get_user_calculations(
     user_id: int,
+    response: Response,
+    params: CalculationListParams = Depends(calculation_list_params),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    A page of the user's calculations, oldest first (order=desc for newest
+    first). Pass the X-Next-Cursor response header back as `cursor` for the
+    next page; it is absent on the last one.
+    """
+    if user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not allowed")
+
+    rows = db.scalars(user_calculations_query(user_id, params)).all()
+    return calculation_page(rows, params, response)
+
+
+# ---------------------------------------------------------
+# EXPORT (Stream all of a user's calculations)
+# ---------------------------------------------------------
+EXPORT_FIELDS = ("id", "type", "a", "b", "result", "created_at")
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def export_query(user_id: int) -> Select:
+    """Only the exported columns, so rows stream as tuples without ORM objects"""
+    calc = models.Calculation
+    return (
+        select(calc.id, calc.type, calc.a, calc.b, calc.result, calc.created_at)
+        .where(calc.user_id == user_id)
+        .order_by(calc.created_at, calc.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+
+
+def format_export_batch(rows: Sequence[tuple], format: str) -> str:
+    """One batch of exported rows as NDJSON lines or CSV records"""
+    if format == "ndjson":
+        return "".join(
+            json.dumps({
+                "id": calc_id, "type": calc_type.value, "a": float(a), "b": float(b),
+                "result": float(result), "created_at": created_at.isoformat(),
+            }) + "\n"
+            for calc_id, calc_type, a, b, result, created_at in rows
+        )
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(
+        (calc_id, calc_type.value, a, b, result, created_at.isoformat())
+        for calc_id, calc_type, a, b, result, created_at in rows
+    )
+    return buffer.getvalue()
+
+
+def export_header(format: str) -> Optional[str]:
+    return ",".join(EXPORT_FIELDS) + "\n" if format == "csv" else None
+
+
+def export_response(body, user_id: int, format: str) -> StreamingResponse:
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="calculations-{user_id}.{format}"'},
+    )
+
+
+def iter_export(batches: Iterable[Sequence[tuple]], format: str) -> Iterator[str]:
+    header = export_header(format)
+    if header:
+        yield header
+    for rows in batches:
+        yield format_export_batch(rows, format)
+
+
+@router.get("/user/{user_id}/export")
+def export_user_calculations(
+    user_id: int,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
+    """
+    Stream every calculation of the user as NDJSON or CSV, oldest first.
+    Rows are read through a server-side cursor EXPORT_BATCH_SIZE at a
+    time, so memory stays flat however many rows the user has.
+    """
     if user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not allowed")
 
-    return db.query(models.Calculation).filter(models.Calculation.user_id == user_id).all()
+    batches = db.execute(export_query(user_id)).partitions()
+    return export_response(iter_export(batches, format), user_id, format)
 
 
 # ---------------------------------------------------------
@@ -92,7 +480,7 @@ def update_calculation(
         calc.type = updates.type  # already uppercase from Pydantic validator
 
     # Recalculate result
-    calc.result = perform_calculation(calc.a, calc.b, calc.type)
+    calc.result = perform_calculation(calc.a, calc.b, calc.type, cache=result_cache)
 
     db.commit()
     db.refresh(calc)
@@ -0,0 +1,164 @@
+"""
+Async versions of the calculation routes, mounted instead of
+app.routes_calculations when CALCULATOR_ASYNC_DB is on. Evaluation and
+validation are shared with the sync routes; only database access awaits.
+"""
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models, schemas
+from app.auth_async import get_current_user
+from app.calculation_factory import perform_calculation
+from app.database_async import get_async_db
+from app.history_upload import HistoryUpload, iter_upload_batches
+from app.routes_calculations import (
+    BATCH_INSERT, BATCH_OPENAPI, IMPORT_BATCH_SIZE, IMPORT_INSERT, CalculationListParams, batch_body,
+    batch_response, calculation_list_params, calculation_page, evaluate_batch, export_header, export_query,
+    export_response, first_import_batch, format_export_batch, iter_import, result_cache, user_calculations_query
+)
+
+router = APIRouter(prefix="/calculations", tags=["calculations"])
+
+
+async def _owned_calculation(calculation_id: int, db: AsyncSession, current_user: models.User) -> models.Calculation:
+    calc = await db.get(models.Calculation, calculation_id)
+    if not calc:
+        raise HTTPException(status_code=404, detail="Calculation not found")
+    if calc.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not allowed")
+    return calc
+
+
+@router.post("/", response_model=schemas.CalculationRead)
+async def create_calculation(
+    calc: schemas.CalculationCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    result = perform_calculation(calc.a, calc.b, calc.type, cache=result_cache)
+    db_calc = models.Calculation(a=calc.a, b=calc.b, type=calc.type, result=result, user_id=current_user.id)
+    db.add(db_calc)
+    await db.commit()
+    await db.refresh(db_calc)
+    return db_calc
+
+
+@router.post("/batch", response_model=schemas.CalculationBatchRead, openapi_extra=BATCH_OPENAPI)
+async def create_calculations_batch(
+    calcs: List[schemas.CalculationCreate] = Depends(batch_body),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """Evaluate many calculations and store the successful ones with one bulk INSERT in one transaction."""
+    items, rows = evaluate_batch(calcs, current_user.id)
+    ids = []
+    if rows:
+        try:
+            ids = (await db.scalars(BATCH_INSERT, rows)).all()
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+    return batch_response(items, rows, ids)
+
+
+@router.post("/import")
+async def import_history(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    upload = HistoryUpload(current_user.id)
+    batches = iter_upload_batches(request.stream(), upload, IMPORT_BATCH_SIZE)
+    first = await first_import_batch(batches)
+
+    async def insert_batch(rows: List[dict]) -> None:
+        try:
+            await db.execute(IMPORT_INSERT, rows)
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+
+    return StreamingResponse(iter_import(first, batches, upload, insert_batch), media_type="application/x-ndjson")
+
+
+@router.get("/user/{user_id}", response_model=List[schemas.CalculationRead])
+async def get_user_calculations(
+    user_id: int,
+    response: Response,
+    params: CalculationListParams = Depends(calculation_list_params),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    if user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not allowed")
+
+    rows = (await db.scalars(user_calculations_query(user_id, params))).all()
+    return calculation_page(rows, params, response)
+
+
+@router.get("/user/{user_id}/export")
+async def export_user_calculations(
+    user_id: int,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    if user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not allowed")
+
+    async def body():
+        header = export_header(format)
+        if header:
+            yield header
+        result = await db.stream(export_query(user_id))
+        async for rows in result.partitions():
+            yield format_export_batch(rows, format)
+
+    return export_response(body(), user_id, format)
+
+
+@router.get("/{calculation_id}", response_model=schemas.CalculationRead)
+async def get_calculation(
+    calculation_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    return await _owned_calculation(calculation_id, db, current_user)
+
+
+@router.put("/{calculation_id}", response_model=schemas.CalculationRead)
+async def update_calculation(
+    calculation_id: int,
+    updates: schemas.CalculationUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    calc = await _owned_calculation(calculation_id, db, current_user)
+    if updates.a is not None:
+        calc.a = updates.a
+    if updates.b is not None:
+        calc.b = updates.b
+    if updates.type is not None:
+        calc.type = updates.type
+
+    calc.result = perform_calculation(calc.a, calc.b, calc.type, cache=result_cache)
+    await db.commit()
+    await db.refresh(calc)
+    return calc
+
+
+@router.delete("/{calculation_id}", status_code=204)
+async def delete_calculation(
+    calculation_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    calc = await _owned_calculation(calculation_id, db, current_user)
+    await db.delete(calc)
+    await db.commit()
+    return None
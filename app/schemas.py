@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, validator
-from typing import Optional
+from typing import Dict, List, Optional
 from enum import Enum
 
 
@@ -81,6 +81,30 @@ class CalculationRead(BaseModel):
         orm_mode = True
 
 
+class CalculationBatchItem(BaseModel):
+    """Outcome of one batch item: the stored calculation, or why it was rejected."""
+    index: int
+    id: Optional[int] = None
+    result: Optional[float] = None
+    error: Optional[str] = None
+
+
+class CalculationBatchRead(BaseModel):
+    created: int
+    failed: int
+    items: List[CalculationBatchItem]
+
+
+# ------------------------------
+# EXPRESSION SCHEMAS
+# ------------------------------
+class ExpressionRequest(BaseModel):
+    """An expression with one set of variables, or a list of them to evaluate in one call."""
+    expression: str
+    variables: Dict[str, float] = {}
+    bindings: Optional[List[Dict[str, float]]] = None
+
+
 # ------------------------------
 # AUTH SCHEMAS
 # ------------------------------
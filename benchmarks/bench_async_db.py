@@ -0,0 +1,116 @@
+"""
+Throughput and latency of the calculation routes under concurrent load,
+with the sync handlers on the threadpool versus the async handlers and
+engine (CALCULATOR_ASYNC_DB).
+
+Each mode runs in its own process against a fresh SQLite file, sending
+GET /calculations/{id} in-process through httpx's ASGI transport at
+several concurrency levels. The async mode needs sqlalchemy[asyncio] and
+aiosqlite.
+
+Run with:
+    python -m benchmarks.bench_async_db [requests]
+
+Measured with 2000 requests per level on one CPU, SQLite file database
+(sqlalchemy 2.1, aiosqlite 0.22):
+
+    sync  concurrency   10    319 req/s  p95    40 ms
+    sync  concurrency  100    296 req/s  p95   385 ms
+    sync  concurrency  400    270 req/s  p95  1669 ms
+    async concurrency   10    334 req/s  p95    36 ms
+    async concurrency  100    349 req/s  p95   727 ms
+    async concurrency  400    332 req/s  p95  2536 ms
+
+Throughput is bound by the single CPU either way. The async mode gains
+5-20% throughput, but its p95 latency is higher under load: it admits
+every request at once, while the sync mode admits at most one request
+per pooled connection (get_db's session slots).
+"""
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+CONCURRENCY = (10, 100, 400)
+
+
+async def load(client, path: str, headers: dict, requests: int, concurrency: int):
+    latencies = []
+    queue = iter(range(requests))
+
+    async def worker():
+        for _ in queue:
+            start = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            latencies.append(time.perf_counter() - start)
+            assert response.status_code == 200, response.text
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return requests / elapsed, latencies[int(len(latencies) * 0.95)]
+
+
+async def run_mode(requests: int) -> None:
+    import httpx
+    from sqlalchemy import create_engine
+
+    from app import database, models
+    from main import ASYNC_DB, app
+
+    if not ASYNC_DB:
+        # Same pool as the app's engine, so get_db's session slots match it
+        engine = create_engine(
+            os.environ["BENCH_DATABASE_URL"], connect_args={"check_same_thread": False},
+            pool_size=database.POOL_SIZE, max_overflow=database.MAX_OVERFLOW,
+        )
+        models.Base.metadata.create_all(bind=engine)
+        database.SessionLocal.configure(bind=engine)
+    else:
+        from app.database_async import async_engine
+        async with async_engine.begin() as connection:
+            await connection.run_sync(models.Base.metadata.create_all)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        token = (await client.post("/register", json={
+            "email": "bench@example.com", "username": "bench", "password": "bench"
+        })).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        created = (await client.post("/calculations/", json={"a": 2, "b": 3, "type": "add"}, headers=headers)).json()
+        path = f"/calculations/{created['id']}"
+        await load(client, path, headers, 200, 10)  # warm up
+
+        mode = "async" if ASYNC_DB else "sync"
+        for concurrency in CONCURRENCY:
+            try:
+                throughput, p95 = await load(client, path, headers, requests, concurrency)
+            except Exception as e:
+                # e.g. the connection pool timing out while requests wait for a thread
+                print(f"{mode:5s} concurrency {concurrency:4d}  failed: {type(e).__name__}: {str(e).splitlines()[0]}")
+                break
+            print(f"{mode:5s} concurrency {concurrency:4d}  {throughput:8.0f} req/s  p95 {p95 * 1e3:8.2f} ms")
+
+
+def main(requests: int = 2_000) -> None:
+    for mode in ("false", "true"):
+        directory = tempfile.mkdtemp(prefix="calculator-async-")
+        env = dict(
+            os.environ,
+            CALCULATOR_ASYNC_DB=mode,
+            CALCULATOR_API_RECORD_HISTORY="false",
+            CALCULATOR_HISTORY_DIR=directory,
+            BENCH_DATABASE_URL=f"sqlite:///{directory}/bench.db",
+            CALCULATOR_ASYNC_DATABASE_URL=f"sqlite+aiosqlite:///{directory}/bench.db",
+        )
+        subprocess.run([sys.executable, "-m", "benchmarks.bench_async_db", "--mode", str(requests)], env=env, check=False)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--mode":
+        asyncio.run(run_mode(int(sys.argv[2])))
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 2_000)
@@ -0,0 +1,86 @@
+"""
+Writes and time spent by autosave, saving on every calculation versus
+coalescing saves through the autosave scheduler.
+
+Runs the same sequence of calculations on a calculator with a full CSV
+history for each autosave interval and counts the history files written.
+Calculations arrive at a fixed rate, slow enough that the interval rather
+than autosave_max_pending decides when the scheduler writes.
+
+Run with:
+    python -m benchmarks.bench_autosave [calculations] [per second]
+
+With the defaults (1000 calculations at 100 per second, a 1000 row history)
+one run wrote 1000 times when saving on every calculation, 181 times with a
+0.05s interval and 20 times with 0.5s, about one write per interval.
+"""
+import os
+import sys
+import tempfile
+import time
+from decimal import Decimal
+
+os.environ.setdefault("CALCULATOR_HISTORY_DIR", tempfile.mkdtemp(prefix="calculator-autosave-"))
+os.environ["CALCULATOR_AUTO_SAVE"] = "true"
+
+from app.calculator import Calculator  # noqa: E402
+from app.calculator_config import CalculatorConfig  # noqa: E402
+from app.history import AutoSaveObserver  # noqa: E402
+from app.operations import OperationFactory  # noqa: E402
+
+INTERVALS = (0, 0.05, 0.5)
+HISTORY_SIZE = 1_000
+MAX_PENDING = 100
+
+
+def run(interval: float, calculations: int, rate: float):
+    config = CalculatorConfig(
+        autosave_interval=interval, autosave_max_pending=MAX_PENDING, max_history_size=HISTORY_SIZE)
+    calc = Calculator(config)
+    calc.clear_history()
+    writes = 0
+    save = calc.save_history
+
+    def counting_save():
+        nonlocal writes
+        writes += 1
+        save()
+
+    calc.save_history = counting_save
+    observer = AutoSaveObserver(calc)
+    calc.add_observer(observer)
+    calc.perform_many(OperationFactory.create_operation("add"), range(HISTORY_SIZE), [1] * HISTORY_SIZE)
+    calc.flush_observers()
+    writes = 0
+
+    add = OperationFactory.create_operation("add")
+    busy = 0.0
+    start = time.perf_counter()
+    for i in range(calculations):
+        delay = start + i / rate - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        began = time.perf_counter()
+        calc.set_operation(add)
+        calc.perform_operation(Decimal(i), Decimal(1))
+        busy += time.perf_counter() - began
+    calc.flush_observers()
+    if observer.scheduler is not None:
+        observer.scheduler.close()
+    return writes, busy
+
+
+def main(calculations: int = 1_000, rate: float = 100) -> None:
+    print(f"{calculations} calculations at {rate:g} per second, max_pending {MAX_PENDING}")
+    baseline = None
+    for interval in INTERVALS:
+        writes, busy = run(interval, calculations, rate)
+        baseline = baseline or writes
+        label = "every calculation" if interval == 0 else f"interval {interval:g}s"
+        print(f"{label:18s} {writes:6d} writes ({baseline - writes:6d} saved)  "
+              f"{busy / calculations * 1e3:7.3f} ms per calculation")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000,
+         float(sys.argv[2]) if len(sys.argv) > 2 else 100)
@@ -0,0 +1,52 @@
+"""
+Microbenchmark: cost of the Decimal power and root engine.
+
+Compares the previous float round trip with the Decimal engine for the
+exponent and root ranges the calculator sees, at a few precisions.
+
+Run with:
+    python -m benchmarks.bench_decimal_power [calls]
+"""
+import sys
+import timeit
+from decimal import Decimal
+
+from app.decimal_engine import decimal_power, decimal_root
+
+CASES = [
+    # label, function, base, exponent or degree
+    ("power 1.07 ^ 12", "power", Decimal("1.07"), Decimal("12")),
+    ("power 2 ^ 64", "power", Decimal("2"), Decimal("64")),
+    ("power 1.0001 ^ 1000", "power", Decimal("1.0001"), Decimal("1000")),
+    ("power 2 ^ 0.5", "power", Decimal("2"), Decimal("0.5")),
+    ("root 16, 2 (exact)", "root", Decimal("16"), Decimal("2")),
+    ("root 2, 2", "root", Decimal("2"), Decimal("2")),
+    ("root 1000, 3", "root", Decimal("1000"), Decimal("3")),
+    ("root 2, 10", "root", Decimal("2"), Decimal("10")),
+]
+
+
+def float_round_trip(kind, a, b):
+    # What PowerOperation and RootOperation did before
+    if kind == "power":
+        return lambda: Decimal(pow(float(a), float(b)))
+    return lambda: Decimal(pow(float(a), 1 / float(b)))
+
+
+def engine(kind, a, b, precision):
+    func = decimal_power if kind == "power" else decimal_root
+    return lambda: func(a, b, precision)
+
+
+def main(calls: int = 20_000) -> None:
+    precisions = (10, 28, 50)
+    print(f"calls: {calls}  (us/call)")
+    print(f"{'case':24s} {'float':>9s}" + "".join(f" {'prec ' + str(p):>9s}" for p in precisions))
+    for label, kind, a, b in CASES:
+        timings = [float_round_trip(kind, a, b)] + [engine(kind, a, b, p) for p in precisions]
+        cells = [min(timeit.repeat(func, number=calls, repeat=3)) / calls * 1e6 for func in timings]
+        print(f"{label:24s}" + "".join(f" {cell:9.2f}" for cell in cells))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
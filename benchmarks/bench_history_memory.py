@@ -0,0 +1,47 @@
+"""
+Memory benchmark: list of Calculation objects vs ColumnarHistory.
+
+Run with:
+    python -m benchmarks.bench_history_memory [entries]
+"""
+import random
+import sys
+import tracemalloc
+from decimal import Decimal
+
+from app.calculation import Calculation
+from app.columnar_history import ColumnarHistory
+
+OPERATIONS = ['add', 'subtract', 'multiply', 'divide', 'power', 'root']
+
+
+def make_calculations(count: int):
+    rng = random.Random(42)
+    for _ in range(count):
+        operation = rng.choice(OPERATIONS[:4])
+        a = Decimal(rng.randint(-10_000, 10_000)) / 100
+        b = Decimal(rng.randint(1, 10_000)) / 100
+        yield Calculation(operation=operation, operand1=a, operand2=b)
+
+
+def measure(build) -> int:
+    tracemalloc.start()
+    store = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del store
+    return current
+
+
+def main(count: int = 100_000) -> None:
+    list_bytes = measure(lambda: list(make_calculations(count)))
+    columnar_bytes = measure(lambda: ColumnarHistory(make_calculations(count)))
+
+    print(f"entries: {count}")
+    print(f"list of Calculation: {list_bytes / count:8.1f} bytes/entry")
+    print(f"ColumnarHistory:     {columnar_bytes / count:8.1f} bytes/entry")
+    print(f"reduction:           {list_bytes / columnar_bytes:8.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
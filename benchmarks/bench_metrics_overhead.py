@@ -0,0 +1,64 @@
+"""
+Overhead of the metrics instrumentation on the /calculate path.
+
+Runs GET /calculate/add in-process through httpx's ASGI transport and
+Calculator.evaluate directly, with the metrics registry enabled and
+disabled in alternating rounds, and reports the difference.
+
+Run with:
+    python -m benchmarks.bench_metrics_overhead [requests]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import httpx
+
+os.environ.setdefault("CALCULATOR_HISTORY_DIR", tempfile.mkdtemp(prefix="calculator-metrics-"))
+os.environ["CALCULATOR_API_RECORD_HISTORY"] = "false"
+
+from app.metrics import REGISTRY  # noqa: E402
+from app.operations import OperationFactory  # noqa: E402
+from main import app, calc  # noqa: E402
+
+ROUNDS = 5
+
+
+async def api_round(client: httpx.AsyncClient, requests: int) -> float:
+    start = time.perf_counter()
+    for _ in range(requests):
+        await client.get("/calculate/add", params={"a": 12.5, "b": 3.25})
+    return time.perf_counter() - start
+
+
+def evaluate_round(calls: int) -> float:
+    add = OperationFactory.create_operation("add")
+    start = time.perf_counter()
+    for _ in range(calls):
+        calc.evaluate(add, "12.5", "3.25")
+    return time.perf_counter() - start
+
+
+async def main(requests: int = 2_000) -> None:
+    timings = {"api": {True: [], False: []}, "evaluate": {True: [], False: []}}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await api_round(client, 200)  # warm up
+        for _ in range(ROUNDS):
+            for enabled in (True, False):
+                REGISTRY.enabled = enabled
+                timings["api"][enabled].append(await api_round(client, requests))
+                timings["evaluate"][enabled].append(evaluate_round(requests * 10))
+    REGISTRY.enabled = True
+
+    for name, calls in (("GET /calculate/add", requests), ("Calculator.evaluate", requests * 10)):
+        key = "api" if name.startswith("GET") else "evaluate"
+        on = min(timings[key][True]) / calls * 1e6
+        off = min(timings[key][False]) / calls * 1e6
+        print(f"{name:22s} metrics off {off:8.2f} us  on {on:8.2f} us  overhead {(on - off) / off:+6.1%}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 2_000))
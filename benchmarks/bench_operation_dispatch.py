@@ -0,0 +1,73 @@
+"""
+Microbenchmark: per-call cost of looking up an operation.
+
+Compares creating a new operation object per call (the previous factory
+behaviour) with the shared-instance registry and the dispatch table.
+
+Run with:
+    python -m benchmarks.bench_operation_dispatch [calls]
+"""
+import sys
+import timeit
+from decimal import Decimal
+
+from app.calculation import Calculation
+from app.calculation_factory import CalculationFactory, perform_calculation
+from app.operations import OperationFactory
+
+A = Decimal("12.5")
+B = Decimal("3")
+
+
+def _previous_create_operation(name):
+    # What create_operation did before: lower(), a class lookup and a new object
+    op_class = OperationFactory._operations.get(name.lower())
+    if not op_class:
+        raise ValueError(f"Unknown operation: {name}")
+    return op_class()
+
+
+def per_call_instance():
+    _previous_create_operation("add").execute(A, B)
+
+
+def shared_instance():
+    OperationFactory.create_operation("add").execute(A, B)
+
+
+def dispatch_table():
+    OperationFactory.get_executor("add")(A, B)
+
+
+def rest_per_call_instance():
+    operations = CalculationFactory._operations
+    if "ADD" not in operations:
+        raise ValueError("Unsupported operation: ADD")
+    operations["ADD"]().execute(A, B)
+
+
+def rest_dispatch_table():
+    perform_calculation(A, B, "ADD")
+
+
+def calculation_post_init():
+    Calculation(operation="add", operand1=A, operand2=B)
+
+
+def main(calls: int = 1_000_000) -> None:
+    cases = [
+        ("OperationFactory, new instance per call", per_call_instance),
+        ("OperationFactory.create_operation (shared)", shared_instance),
+        ("OperationFactory.get_executor", dispatch_table),
+        ("CalculationFactory, new instance per call", rest_per_call_instance),
+        ("perform_calculation (dispatch table)", rest_dispatch_table),
+        ("Calculation.__post_init__", calculation_post_init),
+    ]
+    print(f"calls: {calls}")
+    for label, func in cases:
+        seconds = min(timeit.repeat(func, number=calls, repeat=3))
+        print(f"{label:45s} {seconds / calls * 1e9:8.1f} ns/call")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,81 @@
+"""
+Synthetic, reproducible datasets for the benchmark suite.
+
+All generators are seeded so every run and every machine sees the same data.
+"""
+import random
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+from app.calculation import Calculation
+from app.calculation_factory import perform_calculation
+from app.history_journal import HISTORY_FIELDS, append_history_rows, calculation_row
+from app.security import hash_password
+
+HISTORY_SIZES = (1_000, 100_000, 1_000_000)
+USER_COUNT = 10_000
+OPERATIONS = ['add', 'subtract', 'multiply', 'divide']
+API_OPERATIONS = ['ADD', 'SUBTRACT', 'MULTIPLY', 'DIVIDE']
+START = datetime(2025, 1, 1)
+
+
+def calculations(count: int, seed: int = 42) -> Iterator[Calculation]:
+    """Yield `count` calculations with two-decimal operands and increasing timestamps"""
+    rng = random.Random(seed)
+    for index in range(count):
+        a = Decimal(rng.randint(-1_000_000, 1_000_000)).scaleb(-2)
+        b = Decimal(rng.randint(1, 1_000_000)).scaleb(-2)
+        yield Calculation(
+            operation=rng.choice(OPERATIONS),
+            operand1=a,
+            operand2=b,
+            timestamp=START + timedelta(seconds=index)
+        )
+
+
+def write_history_csv(path: Path, count: int, seed: int = 42) -> Path:
+    """Write a history CSV in the layout save_history produces"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.exists():
+        path.unlink()
+    written = append_history_rows(path, (calculation_row(calc) for calc in calculations(count, seed)))
+    if written == 0:
+        path.write_text(",".join(HISTORY_FIELDS) + "\n", encoding="utf-8")
+    return path
+
+
+def user_rows(count: int = USER_COUNT) -> List[Dict]:
+    """Rows for the users table; every user's password is 'password'"""
+    password_hash = hash_password("password")
+    return [
+        {
+            "username": f"user{index}",
+            "email": f"user{index}@example.com",
+            "password_hash": password_hash,
+            "created_at": START + timedelta(minutes=index),
+        }
+        for index in range(1, count + 1)
+    ]
+
+
+def calculation_rows(user_count: int, per_user: int, seed: int = 7) -> List[Dict]:
+    """Rows for the calculations table, `per_user` rows for every user id"""
+    rng = random.Random(seed)
+    rows = []
+    for user_id in range(1, user_count + 1):
+        for _ in range(per_user):
+            a = Decimal(rng.randint(0, 100_000)).scaleb(-2)
+            b = Decimal(rng.randint(1, 100_000)).scaleb(-2)
+            operation = rng.choice(API_OPERATIONS)
+            rows.append({
+                "a": a,
+                "b": b,
+                "type": operation,
+                "result": perform_calculation(a, b, operation).quantize(Decimal("0.01")),
+                "created_at": START + timedelta(seconds=len(rows)),
+                "user_id": user_id,
+            })
+    return rows
+
@@ -0,0 +1,324 @@
+"""
+Benchmark suite for the calculator, persistence and API hot paths.
+
+Measures throughput, latency percentiles and peak memory on the synthetic
+datasets in benchmarks/datasets.py, writes the results as JSON and compares
+them with a stored baseline. The API is exercised in-process through
+httpx's ASGI transport against a throwaway SQLite database.
+
+Run with:
+    python -m benchmarks.suite                       # 1k/100k/1M rows, 10k users
+    python -m benchmarks.suite --quick               # 1k rows, 1k users
+    python -m benchmarks.suite --only history --output results.json
+    python -m benchmarks.suite --quick --save-baseline
+
+Exits with status 1 when a benchmark regressed by more than --tolerance
+against the baseline.
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from benchmarks import datasets
+
+BASELINE = Path(__file__).with_name("baseline.json")
+GROUPS = ("calculator", "history", "api")
+
+
+@dataclass
+class Result:
+    name: str
+    samples: int
+    ops_per_sec: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+    peak_mib: float
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))]
+
+
+def _summarize(name: str, latencies: List[float], ops_per_sample: int, peak: int) -> Result:
+    ordered = sorted(latencies)
+    return Result(
+        name=name,
+        samples=len(latencies),
+        ops_per_sec=ops_per_sample * len(latencies) / sum(latencies),
+        p50_ms=_percentile(ordered, 0.50) * 1e3,
+        p95_ms=_percentile(ordered, 0.95) * 1e3,
+        p99_ms=_percentile(ordered, 0.99) * 1e3,
+        max_ms=ordered[-1] * 1e3,
+        peak_mib=peak / 2 ** 20,
+    )
+
+
+def measure(
+        name: str,
+        func: Callable[[], object],
+        samples: int,
+        ops_per_sample: int = 1,
+        setup: Optional[Callable[[], object]] = None,
+        memory_calls: int = 1
+) -> Result:
+    """Time `samples` calls of func, then run it `memory_calls` more times under tracemalloc for peak memory"""
+    latencies = []
+    for _ in range(samples):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - start)
+    if setup:
+        setup()
+    gc.collect()
+    tracemalloc.start()
+    for _ in range(memory_calls):
+        func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return _report(_summarize(name, latencies, ops_per_sample, peak))
+
+
+async def measure_async(name: str, func: Callable[[], Awaitable[object]], samples: int) -> Result:
+    """Async counterpart of measure() for the API benchmarks"""
+    latencies = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        await func()
+        latencies.append(time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    for _ in range(min(samples, 1_000)):
+        await func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return _report(_summarize(name, latencies, 1, peak))
+
+
+def _report(result: Result) -> Result:
+    print(f"  {result.name:40s} {result.ops_per_sec:12.1f} ops/s  p50 {result.p50_ms:9.3f} ms  "
+          f"p95 {result.p95_ms:9.3f} ms  p99 {result.p99_ms:9.3f} ms  peak {result.peak_mib:8.1f} MiB",
+          flush=True)
+    return result
+
+
+# -----------------------------
+# Calculator hot paths
+# -----------------------------
+def bench_calculator(work_dir: Path, operations: int) -> List[Result]:
+    from app.calculator import Calculator
+    from app.calculator_config import CalculatorConfig
+    from app.operations import OperationFactory
+
+    config = CalculatorConfig(base_dir=work_dir / "calculator", auto_save=False, max_history_size=operations * 2 + 10)
+    calc = Calculator(config=config)
+    calc.set_operation(OperationFactory.create_operation('add'))
+    power = OperationFactory.create_operation('power')
+    memory_calls = min(operations, 1_000)
+    return [
+        measure("calculator.perform_operation[add]", lambda: calc.perform_operation("12.50", "3.25"), operations,
+                memory_calls=memory_calls),
+        measure("calculator.evaluate[power]", lambda: calc.evaluate(power, "1.07", "12"), operations,
+                memory_calls=memory_calls),
+        measure("calculator.undo_redo", lambda: (calc.undo(), calc.redo()), operations,
+                memory_calls=memory_calls),
+    ]
+
+
+# -----------------------------
+# History persistence
+# -----------------------------
+def bench_history(work_dir: Path, sizes: List[int]) -> List[Result]:
+    from app.calculator import Calculator
+    from app.calculator_config import CalculatorConfig
+
+    results = []
+    for size in sizes:
+        base_dir = work_dir / f"history_{size}"
+        config = CalculatorConfig(base_dir=base_dir, auto_save=False, max_history_size=size)
+        config.history_dir.mkdir(parents=True, exist_ok=True)
+        datasets.write_history_csv(config.history_file, size)
+        calc = Calculator(config=config)
+        samples = 5 if size <= 100_000 else 1
+        results.append(measure(f"history.load[{size}]", calc.load_history, samples, ops_per_sample=size))
+        results.append(measure(f"history.save[{size}]", calc.save_history, samples, ops_per_sample=size))
+        calc.config.history_format = 'binary'
+        results.append(measure(f"history.save_binary[{size}]", calc.save_history, samples, ops_per_sample=size))
+        results.append(measure(f"history.load_binary[{size}]", calc.load_history, samples, ops_per_sample=size))
+        del calc
+        gc.collect()
+    return results
+
+
+# -----------------------------
+# API routes
+# -----------------------------
+def bench_api(work_dir: Path, users: int, requests: int) -> List[Result]:
+    return asyncio.run(_bench_api(work_dir, users, requests))
+
+
+async def _bench_api(work_dir: Path, users: int, requests: int) -> List[Result]:
+    # Keep the API's calculator and its history files out of the project directory
+    os.environ["CALCULATOR_HISTORY_DIR"] = str(work_dir / "api" / "history")
+    import httpx
+    from sqlalchemy import create_engine, insert
+    from sqlalchemy.orm import sessionmaker
+
+    from app import models
+    from app.auth import create_access_token
+    from app.database import get_db
+    from main import app
+
+    engine = create_engine(f"sqlite:///{work_dir / 'api.db'}", connect_args={"check_same_thread": False})
+    models.Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with Session() as db:
+        db.execute(insert(models.User), datasets.user_rows(users))
+        db.execute(insert(models.Calculation), datasets.calculation_rows(users, per_user=10))
+        db.commit()
+
+    def override_get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    # user1 only reads, so the list benchmark sees the same 10 rows throughout; user2 writes
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'user1@example.com'})}"}
+    writer = {"Authorization": f"Bearer {create_access_token({'sub': 'user2@example.com'})}"}
+    payload = {"a": 12.5, "b": 3.25, "type": "multiply"}
+    login = {"username": f"user{users}", "password": "password"}
+
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            async def get_calculate():
+                (await client.get("/calculate/add", params={"a": 12.5, "b": 3.25})).raise_for_status()
+
+            async def post_calculation():
+                (await client.post("/calculations/", json=payload, headers=writer)).raise_for_status()
+
+            async def list_calculations():
+                (await client.get("/calculations/user/1", headers=headers)).raise_for_status()
+
+            async def post_login():
+                (await client.post("/login", json=login)).raise_for_status()
+
+            return [
+                await measure_async("api.GET /calculate/add", get_calculate, requests),
+                await measure_async("api.POST /calculations/", post_calculation, requests),
+                await measure_async("api.GET /calculations/user/{id}", list_calculations, requests),
+                await measure_async(f"api.POST /login[{users} users]", post_login, requests),
+            ]
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        engine.dispose()
+
+
+# -----------------------------
+# Baseline comparison
+# -----------------------------
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float) -> List[str]:
+    """Return a description of every benchmark that got slower or bigger than the baseline allows"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        if current["ops_per_sec"] < previous["ops_per_sec"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {current['ops_per_sec']:.1f} ops/s vs baseline {previous['ops_per_sec']:.1f}")
+        if current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {current['p95_ms']:.3f} ms vs baseline {previous['p95_ms']:.3f}")
+        # Ignore memory noise below 1 MiB
+        if current["peak_mib"] > previous["peak_mib"] * (1 + tolerance) + 1:
+            regressions.append(
+                f"{name}: peak memory {current['peak_mib']:.1f} MiB vs baseline {previous['peak_mib']:.1f}")
+    return regressions
+
+
+def environment() -> dict:
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help="small datasets for a fast smoke run")
+    parser.add_argument("--rows", help="comma separated history sizes (default 1000,100000,1000000)")
+    parser.add_argument("--users", type=int, help=f"users in the API database (default {datasets.USER_COUNT})")
+    parser.add_argument("--only", choices=GROUPS, action="append", help="run only these groups")
+    parser.add_argument("--output", type=Path, help="write results JSON here")
+    parser.add_argument("--baseline", type=Path, default=BASELINE, help="baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed regression as a fraction")
+    args = parser.parse_args(argv)
+
+    if args.rows:
+        sizes = [int(size) for size in args.rows.split(",")]
+    else:
+        sizes = [1_000] if args.quick else list(datasets.HISTORY_SIZES)
+    users = args.users or (1_000 if args.quick else datasets.USER_COUNT)
+    operations = 2_000 if args.quick else 20_000
+    requests = 200 if args.quick else 1_000
+    groups = args.only or GROUPS
+
+    results: List[Result] = []
+    with tempfile.TemporaryDirectory(prefix="calculator-bench-") as temp_dir:
+        work_dir = Path(temp_dir)
+        if "calculator" in groups:
+            print("calculator:")
+            results += bench_calculator(work_dir, operations)
+        if "history" in groups:
+            print("history:")
+            results += bench_history(work_dir, sizes)
+        if "api" in groups:
+            print("api:")
+            results += bench_api(work_dir, users, requests)
+
+    by_name = {result.name: asdict(result) for result in results}
+    report = {"environment": environment(), "results": by_name}
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"results written to {args.output}")
+
+    if args.save_baseline:
+        baseline = json.loads(args.baseline.read_text())["results"] if args.baseline.exists() else {}
+        baseline.update(by_name)
+        args.baseline.write_text(json.dumps({"environment": environment(), "results": baseline}, indent=2) + "\n")
+        print(f"baseline updated in {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"no baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+    regressions = compare(by_name, json.loads(args.baseline.read_text())["results"], args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if not regressions:
+        print(f"no regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
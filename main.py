@@ -1,6 +1,9 @@
+import math
 import os
-from fastapi import FastAPI, HTTPException, Depends
+from contextlib import asynccontextmanager
+from fastapi import APIRouter, FastAPI, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from sqlalchemy.orm import Session
 from dotenv import load_dotenv
@@ -10,6 +13,9 @@ from dotenv import load_dotenv
 # -----------------------------
 load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./test.db")
+RECORD_API_HISTORY = os.getenv("CALCULATOR_API_RECORD_HISTORY", "true").lower() in ("true", "1")
+# Serve auth and calculation routes as async handlers on an async engine
+ASYNC_DB = os.getenv("CALCULATOR_ASYNC_DB", "false").lower() in ("true", "1")
 
 # -----------------------------
 # Import app modules
@@ -18,14 +24,21 @@ from app import models, crud
 from app.database import engine, get_db
 from app.schemas import UserCreate, UserRead, LoginRequest
 from app.calculator import Calculator
+from app.history import QueuedHistorySink
+from app.metrics import REGISTRY, MetricsMiddleware, instrument_engine
 from app.operations import OperationFactory
-from app.routes_calculations import router as calculation_router
 from app import schemas
 
 # -----------------------------
 # Create FastAPI app
 # -----------------------------
-app = FastAPI(title="FastAPI Calculator + Users")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Record anything still queued before the process exits
+    history_sink.close()
+
+app = FastAPI(title="FastAPI Calculator + Users", lifespan=lifespan)
 
 # Mount frontend static files
 app.mount("/static", StaticFiles(directory="frontend"), name="frontend")
@@ -36,17 +49,32 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    # The calculation listing returns the next page's cursor in a header
+    expose_headers=["X-Next-Cursor"],
 )
 
+# Per-route request counts and latency, served at /metrics
+app.add_middleware(MetricsMiddleware)
+instrument_engine(engine)
+
 # -----------------------------
 # Create database tables
 # -----------------------------
 models.Base.metadata.create_all(bind=engine)
+models.create_indexes(engine)
 
 # -----------------------------
 # Include routers
 # -----------------------------
-from app.auth import router as auth_router
+if ASYNC_DB:
+    # Needs sqlalchemy[asyncio] plus aiosqlite or asyncpg
+    from app.auth_async import router as auth_router
+    from app.routes_calculations_async import router as calculation_router
+    from app.database_async import async_engine
+    instrument_engine(async_engine.sync_engine)
+else:
+    from app.auth import router as auth_router
+    from app.routes_calculations import router as calculation_router
 app.include_router(auth_router)
 app.include_router(calculation_router)
 
@@ -54,16 +82,57 @@ app.include_router(calculation_router)
 # Calculator Setup
 # -----------------------------
 calc = Calculator()
+history_sink = QueuedHistorySink(
+    calc,
+    max_queue=calc.config.history_sink_queue_size,
+    backpressure=calc.config.history_sink_backpressure
+)
+
+def result_float(value) -> float:
+    # JSON has no inf/nan; Decimal results beyond float range are rejected like invalid input
+    result = float(value)
+    if not math.isfinite(result):
+        raise HTTPException(status_code=400, detail="Result is not a finite number")
+    return result
 
 @app.get("/calculate/{op_name}")
 def api_calculate(op_name: str, a: float, b: float):
+    # Evaluate without touching the shared calculator; recording happens off the request thread
     try:
         operation = OperationFactory.create_operation(op_name)
-        calc.set_operation(operation)
-        result = calc.perform_operation(a, b)
-        return {"result": float(result)}
+        calculation = calc.evaluate(operation, a, b)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+    if RECORD_API_HISTORY:
+        history_sink.submit(calculation)
+    return {"result": result_float(calculation.result)}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    # Prometheus text exposition format
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+@app.post("/evaluate")
+def api_evaluate(request: schemas.ExpressionRequest):
+    # Expressions are compiled once and cached, so repeated formulas skip parsing
+    try:
+        if request.bindings is None:
+            result = calc.evaluate_expression(request.expression, request.variables)
+        else:
+            batch = calc.evaluate_expression_many(request.expression, request.bindings)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if request.bindings is None:
+        return {"result": result_float(result)}
+    results = []
+    errors = dict(batch.errors)
+    for index, value in enumerate(batch.results):
+        value = None if value is None else float(value)
+        if value is not None and not math.isfinite(value):
+            value = None
+            errors[index] = "Result is not a finite number"
+        results.append(value)
+    return {"results": results, "errors": dict(sorted(errors.items()))}
 
 # -----------------------------
 # Auth routes (login/register)
@@ -72,7 +141,10 @@ from fastapi import Body
 
 from app.auth import create_access_token
 
-@app.post("/register", response_model=schemas.Token)
+# Sync register/login; app.auth_async serves these when ASYNC_DB is on
+sync_auth_router = APIRouter()
+
+@sync_auth_router.post("/register", response_model=schemas.Token)
 def register_user(user_in: schemas.UserCreate, db: Session = Depends(get_db)):
     # optional: default username to email if not sent
     if not user_in.username:
@@ -90,7 +162,7 @@ def register_user(user_in: schemas.UserCreate, db: Session = Depends(get_db)):
     return {"access_token": token, "token_type": "bearer"}
 
 
-@app.post("/login", response_model=schemas.Token)
+@sync_auth_router.post("/login", response_model=schemas.Token)
 def login(login_data: schemas.LoginRequest, db: Session = Depends(get_db)):
     user = crud.authenticate_user(db, login_data.username, login_data.password)
     if not user:
@@ -99,6 +171,8 @@ def login(login_data: schemas.LoginRequest, db: Session = Depends(get_db)):
     token = create_access_token({"sub": user.email})
     return {"access_token": token, "token_type": "bearer"}
 
+if not ASYNC_DB:
+    app.include_router(sync_auth_router)
 
 
 # -----------------------------
@@ -108,6 +182,7 @@ def init_db():
     from app import models
     from app.database import engine
     models.Base.metadata.create_all(bind=engine)
+    models.create_indexes(engine)
 
 if __name__ == "__main__":
     init_db()
@@ -0,0 +1,99 @@
+import json
+from contextlib import asynccontextmanager
+
+import pytest
+
+pytest.importorskip("greenlet")
+pytest.importorskip("aiosqlite")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app import models
+from app.auth_async import router as auth_router
+from app.database_async import async_database_url, get_async_db
+from app.routes_calculations_async import router as calculation_router
+
+
+def test_async_database_url():
+    assert async_database_url("sqlite:///./app.db") == "sqlite+aiosqlite:///./app.db"
+    assert async_database_url("postgresql+psycopg2://u:p@db:5432/x") == "postgresql+asyncpg://u:p@db:5432/x"
+    assert async_database_url("postgresql+asyncpg://db/x") == "postgresql+asyncpg://db/x"
+
+
+@pytest.fixture
+def client():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    sessions = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with sessions() as db:
+            yield db
+
+    @asynccontextmanager
+    async def lifespan(app):
+        async with engine.begin() as connection:
+            await connection.run_sync(models.Base.metadata.create_all)
+        yield
+
+    app = FastAPI(lifespan=lifespan)
+    app.include_router(auth_router)
+    app.include_router(calculation_router)
+    app.dependency_overrides[get_async_db] = override_get_async_db
+
+    with TestClient(app) as c:
+        yield c
+
+
+def test_async_auth_and_calculation_routes(client):
+    token = client.post("/register", json={"email": "a@example.com", "username": "a", "password": "pw"}).json()
+    assert client.post("/register", json={"email": "a@example.com", "username": "a", "password": "pw"}).status_code == 400
+    assert client.post("/login", json={"username": "a", "password": "bad"}).status_code == 401
+    login = client.post("/login", json={"username": "a", "password": "pw"}).json()
+    headers = {"Authorization": f"Bearer {login['access_token']}"}
+    assert token["token_type"] == "bearer"
+    user = client.get("/me", headers=headers).json()
+
+    created = client.post("/calculations/", json={"a": 2, "b": 3, "type": "add"}, headers=headers).json()
+    assert created["result"] == 5
+    batch = client.post("/calculations/batch", json=[
+        {"a": 6, "b": 3, "type": "divide"}, {"a": 1, "b": 0, "type": "divide"}
+    ], headers=headers).json()
+    assert (batch["created"], batch["failed"]) == (1, 1)
+
+    listed = client.get(f"/calculations/user/{user['id']}", headers=headers).json()
+    assert [c["result"] for c in listed] == [5, 2]
+    assert client.get(f"/calculations/{created['id']}", headers=headers).json()["type"] == "ADD"
+    assert client.delete(f"/calculations/{created['id']}", headers=headers).status_code == 204
+    assert client.get(f"/calculations/{created['id']}", headers=headers).status_code == 404
+    assert client.get("/me").status_code == 401
+
+
+def test_async_listing_export_and_import(client):
+    token = client.post("/register", json={"email": "b@example.com", "username": "b", "password": "pw"}).json()
+    headers = {"Authorization": f"Bearer {token['access_token']}"}
+    user = client.get("/me", headers=headers).json()
+
+    body = "operation,operand1,operand2,result,timestamp\n" + "".join(
+        f"{op},{i},2,{i + 2 if op == 'add' else i * 2},2025-01-01T00:00:{i:02d}\n"
+        for i, op in enumerate(["add", "multiply", "power"] * 4)
+    )
+    progress = [json.loads(line) for line in
+                client.post("/calculations/import", content=body.encode(), headers=headers).text.splitlines()]
+    assert progress[-1] == {"rows": 12, "imported": 8, "invalid": 0, "unsupported": {"power": 4}, "done": True}
+
+    pages, cursor = [], None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        response = client.get(f"/calculations/user/{user['id']}", params=params, headers=headers)
+        pages.append([row["a"] for row in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    assert pages == [[0, 1, 3], [4, 6, 7], [9, 10]]
+
+    exported = client.get(f"/calculations/user/{user['id']}/export", params={"format": "csv"}, headers=headers)
+    assert exported.text.splitlines()[0] == "id,type,a,b,result,created_at"
+    assert len(exported.text.splitlines()) == 9
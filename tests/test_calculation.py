@@ -84,6 +84,23 @@ def test_invalid_from_dict():
     with pytest.raises(OperationError, match="Invalid calculation data"):
         Calculation.from_dict(data)
 
+def test_from_columns():
+    stamp = datetime.now().isoformat()
+    calcs = Calculation.from_columns(["add", "divide"], ["2", "9"], ["3", "3"], ["5", "3"], [stamp, stamp])
+    assert [c.result for c in calcs] == [Decimal("5"), Decimal("3")]
+    assert calcs[1].timestamp.isoformat() == stamp
+
+def test_invalid_from_columns():
+    with pytest.raises(OperationError, match="Invalid calculation data"):
+        Calculation.from_columns(["add"], ["x"], ["3"], ["5"], [datetime.now().isoformat()])
+
+def test_verify_logs_mismatch(caplog):
+    calc = Calculation(operation="add", operand1=Decimal("2"), operand2=Decimal("3"), result=Decimal("6"))
+    with caplog.at_level(logging.WARNING):
+        assert calc.verify() is False
+    assert "differs from computed result" in caplog.text
+    assert Calculation(operation="add", operand1=Decimal("2"), operand2=Decimal("3")).verify()
+
 def test_format_result():
     calc = Calculation(operation="divide", operand1=Decimal("1"), operand2=Decimal("3"))
     assert calc.format_result(precision=2) == "0.33"
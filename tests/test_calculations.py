@@ -98,3 +98,198 @@
 
 #     app.dependency_overrides.clear()
 
+
+
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import models
+from app.auth import get_current_user
+from app.database import get_db
+from main import app
+
+
+@pytest.fixture
+def api():
+    """Client with the calculation tables in memory and a logged-in user"""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    models.Base.metadata.create_all(bind=engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    user = models.User(username="batch", email="batch@example.com", password_hash="x")
+    session.add(user)
+    session.commit()
+
+    app.dependency_overrides[get_db] = lambda: session
+    app.dependency_overrides[get_current_user] = lambda: user
+    try:
+        yield TestClient(app), session, user
+    finally:
+        app.dependency_overrides.clear()
+        session.close()
+
+
+def test_batch_create_stores_successes_and_reports_errors(api):
+    client, session, user = api
+    payload = [
+        {"a": 2, "b": 3, "type": "add"},
+        {"a": 5, "b": 0, "type": "divide"},
+        {"a": 4, "b": 2.5, "type": "MULTIPLY"},
+        {"a": 1e308, "b": 10, "type": "multiply"},
+        {"a": 1e5, "b": 1e4, "type": "multiply"},
+    ]
+    response = client.post("/calculations/batch", json=payload)
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["created"], data["failed"]) == (2, 3)
+    items = data["items"]
+    assert [item["index"] for item in items] == [0, 1, 2, 3, 4]
+    assert items[0]["result"] == 5 and items[2]["result"] == 10
+    assert "divide by zero" in items[1]["error"] and items[1]["id"] is None
+    assert "finite" in items[3]["error"]
+    # Too large for the Numeric(10, 2) columns, which would fail the whole INSERT on PostgreSQL
+    assert "smaller than 100,000,000" in items[4]["error"]
+
+    stored = session.query(models.Calculation).order_by(models.Calculation.id).all()
+    assert [c.id for c in stored] == [items[0]["id"], items[2]["id"]]
+    assert [float(c.result) for c in stored] == [5, 10]
+    assert all(c.user_id == user.id and c.created_at is not None for c in stored)
+
+
+def test_batch_create_validates_items_and_size(api, monkeypatch):
+    client, session, _ = api
+    assert client.post("/calculations/batch", json=[{"a": 1, "b": 2, "type": "power"}]).status_code == 422
+    response = client.post("/calculations/batch", json={"a": 1})
+    assert response.status_code == 422 and response.json()["detail"][0]["loc"] == ["body"]
+    monkeypatch.setattr("app.routes_calculations.MAX_BATCH_SIZE", 2)
+    assert client.post("/calculations/batch", json=[{"a": 1, "b": 2, "type": "add"}] * 3).status_code == 413
+    # Bodies over the byte limit are refused without being parsed
+    monkeypatch.setattr("app.routes_calculations.MAX_BATCH_BYTES", 64)
+    assert client.post("/calculations/batch", content=b"[" + b" " * 100 + b"]").status_code == 413
+    chunks = iter([b"[", b" " * 100, b"]"])
+    assert client.post("/calculations/batch", content=chunks).status_code == 413
+    assert client.post("/calculations/batch", json=[]).json() == {"created": 0, "failed": 0, "items": []}
+    assert session.query(models.Calculation).count() == 0
+
+
+def add_rows(session, user, count):
+    start = datetime(2025, 1, 1)
+    types = ["ADD", "SUBTRACT", "MULTIPLY"]
+    session.add_all(
+        models.Calculation(a=i, b=2, type=types[i % 3], result=i * 10, user_id=user.id,
+                           # Pairs share a timestamp so the id breaks ties
+                           created_at=start + timedelta(minutes=i // 2))
+        for i in range(count)
+    )
+    session.commit()
+
+
+def fetch_all(client, user, **params):
+    pages, cursor = [], None
+    while True:
+        query = dict(params, **({"cursor": cursor} if cursor else {}))
+        response = client.get(f"/calculations/user/{user.id}", params=query)
+        assert response.status_code == 200
+        pages.append([row["a"] for row in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return pages
+
+
+def test_user_calculations_keyset_pages(api):
+    client, session, user = api
+    add_rows(session, user, 25)
+    pages = fetch_all(client, user, limit=10)
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert sum(pages, []) == list(range(25))
+    assert sum(fetch_all(client, user, limit=7, order="desc"), []) == list(range(24, -1, -1))
+    assert len(client.get(f"/calculations/user/{user.id}").json()) == 25
+
+
+def test_next_cursor_is_exposed_to_browsers(api):
+    client, session, user = api
+    add_rows(session, user, 3)
+    response = client.get(f"/calculations/user/{user.id}", params={"limit": 2, "order": "desc"},
+                          headers={"Origin": "http://localhost:3000"})
+    assert [row["a"] for row in response.json()] == [2, 1]
+    assert "X-Next-Cursor" in response.headers
+    assert "x-next-cursor" in response.headers["access-control-expose-headers"].lower()
+
+
+def test_user_calculations_filters(api):
+    client, session, user = api
+    add_rows(session, user, 25)
+    assert sum(fetch_all(client, user, type="add", limit=3), []) == list(range(0, 25, 3))
+    assert sum(fetch_all(client, user, min_result=50, max_result=120), []) == list(range(5, 13))
+    assert sum(fetch_all(client, user, min_a=20), []) == list(range(20, 25))
+    assert sum(fetch_all(client, user, created_after="2025-01-01T00:03:00",
+                         created_before="2025-01-01T00:05:00"), []) == [6, 7, 8, 9]
+
+    base = f"/calculations/user/{user.id}"
+    assert client.get(base, params={"type": "power"}).status_code == 422
+    assert client.get(base, params={"limit": 0}).status_code == 422
+    assert client.get(base, params={"cursor": "not-a-cursor"}).status_code == 400
+    assert client.get(f"/calculations/user/{user.id + 1}").status_code == 403
+
+
+def test_listing_indexes_exist(api):
+    _, session, _ = api
+    indexes = {index["name"] for index in inspect(session.get_bind()).get_indexes("calculations")}
+    assert {"ix_calculations_user_created", "ix_calculations_user_type_created",
+            "ix_calculations_user_result"} <= indexes
+
+
+def test_export_streams_ndjson_and_csv(api, monkeypatch):
+    client, session, user = api
+    add_rows(session, user, 25)
+    monkeypatch.setattr("app.routes_calculations.EXPORT_BATCH_SIZE", 4)
+
+    response = client.get(f"/calculations/user/{user.id}/export")
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["a"] for row in rows] == list(range(25))
+    assert rows[4] == {"id": rows[4]["id"], "type": "SUBTRACT", "a": 4.0, "b": 2.0, "result": 40.0,
+                       "created_at": "2025-01-01T00:02:00"}
+
+    response = client.get(f"/calculations/user/{user.id}/export", params={"format": "csv"})
+    assert response.headers["content-type"].startswith("text/csv")
+    assert 'filename="calculations-' in response.headers["content-disposition"]
+    records = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(records) == 25 and records[0]["type"] == "ADD" and records[0]["created_at"] == "2025-01-01T00:00:00"
+
+    assert client.get(f"/calculations/user/{user.id}/export", params={"format": "xml"}).status_code == 422
+    assert client.get(f"/calculations/user/{user.id + 1}/export").status_code == 403
+
+
+def test_import_streams_repl_history_in_batches(api, monkeypatch):
+    client, session, user = api
+    monkeypatch.setattr("app.routes_calculations.IMPORT_BATCH_SIZE", 3)
+    body = (
+        "operation,operand1,operand2,result,timestamp\n"
+        + "".join(f"add,{i},2,{i + 2},2025-01-01T00:00:0{i}\n" for i in range(5))
+        + "power,2,3,8,2025-01-01T00:01:00\n"
+        + "divide,x,2,1,2025-01-01T00:01:00\n"
+        + "divide,9,2,4.5,2025-01-01T00:02:00\n"
+    ).encode()
+    chunks = (body[i:i + 7] for i in range(0, len(body), 7))
+
+    response = client.post("/calculations/import", content=chunks)
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["imported"] for line in lines] == [3, 6, 6]
+    assert lines[-1] == {"rows": 8, "imported": 6, "invalid": 1, "unsupported": {"power": 1}, "done": True}
+
+    stored = session.query(models.Calculation).order_by(models.Calculation.id).all()
+    assert [(calc.type, float(calc.result)) for calc in stored[-2:]] == [
+        (models.OperationType.ADD, 6.0), (models.OperationType.DIVIDE, 4.5)]
+    assert stored[0].created_at.isoformat() == "2025-01-01T00:00:00" and stored[0].user_id == user.id
+
+    assert client.post("/calculations/import", content=b"id,name\n1,x\n").status_code == 400
+    assert client.post("/calculations/import", content=b"").status_code == 400
@@ -1,4 +1,5 @@
 import datetime
+import threading
 from pathlib import Path
 import pandas as pd
 import pytest
@@ -78,6 +79,135 @@ def test_redo(calculator):
     calculator.redo()
     assert len(calculator.history) == 1
 
+def test_undo_redo_multiple_steps(calculator):
+    calculator.set_operation(OperationFactory.create_operation('add'))
+    for i in range(5):
+        calculator.perform_operation(i, 1)
+    assert calculator.undo(steps=3)
+    assert [c.operand1 for c in calculator.history] == [Decimal('0'), Decimal('1')]
+    assert len(calculator.redo_stack) == 3
+    assert calculator.redo()
+    assert len(calculator.history) == 3
+    assert calculator.redo(steps=10)
+    assert [c.operand1 for c in calculator.history] == [Decimal(i) for i in range(5)]
+    assert calculator.redo_stack == []
+
+def test_undo_does_not_copy_history(calculator):
+    calculator.set_operation(OperationFactory.create_operation('add'))
+    calculator.perform_operation(1, 1)
+    calculator.perform_operation(2, 2)
+    first, second = calculator.undo_stack
+    assert first.timeline is second.timeline
+    assert first.history == []
+    assert len(second.history) == 1
+
+def test_undo_after_new_operation_discards_redo(calculator):
+    calculator.set_operation(OperationFactory.create_operation('add'))
+    calculator.perform_operation(1, 1)
+    calculator.perform_operation(2, 2)
+    calculator.undo()
+    calculator.perform_operation(3, 3)
+    assert calculator.redo() is False
+    assert [c.result for c in calculator.history] == [Decimal('2'), Decimal('6')]
+    calculator.undo()
+    assert [c.result for c in calculator.history] == [Decimal('2')]
+
+def test_undo_across_history_replacement(calculator):
+    calculator.set_operation(OperationFactory.create_operation('add'))
+    calculator.perform_operation(1, 1)
+    loaded = calculator.history.copy()
+    calculator.history = loaded
+    calculator.perform_operation(2, 2)
+    calculator.undo(steps=2)
+    assert calculator.history == []
+    calculator.redo(steps=2)
+    assert [c.result for c in calculator.history] == [Decimal('2'), Decimal('4')]
+
+def test_history_limited_to_max_size(calculator):
+    calculator.config.max_history_size = 3
+    calculator.set_operation(OperationFactory.create_operation('add'))
+    for i in range(5):
+        calculator.perform_operation(i, 0)
+    assert [c.result for c in calculator.history] == [Decimal(i) for i in (2, 3, 4)]
+    assert len(calculator.undo_stack) == 3
+    archived = pd.read_csv(calculator.config.history_archive_file)
+    assert list(archived['result']) == [0, 1]
+
+    assert calculator.undo(steps=3)
+    assert calculator.history == []
+    assert calculator.undo() is False
+    assert calculator.redo(steps=3)
+    assert [c.result for c in calculator.history] == [Decimal(i) for i in (2, 3, 4)]
+
+def test_load_history_archives_rows_over_limit(calculator):
+    calculator.set_operation(OperationFactory.create_operation('add'))
+    for i in range(4):
+        calculator.perform_operation(i, 0)
+    calculator.save_history()
+    calculator.config.max_history_size = 2
+    calculator.load_history()
+    assert [c.result for c in calculator.history] == [Decimal('2'), Decimal('3')]
+    assert len(pd.read_csv(calculator.config.history_file)) == 2
+    assert len(pd.read_csv(calculator.config.history_archive_file)) == 2
+
+def test_columnar_history_store(calculator):
+    calculator.config.history_store = 'columnar'
+    calculator.history = []
+    calculator.set_operation(OperationFactory.create_operation('divide'))
+    calculator.perform_operation(1, 4)
+    calculator.perform_operation(1, 3)
+    assert type(calculator.history).__name__ == 'ColumnarHistory'
+    assert calculator.show_history()[0] == "divide(1, 4) = 0.25"
+    calculator.undo()
+    assert len(calculator.history) == 1
+    calculator.redo()
+    assert calculator.history[1].result == Decimal(1) / Decimal(3)
+
+def test_binary_history_format_round_trip(calculator):
+    calculator.config.history_format = 'binary'
+    calculator.set_operation(OperationFactory.create_operation('divide'))
+    calculator.perform_operation(1, 3)
+    calculator.perform_operation('1.000000000000000000000000000000000000001', 2)
+    calculator.save_history()
+    assert calculator.config.history_binary_file.exists()
+    assert not calculator.config.history_file.exists()
+    saved = list(calculator.history)
+    calculator.clear_history()
+    calculator.load_history()
+    assert calculator.history == saved
+
+def test_perform_many_exact(calculator):
+    observer = Mock()
+    calculator.add_observer(observer)
+    batch = calculator.perform_many(OperationFactory.create_operation('divide'), [6, 1, 'x'], [3, 0, 1])
+    assert batch.results == [Decimal('2'), None, None]
+    assert batch.errors == {1: "Division by zero", 2: "Invalid number: x"}
+    assert batch.succeeded == 1
+    assert len(calculator.history) == 1
+    observer.update_batch.assert_called_once()
+    observer.update.assert_not_called()
+
+def test_perform_many_float(calculator):
+    batch = calculator.perform_many(OperationFactory.create_operation('root'), [16, -4, 8], [2, 2, 3], mode='float')
+    assert batch.results == [4.0, None, 2.0]
+    assert batch.errors == {1: "Cannot calculate root of negative number"}
+    assert [c.result for c in calculator.history] == [Decimal('4.0'), Decimal('2.0')]
+
+def test_perform_many_is_one_undo_step(calculator):
+    calculator.perform_many(OperationFactory.create_operation('add'), [1, 2, 3], [1, 1, 1])
+    assert len(calculator.undo_stack) == 1
+    calculator.undo()
+    assert calculator.history == []
+
+def test_perform_many_invalid_arguments(calculator):
+    add = OperationFactory.create_operation('add')
+    with pytest.raises(ValidationError):
+        calculator.perform_many(add, [1, 2], [1])
+    with pytest.raises(ValidationError):
+        calculator.perform_many(add, ['x'], [1], mode='float')
+    with pytest.raises(OperationError, match="Unknown batch mode"):
+        calculator.perform_many(add, [1], [1], mode='fast')
+
 def test_clear_history(calculator):
     operation = OperationFactory.create_operation('add')
     calculator.set_operation(operation)
@@ -87,26 +217,24 @@ def test_clear_history(calculator):
     assert calculator.undo_stack == []
     assert calculator.redo_stack == []
 
-@patch('app.calculator.pd.DataFrame.to_csv')
-def test_save_history(mock_to_csv, calculator):
+@patch('app.calculator.write_history')
+def test_save_history(mock_write_history, calculator):
     operation = OperationFactory.create_operation('add')
     calculator.set_operation(operation)
     calculator.perform_operation(2, 3)
     calculator.save_history()
-    mock_to_csv.assert_called_once()
+    mock_write_history.assert_called_once()
 
-@patch('app.calculator.pd.read_csv')
-@patch('app.calculator.Path.exists', return_value=True)
-def test_load_history(mock_exists, mock_read_csv, calculator):
+def test_load_history(calculator):
     # csv data
-    mock_read_csv.return_value = pd.DataFrame({
+    pd.DataFrame({
         'operation': ['add'],
         'operand1': ['1'],
         'operand2': ['3'],
         'result': ['4'],
         'timestamp': [datetime.datetime.now().isoformat()]
-    })
-    
+    }).to_csv(calculator.config.history_file, index=False)
+
     try:
         calculator.load_history()
         # check history length
@@ -119,6 +247,26 @@ def test_load_history(mock_exists, mock_read_csv, calculator):
     except OperationError:
         pytest.fail("Loading history failed due to OperationError")
 
+def test_load_history_verifies_sample(calculator):
+    pd.DataFrame({
+        'operation': ['add', 'add'],
+        'operand1': ['1', '2'],
+        'operand2': ['3', '3'],
+        'result': ['4', '6'],
+        'timestamp': [datetime.datetime.now().isoformat()] * 2
+    }).to_csv(calculator.config.history_file, index=False)
+    calculator.config.load_verify_sample = 0
+    calculator.load_history()
+    assert len(calculator.history) == 2
+    assert calculator.last_load_seconds is not None
+    assert calculator.verify_history() == 1
+    # Sampling checks exactly `sample` calculations, so the mismatch is found only when drawn
+    with patch('app.calculator.random.sample', side_effect=lambda history, k: history[-k:]) as sample:
+        assert calculator.verify_history(sample=1) == 1
+    sample.assert_called_once_with(calculator.history, 1)
+    with patch('app.calculator.random.sample', side_effect=lambda history, k: history[:k]):
+        assert calculator.verify_history(sample=1) == 0
+
 @patch('app.calculator.logging.info')
 def test_logging_setup(logging_info_mock):
     with patch.object(CalculatorConfig, 'log_dir', new_callable=PropertyMock) as mock_log_dir, \
@@ -129,3 +277,156 @@ def test_logging_setup(logging_info_mock):
         # Instantiate calculator to trigger logging
         calculator = Calculator(CalculatorConfig())
         logging_info_mock.assert_any_call("Calculator initialized with configuration")
+
+def test_async_observers(calculator):
+    calculator.config.async_observers = True
+    calculator = Calculator(config=calculator.config)
+    observer = Mock()
+    calculator.add_observer(observer)
+    calculator.set_operation(OperationFactory.create_operation('add'))
+    calculator.perform_operation(1, 2)
+    calculator.perform_operation(3, 4)
+    calculator.flush_observers()
+    delivered = [c for call in observer.update_batch.call_args_list for c in call.args[0]]
+    assert [c.result for c in delivered] == [Decimal('3'), Decimal('7')]
+    calculator.observer_bus.close()
+
+def test_async_autosave_writes_a_snapshot(calculator):
+    calculator.config.async_observers = True
+    calculator.config.auto_save = True
+    calculator = Calculator(config=calculator.config)
+    calculator.add_observer(AutoSaveObserver(calculator))
+    calculator.set_operation(OperationFactory.create_operation('add'))
+    written = []
+
+    def write(path, history):
+        if not written:
+            # Recording on another thread neither waits for the write nor changes what it writes
+            worker = threading.Thread(target=calculator.perform_operation, args=(5, 5))
+            worker.start()
+            worker.join(timeout=5)
+            assert not worker.is_alive()
+        written.append([c.result for c in history])
+
+    with patch('app.calculator.write_history', side_effect=write):
+        calculator.perform_operation(1, 2)
+        calculator.flush_observers()
+    assert written[0] == [Decimal('3')]
+    assert written[-1] == [Decimal('3'), Decimal('10')]
+    calculator.observer_bus.close()
+
+def test_power_and_root_use_configured_precision(calculator):
+    calculator.config.precision = 6
+    calculator.set_operation(OperationFactory.create_operation('root'))
+    assert str(calculator.perform_operation(2, 2)) == "1.41421"
+    calculator.set_operation(OperationFactory.create_operation('divide'))
+    # Other operations keep the default decimal precision
+    assert calculator.perform_operation(1, 3) == Decimal(1) / Decimal(3)
+    assert calculator.verify_history() == 0
+
+def test_evaluate_expression(calculator):
+    assert calculator.evaluate_expression("power(x, 2) + 1", {"x": "3"}) == Decimal("10")
+    assert calculator.history == []
+    calculator.config.max_input_value = Decimal("1000")
+    with pytest.raises(ValidationError, match="exceeds maximum"):
+        calculator.evaluate_expression("x + 1", {"x": 10 ** 9})
+
+def test_evaluate_expression_many(calculator):
+    batch = calculator.evaluate_expression_many("a / b", [{"a": 1, "b": 4}, {"a": 1, "b": 0}, {"a": 1}])
+    assert batch.results == [Decimal("0.25"), None, None]
+    assert batch.errors == {1: "Division by zero", 2: "Unbound variable: b"}
+
+def test_result_cache(calculator):
+    assert calculator.result_cache is None
+    calculator.config.cache_size = 8
+    calculator = Calculator(config=calculator.config)
+    calculator.set_operation(OperationFactory.create_operation('power'))
+    assert calculator.perform_operation(2, 10) == Decimal('1024')
+    assert calculator.perform_operation(2, 10) == Decimal('1024')
+    calculator.perform_many(OperationFactory.create_operation('power'), [2, 3], [10, 2])
+    assert calculator.result_cache.stats()['hits'] == 2
+    assert calculator.result_cache.stats()['misses'] == 2
+    assert len(calculator.history) == 4
+
+def test_query_history(calculator):
+    from app.history_index import parse_filter
+    calculator.set_operation(OperationFactory.create_operation('add'))
+    for i in range(10):
+        calculator.perform_operation(i, 1)
+    total, page = calculator.query_history([parse_filter("result>5")], start=1, count=2)
+    assert total == 5
+    assert [(position, str(c)) for position, c in page] == [(6, "add(6, 1) = 7"), (7, "add(7, 1) = 8")]
+    calculator.undo()
+    assert calculator.query_history([parse_filter("result>5")])[0] == 4
+    calculator.clear_history()
+    assert calculator.query_history() == (0, [])
+
+def test_load_history_in_chunks_archives_excess(calculator):
+    from app.history_stream import write_history
+    from app.calculation import Calculation
+    saved = [Calculation('add', Decimal(i), Decimal(1)) for i in range(25)]
+    write_history(calculator.config.history_file, saved)
+    calculator.config.history_chunk_size = 4
+    calculator.config.max_history_size = 10
+    calculator.load_history()
+    assert calculator.history == saved[15:]
+    assert len(pd.read_csv(calculator.config.history_file)) == 10
+    assert len(pd.read_csv(calculator.config.history_archive_file)) == 15
+    assert list(calculator.config.history_archive_file.parent.glob("*.loading")) == []
+
+def test_import_and_export_history(calculator, tmp_path):
+    calculator.set_operation(OperationFactory.create_operation('multiply'))
+    for i in range(5):
+        calculator.perform_operation(i, 2)
+    path = tmp_path / "export.csv.gz"
+    assert calculator.export_history(path) == 5
+
+    calculator.config.history_chunk_size = 2
+    observer = Mock()
+    calculator.add_observer(observer)
+    assert calculator.import_history(path) == 5
+    assert len(calculator.history) == 10
+    assert observer.update_batch.call_count == 3
+    # The whole import is a single undo step
+    calculator.undo()
+    assert len(calculator.history) == 5
+
+    with pytest.raises(OperationError, match="Failed to import history"):
+        calculator.import_history(tmp_path / "missing.csv")
+
+def test_export_history_with_archive(calculator, tmp_path):
+    calculator.config.max_history_size = 3
+    calculator.set_operation(OperationFactory.create_operation('add'))
+    for i in range(5):
+        calculator.perform_operation(i, 1)
+    assert calculator.export_history(tmp_path / "current.csv") == 3
+    assert calculator.export_history(tmp_path / "all.csv.xz", include_archive=True) == 5
+    assert pd.read_csv(tmp_path / "all.csv.xz")['operand1'].tolist() == [0, 1, 2, 3, 4]
+
+def test_sqlite_history_format(calculator):
+    from app.history_index import parse_filter
+    calculator.config.history_format = 'sqlite'
+    calculator.config.max_history_size = 3
+    calculator.set_operation(OperationFactory.create_operation('add'))
+    for i in range(5):
+        calculator.perform_operation(i, 1)
+    calculator.save_history()
+    assert not calculator.config.history_archive_file.exists()
+    assert calculator.search_saved_history(include_archive=True)[0] == 5
+
+    calculator.undo()
+    calculator.save_history()
+    total, page = calculator.search_saved_history([parse_filter("result>=2")])
+    assert total == 2
+    assert [str(c) for _, c in page] == ["add(2, 1) = 3", "add(3, 1) = 4"]
+
+    saved = list(calculator.history)
+    calculator.clear_history()
+    calculator._sqlite = None
+    calculator.load_history()
+    assert calculator.history == saved
+    assert calculator.export_history(calculator.config.history_dir / "all.csv", include_archive=True) == 4
+
+def test_search_saved_history_requires_sqlite(calculator):
+    with pytest.raises(OperationError, match="requires history_format 'sqlite'"):
+        calculator.search_saved_history()
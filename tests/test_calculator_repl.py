@@ -1,6 +1,7 @@
 import pytest
 from io import StringIO
-from app.calculator_repl import calculator_repl  
+from app.calculator_repl import HISTORY_PAGE_SIZE, calculator_repl, parse_history_args
+from app.exceptions import OperationError, ValidationError
 
 
 def run_repl_with_inputs(monkeypatch, inputs):
@@ -87,6 +88,7 @@ def fake_calc_ex(monkeypatch):
             self.config = Cfg()
         def add_observer(self, o): pass
         def show_history(self): return []
+        def query_history(self, filters, start, count): return 0, []
         def clear_history(self): pass
         def undo(self): return False
         def redo(self): return False
@@ -94,6 +96,7 @@ def fake_calc_ex(monkeypatch):
         def load_history(self): raise Exception("load failed")
         def set_operation(self, op): pass
         def perform_operation(self, a, b): raise ValueError("bad op")
+        def flush_observers(self): pass
     monkeypatch.setattr("app.calculator_repl.Calculator", lambda: FakeCalc())
     monkeypatch.setattr("app.calculator_repl.OperationFactory",
                         type("F", (), {"create_operation": staticmethod(lambda x: x)}))
@@ -115,6 +118,8 @@ def fake_calc(monkeypatch):
 
         def add_observer(self, o): pass
         def show_history(self): return self.history
+        def query_history(self, filters, start, count):
+            return len(self.history), list(enumerate(self.history))[start:start + count]
         def clear_history(self): self.history.clear()
         def undo(self):
             self.undo_called = True
@@ -124,8 +129,15 @@ def fake_calc(monkeypatch):
             return True
         def save_history(self): print("History saved successfully")
         def load_history(self): print("History loaded successfully")
+        def export_history(self, path, include_archive=False): return len(self.history)
+        def import_history(self, path):
+            if path == "missing.csv":
+                raise OperationError("Failed to import history: missing.csv")
+            self.history.append("add(1, 1) = 2")
+            return 1
         def set_operation(self, op): pass
         def perform_operation(self, a, b): return 42  # mock result
+        def flush_observers(self): pass
 
     monkeypatch.setattr("app.calculator_repl.Calculator", lambda: FakeCalc())
     monkeypatch.setattr("app.calculator_repl.OperationFactory",
@@ -168,6 +180,39 @@ def test_history_command(monkeypatch, capsys, fake_calc):
     assert "No calculations" in out or "Calculation History" in out
 
 
+def test_history_paging(monkeypatch, capsys, fake_calc):
+    monkeypatch.setattr("app.calculator_repl.Calculator", lambda: fake_calc)
+    fake_calc.history.extend(f"add({i}, 1) = {i + 1}" for i in range(30))
+    run_inputs(monkeypatch, ["history 21 5", "history 40", "history x", "exit"])
+    out = capsys.readouterr().out
+    assert "Calculation History (21-25 of 30)" in out
+    assert "21. add(20, 1) = 21" in out
+    assert "25. add(24, 1) = 25" in out
+    assert "26. " not in out
+    assert "Type 'history 26 5' for more" in out
+    assert "No calculations past entry 30" in out
+    assert "Invalid filter: x" in out
+
+
+def test_parse_history_args():
+    filters, start, count = parse_history_args(" 500 50 op=add result>=10")
+    assert (start, count) == (499, 50)
+    assert [f.field for f in filters] == ['operation', 'result']
+    assert parse_history_args("") == ([], 0, HISTORY_PAGE_SIZE)
+    with pytest.raises(ValidationError):
+        parse_history_args("0")
+
+
+def test_import_export_commands(monkeypatch, capsys, fake_calc):
+    run_inputs(monkeypatch, ["import", "History.csv.gz", "export", "Out.csv", "import", "missing.csv",
+                             "export", "cancel", "exit"])
+    out = capsys.readouterr().out
+    assert "Imported 1 calculations from History.csv.gz" in out
+    assert "Exported 1 calculations to Out.csv" in out
+    assert "Error: Failed to import history: missing.csv" in out
+    assert "Operation cancelled" in out
+
+
 def test_clear_command(monkeypatch, capsys, fake_calc):
     run_inputs(monkeypatch, ["clear", "exit"])
     out = capsys.readouterr().out
@@ -205,3 +250,26 @@ def test_add_operation_cancel(monkeypatch, capsys, fake_calc):
     run_inputs(monkeypatch, ["add", "cancel", "exit"])
     out = capsys.readouterr().out
     assert "Operation cancelled" in out
+
+
+def test_eval_expression(monkeypatch, capsys):
+    inputs = ["eval", "power(x, 2) + root(y, 3) / 2", "x=3, y=27", "eval", "1 +", "exit"]
+    input_iter = iter(inputs)
+    monkeypatch.setattr("builtins.input", lambda _: next(input_iter))
+
+    calculator_repl()
+    captured = capsys.readouterr()
+
+    assert "Result: 10.5" in captured.out
+    assert "Error: Invalid expression" in captured.out
+
+
+def test_stats_command(monkeypatch, capsys):
+    inputs = ["add", "2", "3", "stats", "exit"]
+    input_iter = iter(inputs)
+    monkeypatch.setattr("builtins.input", lambda _: next(input_iter))
+
+    calculator_repl()
+    captured = capsys.readouterr()
+
+    assert "calculator_operation_seconds[add]: count=" in captured.out
@@ -0,0 +1,51 @@
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from app.calculation import Calculation
+from app.columnar_history import ColumnarHistory
+
+
+def make(operation, a, b, **kwargs):
+    return Calculation(operation=operation, operand1=Decimal(a), operand2=Decimal(b), **kwargs)
+
+
+def test_round_trip_preserves_values_and_representation():
+    stamp = datetime(2025, 1, 2, 3, 4, 5, 678901)
+    calcs = [
+        make("add", "2.50", "3", timestamp=stamp),
+        make("divide", "1", "3", timestamp=stamp),
+        make("multiply", "1e500", "-0.001", timestamp=stamp),
+    ]
+    history = ColumnarHistory(calcs)
+    assert len(history) == 3
+    assert history == calcs
+    assert [str(c) for c in history] == [str(c) for c in calcs]
+    assert history[0].timestamp == stamp
+
+
+def test_list_operations():
+    calcs = [make("add", str(i), "1") for i in range(5)]
+    history = ColumnarHistory(calcs)
+    assert history[-1] == calcs[-1]
+    assert history[1:3] == calcs[1:3]
+    assert isinstance(history.copy(), ColumnarHistory)
+
+    assert history.pop() == calcs[4]
+    del history[:2]
+    assert history == calcs[2:4]
+    history.extend(calcs[:1])
+    assert history == [calcs[2], calcs[3], calcs[0]]
+    history.clear()
+    assert history == []
+    with pytest.raises(IndexError):
+        history[0]
+
+
+def test_overflow_values_are_released_on_delete():
+    history = ColumnarHistory([make("divide", "1", "3"), make("divide", "2", "3")])
+    assert len(history._results.overflow) == 2
+    del history[0]
+    assert len(history._results.overflow) == 1
+    assert history[0].result == Decimal("2") / Decimal("3")
@@ -139,3 +139,76 @@ def test_history_file_property():
     config = CalculatorConfig(base_dir=Path('/new_base_dir'))
     assert config.history_file == Path('/new_base_dir/history/calculator_history.csv').resolve()
 
+
+def test_invalid_journal_compact_threshold():
+    with pytest.raises(ConfigurationError, match="journal_compact_threshold must be positive"):
+        config = CalculatorConfig(journal_compact_threshold=-1)
+        config.validate()
+
+def test_history_journal_file_property():
+    clear_env_vars('CALCULATOR_HISTORY_FILE', 'CALCULATOR_HISTORY_DIR', 'CALCULATOR_HISTORY_JOURNAL_FILE')
+    config = CalculatorConfig(base_dir=Path('/new_base_dir'))
+    assert config.history_journal is False
+    assert config.history_journal_file == Path('/new_base_dir/history/calculator_history.journal.csv').resolve()
+
+def test_invalid_history_store():
+    with pytest.raises(ConfigurationError, match="history_store must be"):
+        config = CalculatorConfig(history_store="tree")
+        config.validate()
+
+def test_invalid_observer_backpressure():
+    with pytest.raises(ConfigurationError, match="observer_backpressure must be"):
+        config = CalculatorConfig(observer_backpressure="spill")
+        config.validate()
+
+def test_invalid_history_sink_settings():
+    with pytest.raises(ConfigurationError, match="history_sink_backpressure must be"):
+        CalculatorConfig(history_sink_backpressure="spill").validate()
+    config = CalculatorConfig()
+    config.history_sink_queue_size = 0
+    with pytest.raises(ConfigurationError, match="history_sink_queue_size must be positive"):
+        config.validate()
+
+def test_invalid_cache_size():
+    with pytest.raises(ConfigurationError, match="cache_size must not be negative"):
+        config = CalculatorConfig(cache_size=-1)
+        config.validate()
+
+def test_history_binary_file_property():
+    clear_env_vars('CALCULATOR_HISTORY_FILE', 'CALCULATOR_HISTORY_DIR', 'CALCULATOR_HISTORY_BINARY_FILE')
+    config = CalculatorConfig(base_dir=Path('/new_base_dir'))
+    assert config.history_format == 'csv'
+    assert config.history_binary_file == Path('/new_base_dir/history/calculator_history.bin').resolve()
+
+def test_invalid_history_format():
+    with pytest.raises(ConfigurationError, match="history_format must be"):
+        config = CalculatorConfig(history_format="json")
+        config.validate()
+
+def test_binary_history_format_rejects_journal():
+    with pytest.raises(ConfigurationError, match="history_journal requires"):
+        config = CalculatorConfig(history_format="binary", history_journal=True)
+        config.validate()
+
+def test_invalid_history_chunk_size():
+    with pytest.raises(ConfigurationError, match="history_chunk_size must be positive"):
+        config = CalculatorConfig(history_chunk_size=-5)
+        config.validate()
+
+def test_history_sqlite_file_property():
+    clear_env_vars('CALCULATOR_HISTORY_FILE', 'CALCULATOR_HISTORY_DIR', 'CALCULATOR_HISTORY_SQLITE_FILE')
+    config = CalculatorConfig(base_dir=Path('/new_base_dir'), history_format='sqlite')
+    config.validate()
+    assert config.history_sqlite_file == Path('/new_base_dir/history/calculator_history.db').resolve()
+
+def test_invalid_autosave_settings():
+    with pytest.raises(ConfigurationError, match="autosave_interval must not be negative"):
+        CalculatorConfig(autosave_interval=-1).validate()
+    with pytest.raises(ConfigurationError, match="autosave_max_pending must be positive"):
+        CalculatorConfig(autosave_max_pending=-1).validate()
+
+def test_history_shared_requires_plain_csv():
+    with pytest.raises(ConfigurationError, match="history_shared requires"):
+        CalculatorConfig(history_shared=True, history_format='binary').validate()
+    with pytest.raises(ConfigurationError, match="history_shared requires"):
+        CalculatorConfig(history_shared=True, history_journal=True).validate()
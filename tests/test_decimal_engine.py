@@ -0,0 +1,75 @@
+from decimal import Decimal, localcontext
+
+import pytest
+
+from app.decimal_engine import decimal_power, decimal_root
+from app.exceptions import OperationError
+from app.operations import RootOperation
+
+
+@pytest.mark.parametrize("base, exponent, expected", [
+    ("2", "3", "8"),
+    ("1.5", "2", "2.25"),
+    ("10", "0", "1"),
+    ("10", "-2", "0.01"),
+    ("2", "100", "1267650600228229401496703205376"),
+])
+def test_integer_powers_are_exact(base, exponent, expected):
+    assert decimal_power(Decimal(base), Decimal(exponent), precision=40) == Decimal(expected)
+
+
+def test_power_rounds_to_precision():
+    assert str(decimal_power(Decimal("2"), Decimal("100"), precision=10)) == "1.267650600E+30"
+    assert str(decimal_power(Decimal("2"), Decimal("0.5"), precision=10)) == "1.414213562"
+
+
+def test_power_beyond_float_range():
+    result = decimal_power(Decimal("10"), Decimal("400"))
+    assert result == Decimal("1E+400")
+
+
+def test_power_uses_context_precision():
+    with localcontext(prec=5):
+        assert str(decimal_power(Decimal("3"), Decimal("0.5"))) == "1.7321"
+
+
+def test_fractional_power_of_negative_number():
+    with pytest.raises(OperationError, match="Fractional power of negative number"):
+        decimal_power(Decimal("-8"), Decimal("0.5"))
+
+
+@pytest.mark.parametrize("value, degree, expected", [
+    ("16", "2", "4"),
+    ("2187", "7", "3"),
+    ("10000", "2", "100"),
+    ("0.0016", "4", "0.2"),
+    ("16", "0.5", "256"),
+    ("8", "-3", "0.5"),
+    ("0", "3", "0"),
+])
+def test_exact_roots(value, degree, expected):
+    result = decimal_root(Decimal(value), Decimal(degree))
+    assert result == Decimal(expected)
+    assert str(result) == expected
+
+
+def test_irrational_root_to_precision():
+    assert str(decimal_root(Decimal("2"), Decimal("2"), precision=30)) == "1.41421356237309504880168872421"
+    assert str(decimal_root(Decimal("1E+400"), Decimal("3"), precision=10)) == "2.154434690E+133"
+
+
+def test_roots_of_huge_degree():
+    # The float estimate used for Newton iteration cannot hold these degrees
+    assert decimal_root(Decimal("2"), Decimal("1e400"), precision=10) == Decimal(1)
+    assert decimal_root(Decimal("1E+400"), Decimal("-1e400"), precision=10) == Decimal(1)
+    assert str(decimal_root(Decimal("2"), Decimal("1e20"), precision=30)) == "1.00000000000000000000693147181"
+    assert RootOperation().execute(Decimal(2), Decimal("1e400")) == Decimal(1)
+
+
+def test_root_errors():
+    with pytest.raises(OperationError, match="Cannot calculate root of negative number"):
+        decimal_root(Decimal("-4"), Decimal("2"))
+    with pytest.raises(OperationError, match="Zero root is undefined"):
+        decimal_root(Decimal("4"), Decimal("0"))
+    with pytest.raises(OperationError, match="Division by zero"):
+        decimal_root(Decimal("0"), Decimal("-2"))
@@ -0,0 +1,66 @@
+from decimal import Decimal
+
+import pytest
+
+from app.exceptions import OperationError, ValidationError
+from app.expressions import compile_expression
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("1 + 2 * 3", "7"),
+    ("(1 + 2) * 3", "9"),
+    ("-2^2", "-4"),
+    ("2^3^2", "512"),
+    ("2 ** 10", "1024"),
+    ("7 // 2 + 7 % 2", "4"),
+    ("root(16, 2) + power(2, 3)", "12"),
+    ("percentage(1, 4)", "25"),
+    ("absolutedifference(3, 10)", "7"),
+])
+def test_evaluate(text, expected):
+    assert compile_expression(text).evaluate() == Decimal(expected)
+
+
+def test_variables_and_cache():
+    compiled = compile_expression("power(x, 2) + y / 2")
+    assert compiled.variables == frozenset({"x", "y"})
+    assert compiled is compile_expression("power(x, 2) + y / 2")
+    assert compiled.evaluate({"x": Decimal(3), "y": Decimal(1)}) == Decimal("9.5")
+    bindings = [{"x": Decimal(i), "y": Decimal(0)} for i in range(4)]
+    assert compiled.evaluate_many(bindings) == [Decimal(0), Decimal(1), Decimal(4), Decimal(9)]
+
+
+def test_precision_applies_to_power_and_root_only():
+    compiled = compile_expression("root(2, 2) + 1 / 3")
+    result = compiled.evaluate(precision=5)
+    assert result == Decimal("1.4142") + Decimal(1) / Decimal(3)
+
+
+@pytest.mark.parametrize("text, message", [
+    ("", "empty"),
+    ("1 +", "unexpected end"),
+    ("(1 + 2", "unexpected end"),
+    ("1 2", "unexpected '2'"),
+    ("1 $ 2", "unexpected character"),
+    ("sqrt(4, 2)", "Unknown function"),
+    ("power(2)", "expected ','"),
+])
+def test_invalid_expressions(text, message):
+    with pytest.raises(ValidationError, match=message):
+        compile_expression(text)
+
+
+def test_evaluation_errors():
+    with pytest.raises(ValidationError, match="Unbound variable: x"):
+        compile_expression("x + 1").evaluate()
+    with pytest.raises(OperationError, match="Division by zero"):
+        compile_expression("1 / (2 - 2)").evaluate()
+
+
+def test_long_flat_expressions_and_deep_nesting():
+    assert compile_expression(" + ".join(["1"] * 5000)).evaluate() == Decimal(5000)
+    assert compile_expression(" * ".join(["x"] * 3000)).evaluate({"x": Decimal(1)}) == Decimal(1)
+    with pytest.raises(ValidationError, match="nested"):
+        compile_expression("(" * 500 + "1" + ")" * 500)
+    with pytest.raises(ValidationError, match="nested"):
+        compile_expression("2^" * 500 + "2")
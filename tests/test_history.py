@@ -1,6 +1,11 @@
 import pytest
 import logging
-from app.history import LoggingObserver, AutoSaveObserver
+import signal
+import threading
+import time
+from app.history import (
+    AsyncObserverBus, LoggingObserver, AutoSaveObserver, AutoSaveScheduler, QueuedHistorySink, exit_on_signals
+)
 
 class DummyCalc:
     def __init__(self, auto_save=True):
@@ -34,3 +39,178 @@ def test_autosaveobserver_no_autosave(monkeypatch):
     monkeypatch.setattr(logging, "info", lambda msg: None)
     obs.update("whatever")
     assert not dummy.save_history_called
+
+def test_autosaveobserver_appends_in_journal_mode(monkeypatch):
+    dummy = DummyCalc()
+    dummy.config.history_journal = True
+    dummy.appended = []
+    dummy.append_history = dummy.appended.append
+    obs = AutoSaveObserver(dummy)
+    monkeypatch.setattr(logging, "info", lambda msg: None)
+    obs.update("calc")
+    assert dummy.appended == ["calc"]
+    assert not dummy.save_history_called
+
+def test_autosaveobserver_saves_once_per_batch(monkeypatch):
+    dummy = DummyCalc()
+    calls = []
+    dummy.save_history = lambda: calls.append(1)
+    obs = AutoSaveObserver(dummy)
+    monkeypatch.setattr(logging, "info", lambda msg: None)
+    obs.update_batch(["a", "b", "c"])
+    obs.update_batch([])
+    assert calls == [1]
+
+def test_autosave_scheduler_coalesces_by_count():
+    calls = []
+    scheduler = AutoSaveScheduler(lambda: calls.append(1), interval=60, max_pending=5)
+    for _ in range(5):
+        scheduler.request()
+    deadline = time.time() + 5
+    while not calls and time.time() < deadline:
+        time.sleep(0.01)
+    assert len(calls) == 1
+    scheduler.request()
+    scheduler.request()
+    scheduler.close()
+    # The final flush writes the two requests still pending
+    assert len(calls) == 2
+    assert (scheduler.requests, scheduler.writes, scheduler.coalesced) == (7, 2, 5)
+
+def test_autosave_scheduler_flushes_after_interval():
+    saved = threading.Event()
+    scheduler = AutoSaveScheduler(saved.set, interval=0.05, max_pending=100)
+    scheduler.request()
+    scheduler.request()
+    assert saved.wait(5)
+    # A request after a write wakes the idle worker, so it is saved after the interval too
+    saved.clear()
+    scheduler.request()
+    assert saved.wait(5)
+    scheduler.close()
+    assert scheduler.writes == 2
+    assert not scheduler.flush()
+
+def test_autosave_scheduler_counts_failures(monkeypatch):
+    monkeypatch.setattr(logging, "error", lambda msg: None)
+    def fail():
+        raise OSError("disk full")
+    scheduler = AutoSaveScheduler(fail, interval=60)
+    scheduler.request()
+    assert not scheduler.flush()
+    assert (scheduler.writes, scheduler.failures, scheduler.coalesced) == (0, 1, 0)
+    scheduler.close()
+
+def test_autosaveobserver_uses_scheduler(monkeypatch):
+    dummy = DummyCalc()
+    dummy.config.autosave_interval = 60
+    dummy.config.autosave_max_pending = 100
+    calls = []
+    dummy.save_history = lambda: calls.append(1)
+    obs = AutoSaveObserver(dummy)
+    monkeypatch.setattr(logging, "info", lambda msg: None)
+    for _ in range(3):
+        obs.update("calc")
+    obs.update_batch(["a", "b"])
+    assert calls == []
+    obs.flush()
+    assert calls == [1]
+    obs.scheduler.close()
+    assert calls == [1]
+
+def test_queued_history_sink_records_in_batches():
+    class RecordingCalc:
+        def __init__(self):
+            self.batches = []
+        def record_many(self, calculations):
+            self.batches.append(list(calculations))
+
+    calc = RecordingCalc()
+    sink = QueuedHistorySink(calc)
+    for i in range(5):
+        sink.submit(i)
+    assert sink.flush(timeout=5)
+    assert [item for batch in calc.batches for item in batch] == [0, 1, 2, 3, 4]
+    sink.close()
+    sink.submit(5)
+    sink.close()
+    assert calc.batches[-1] == [5]
+
+def test_queued_history_sink_requires_record_many():
+    with pytest.raises(TypeError):
+        QueuedHistorySink(object())
+
+def test_queued_history_sink_drops_when_full():
+    release = threading.Event()
+    class SlowCalc:
+        def __init__(self):
+            self.batches = []
+        def record_many(self, calculations):
+            release.wait()
+            self.batches.append(list(calculations))
+
+    calc = SlowCalc()
+    sink = QueuedHistorySink(calc, max_batch=1, max_queue=1, backpressure='drop')
+    sink.submit(0)
+    while sink._queue.qsize():  # wait for the worker to pick up the first item
+        time.sleep(0.001)
+    sink.submit(1)
+    sink.submit(2)
+    assert sink.dropped == 1
+    release.set()
+    sink.close()
+    assert calc.batches == [[0], [1]]
+    with pytest.raises(ValueError, match="Unknown backpressure mode"):
+        QueuedHistorySink(calc, backpressure='spill')
+
+class RecordingObserver(LoggingObserver):
+    def __init__(self):
+        self.batches = []
+    def update_batch(self, calculations):
+        self.batches.append(list(calculations))
+
+def test_async_observer_bus_delivers_batches():
+    observer = RecordingObserver()
+    bus = AsyncObserverBus([observer])
+    for i in range(5):
+        bus.publish([i])
+    bus.flush()
+    assert [item for batch in observer.batches for item in batch] == [0, 1, 2, 3, 4]
+    bus.close()
+
+def test_async_observer_bus_drops_when_full():
+    release = threading.Event()
+    class SlowObserver(RecordingObserver):
+        def update_batch(self, calculations):
+            release.wait()
+            super().update_batch(calculations)
+    observer = SlowObserver()
+    bus = AsyncObserverBus([observer], max_queue=1, backpressure='drop', max_batch=1)
+    bus.publish([0])
+    while bus._queue.qsize():  # wait for the worker to pick up the first item
+        time.sleep(0.001)
+    bus.publish([1])
+    bus.publish([2])
+    assert bus.dropped == 1
+    release.set()
+    bus.close()
+    assert observer.batches == [[0], [1]]
+
+def test_async_observer_bus_rejects_unknown_backpressure():
+    with pytest.raises(ValueError, match="Unknown backpressure mode"):
+        AsyncObserverBus([], backpressure='spill')
+
+
+def test_exit_on_signals_skips_signals_the_platform_lacks(monkeypatch):
+    monkeypatch.delattr(signal, "SIGHUP")
+    previous = signal.getsignal(signal.SIGTERM)
+    try:
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        exit_on_signals()
+        handler = signal.getsignal(signal.SIGTERM)
+        assert handler is not signal.SIG_DFL
+        with pytest.raises(SystemExit) as exited:
+            handler(signal.SIGTERM, None)
+        assert exited.value.code == 128 + signal.SIGTERM
+    finally:
+        signal.signal(signal.SIGTERM, previous)
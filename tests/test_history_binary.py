@@ -0,0 +1,92 @@
+from datetime import datetime
+from decimal import Decimal
+
+import pandas as pd
+import pytest
+
+from app.calculation import Calculation
+from app.exceptions import OperationError
+from app.history_binary import BinaryHistoryFile, binary_to_csv, csv_to_binary, write_binary_history
+
+
+def make(operation, a, b, **kwargs):
+    return Calculation(operation=operation, operand1=Decimal(a), operand2=Decimal(b), **kwargs)
+
+
+@pytest.fixture
+def calcs():
+    stamp = datetime(2025, 1, 2, 3, 4, 5, 678901)
+    return [
+        make("add", "2.50", "3", timestamp=stamp),
+        make("divide", "1", "3", timestamp=stamp),
+        make("multiply", "1e500", "-0.001", timestamp=stamp),
+        make("subtract", "-0", "0.1234567890123456789012345678901234567890", timestamp=stamp),
+        make("power", "-12345678901234567890123456789012345678", "1", timestamp=stamp),
+    ]
+
+
+def test_round_trip_preserves_values_and_representation(tmp_path, calcs):
+    path = tmp_path / "history.bin"
+    assert write_binary_history(path, calcs) == len(calcs)
+    with BinaryHistoryFile(path) as history:
+        assert len(history) == len(calcs)
+        assert history.calculations() == calcs
+        assert [str(c) for c in history] == [str(c) for c in calcs]
+        assert history.operations == ["add", "divide", "multiply", "subtract", "power"]
+
+
+def test_random_access(tmp_path):
+    calcs = [make("add", str(i), "1") for i in range(25_000)]
+    path = tmp_path / "history.bin"
+    write_binary_history(path, calcs)
+    with BinaryHistoryFile(path) as history:
+        assert history[0] == calcs[0]
+        assert history[-1] == calcs[-1]
+        assert history[12_000:12_003] == calcs[12_000:12_003]
+        assert list(history) == calcs
+        with pytest.raises(IndexError):
+            history[25_000]
+
+
+def test_empty_history(tmp_path):
+    path = tmp_path / "history.bin"
+    write_binary_history(path, [])
+    with BinaryHistoryFile(path) as history:
+        assert len(history) == 0
+        assert history.calculations() == []
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "history.bin"
+    path.write_text("operation,operand1,operand2,result,timestamp\n")
+    with pytest.raises(OperationError, match="Not a binary history file"):
+        BinaryHistoryFile(path)
+    path.write_bytes(b"")
+    with pytest.raises(OperationError, match="Not a binary history file"):
+        BinaryHistoryFile(path)
+
+
+def test_rejects_truncated_file(tmp_path, calcs):
+    path = tmp_path / "history.bin"
+    write_binary_history(path, calcs)
+    path.write_bytes(path.read_bytes()[:-10])
+    with pytest.raises(OperationError, match="Truncated"):
+        BinaryHistoryFile(path)
+
+
+def test_csv_conversion_round_trip(tmp_path, calcs):
+    csv_path = tmp_path / "history.csv"
+    binary_path = tmp_path / "history.bin"
+    pd.DataFrame([{
+        'operation': c.operation,
+        'operand1': str(c.operand1),
+        'operand2': str(c.operand2),
+        'result': str(c.result),
+        'timestamp': c.timestamp.isoformat(),
+    } for c in calcs]).to_csv(csv_path, index=False)
+    original = csv_path.read_text()
+
+    assert csv_to_binary(csv_path, binary_path) == len(calcs)
+    csv_path.unlink()
+    assert binary_to_csv(binary_path, csv_path) == len(calcs)
+    assert csv_path.read_text() == original
@@ -0,0 +1,133 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+
+from app.calculation import Calculation
+from app.columnar_history import ColumnarHistory
+from app.exceptions import ValidationError
+from app.history_index import HistoryFilter, HistoryIndex, parse_filter
+
+START = datetime(2025, 1, 1)
+
+
+def make_history(count):
+    operations = ['add', 'subtract', 'multiply']
+    return [
+        Calculation(
+            operation=operations[i % 3],
+            operand1=Decimal(i),
+            operand2=Decimal(count - i),
+            timestamp=START + timedelta(minutes=i)
+        )
+        for i in range(count)
+    ]
+
+
+def brute_force(history, filters):
+    return [i for i, c in enumerate(history) if all(f.matches(c) for f in filters)]
+
+
+def test_parse_filter():
+    assert parse_filter("op=ADD") == HistoryFilter('operation', 'add', 'add')
+    assert parse_filter("result>=10") == HistoryFilter('result', low=Decimal(10))
+    assert parse_filter("a<2.5") == HistoryFilter('operand1', high=Decimal('2.5'), include_high=False)
+    assert parse_filter("b=3") == HistoryFilter('operand2', Decimal(3), Decimal(3))
+    assert parse_filter("time>2025-01-01t10:00") == HistoryFilter(
+        'timestamp', low=datetime(2025, 1, 1, 10), include_low=False)
+    # Aware times are converted to the naive local time calculations are stamped with
+    local = datetime(2025, 1, 1, 9, tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+    aware = parse_filter("time>=2025-01-01T09:00+00:00")
+    assert aware == HistoryFilter('timestamp', low=local)
+    assert aware.contains(local)
+
+    for text in ("size>3", "op>add", "a>=x", "result"):
+        with pytest.raises(ValidationError):
+            parse_filter(text)
+
+
+@pytest.mark.parametrize("filters", [
+    ["op=add"],
+    ["result>=50", "result<60"],
+    ["op=multiply", "a>10", "a<=40"],
+    ["b=7"],
+    ["time>=2025-01-01T00:30", "time<2025-01-01T00:45", "op=subtract"],
+    ["a>1000"],
+])
+def test_query_matches_brute_force(filters):
+    history = make_history(100)
+    index = HistoryIndex(history)
+    parsed = [parse_filter(f) for f in filters]
+    expected = brute_force(history, parsed)
+    assert index.query(parsed) == (len(expected), expected)
+    assert index.query(parsed, start=2, count=3) == (len(expected), expected[2:5])
+
+
+def test_paging_without_filters():
+    index = HistoryIndex(make_history(100))
+    assert index.query(start=95, count=10) == (100, [95, 96, 97, 98, 99])
+
+
+def test_indexes_follow_history_changes():
+    history = make_history(10)
+    index = HistoryIndex(history)
+    add = [parse_filter("op=add")]
+    results = [parse_filter("result>=10")]
+    assert index.query(add)[1] == [0, 3, 6, 9]
+    assert index.query(results)[1] == brute_force(history, results)
+
+    # Appends extend the existing indexes
+    history.append(Calculation('add', Decimal(5), Decimal(5), timestamp=START))
+    assert index.query(add)[1] == [0, 3, 6, 9, 10]
+    assert index.query(results)[1] == brute_force(history, results)
+
+    # Undo followed by a different calculation forces a rebuild
+    history.pop()
+    history.append(Calculation('add', Decimal(1), Decimal(1), timestamp=START))
+    assert 10 not in index.query(results)[1]
+    assert index.query(results)[1] == brute_force(history, results)
+
+    # So does eviction from the front
+    del history[:3]
+    assert index.query(add)[1] == [0, 3, 6, 7]
+    assert index.query(results)[1] == brute_force(history, results)
+
+
+def test_columnar_history():
+    history = ColumnarHistory(make_history(30))
+    index = HistoryIndex(history)
+    filters = [parse_filter("op=add"), parse_filter("a>=12")]
+    assert index.query(filters) == (6, [12, 15, 18, 21, 24, 27])
+
+
+def test_filters_on_one_field_are_intersected():
+    history = make_history(100)
+    index = HistoryIndex(history)
+    filters = [parse_filter("a>=20"), parse_filter("a<=30"), parse_filter("a>25"), parse_filter("a<40")]
+    assert index.query(filters)[1] == list(range(26, 31))
+    assert index.query([parse_filter("op=add"), parse_filter("op=subtract")]) == (0, [])
+
+
+def test_eviction_keeps_indexes_with_an_eviction_counter():
+    history = make_history(10)
+    evicted = [0]
+    index = HistoryIndex(history, lambda: evicted[0])
+    add = [parse_filter("op=add")]
+    results = [parse_filter("result>=10")]
+    assert index.query(add)[1] == [0, 3, 6, 9]
+    operations = index._operations
+
+    # A full history evicts one calculation per new one
+    for i in range(3):
+        del history[0]
+        evicted[0] += 1
+        history.append(Calculation('add', Decimal(i), Decimal(20), timestamp=START))
+        assert index.query(add)[1] == brute_force(history, add)
+        assert index.query(results)[1] == brute_force(history, results)
+    assert index._operations is operations
+
+    # Stale entries are dropped once they outnumber the live ones
+    del history[:8]
+    evicted[0] += 8
+    assert index.query(add)[1] == brute_force(history, add)
+    assert index._operations is not operations
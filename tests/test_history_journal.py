@@ -0,0 +1,120 @@
+from decimal import Decimal
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import PropertyMock, patch
+
+import pandas as pd
+import pytest
+
+from app.calculation import Calculation
+from app.calculator import Calculator
+from app.calculator_config import CalculatorConfig
+from app.history import AutoSaveObserver
+from app.history_journal import HistoryJournal
+from app.operations import OperationFactory
+
+
+@pytest.fixture
+def tmp_dir():
+    with TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        with patch.object(CalculatorConfig, 'history_dir', new_callable=PropertyMock) as mock_history_dir, \
+             patch.object(CalculatorConfig, 'history_file', new_callable=PropertyMock) as mock_history_file, \
+             patch.object(CalculatorConfig, 'history_journal_file', new_callable=PropertyMock) as mock_journal_file:
+            mock_history_dir.return_value = temp_path / "history"
+            mock_history_file.return_value = temp_path / "history/calculator_history.csv"
+            mock_journal_file.return_value = temp_path / "history/calculator_history.journal.csv"
+            yield temp_path
+
+
+def make_calculator(base_dir):
+    config = CalculatorConfig(base_dir=base_dir, auto_save=True, history_journal=True)
+    calc = Calculator(config=config)
+    calc.add_observer(AutoSaveObserver(calc))
+    calc.set_operation(OperationFactory.create_operation('add'))
+    return calc
+
+
+def test_journal_append_and_compact(tmp_dir):
+    journal = HistoryJournal(tmp_dir / "history.csv", tmp_dir / "history.journal.csv")
+    journal.append(Calculation(operation="add", operand1=Decimal("1"), operand2=Decimal("2")))
+    journal.append(Calculation(operation="add", operand1=Decimal("3"), operand2=Decimal("4")))
+    assert journal.pending_files() == [tmp_dir / "history.journal.csv"]
+
+    assert journal.compact() == 2
+    assert journal.pending_files() == []
+    df = pd.read_csv(tmp_dir / "history.csv")
+    assert list(df["result"]) == [3, 7]
+
+
+def test_journal_compacts_in_background_at_threshold(tmp_dir):
+    journal = HistoryJournal(tmp_dir / "history.csv", tmp_dir / "history.journal.csv", compact_threshold=2)
+    for i in range(2):
+        journal.append(Calculation(operation="add", operand1=Decimal(i), operand2=Decimal("1")))
+    journal.wait()
+    assert journal.pending_files() == []
+    assert len(pd.read_csv(tmp_dir / "history.csv")) == 2
+
+
+def test_calculator_journal_mode_round_trip(tmp_dir):
+    calc = make_calculator(tmp_dir)
+    calc.perform_operation(1, 1)
+    calc.save_history()
+    calc.perform_operation(2, 2)
+    calc.perform_operation(3, 3)
+    # Only the snapshot row is in the main file, the rest are journaled
+    assert len(pd.read_csv(calc.config.history_file)) == 1
+    assert calc.journal.pending_files() == [calc.config.history_journal_file]
+
+    reloaded = make_calculator(tmp_dir)
+    assert [c.result for c in reloaded.history] == [Decimal("2"), Decimal("4"), Decimal("6")]
+
+    reloaded.save_history()
+    assert reloaded.journal.pending_files() == []
+    assert len(pd.read_csv(calc.config.history_file)) == 3
+
+
+def test_journal_mode_archives_evicted_rows_once(tmp_dir, monkeypatch):
+    monkeypatch.setenv("CALCULATOR_MAX_HISTORY_SIZE", "3")
+    calc = make_calculator(tmp_dir)
+    for i in range(5):
+        calc.perform_operation(i, 0)
+    archive = calc.config.history_archive_file
+    assert list(pd.read_csv(archive)["result"]) == [0, 1]
+
+    reloaded = make_calculator(tmp_dir)
+    assert [c.result for c in reloaded.history] == [Decimal(i) for i in (2, 3, 4)]
+    assert list(pd.read_csv(archive)["result"]) == [0, 1]
+    # The saved files were compacted, so loading again archives nothing
+    reloaded.load_history()
+    assert list(pd.read_csv(archive)["result"]) == [0, 1]
+
+
+def test_journal_mode_undo_is_not_replayed_on_load(tmp_dir):
+    calc = make_calculator(tmp_dir)
+    calc.perform_operation(1, 1)
+    calc.perform_operation(2, 2)
+    calc.undo()
+    calc.perform_operation(3, 3)
+    assert [c.result for c in calc.history] == [Decimal("2"), Decimal("6")]
+    assert [c.result for c in make_calculator(tmp_dir).history] == [Decimal("2"), Decimal("6")]
+
+    calc.redo()
+    calc.clear_history()
+    assert make_calculator(tmp_dir).history == []
+
+
+def test_journal_mode_skips_archived_rows_by_position(tmp_dir, monkeypatch):
+    # Identical calculations must not be mistaken for the archive's last row
+    monkeypatch.setenv("CALCULATOR_MAX_HISTORY_SIZE", "3")
+    calc = make_calculator(tmp_dir)
+    for _ in range(6):
+        calc.perform_operation(1, 1)
+    archive = calc.config.history_archive_file
+    assert len(pd.read_csv(archive)) == 3
+    assert calc.archive_watermark.get() == 3
+
+    reloaded = make_calculator(tmp_dir)
+    assert len(reloaded.history) == 3
+    assert len(pd.read_csv(archive)) == 3
+    assert reloaded.archive_watermark.get() == 0
@@ -0,0 +1,131 @@
+import multiprocessing
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from app.calculation import Calculation
+from app.calculator import Calculator
+from app.calculator_config import CalculatorConfig
+from app.history_shared import SharedHistoryFile
+from app.history_stream import iter_history_chunks
+from app.operations import OperationFactory
+
+START = datetime(2025, 1, 1)
+
+
+def make(a, minutes=0):
+    return Calculation('add', Decimal(a), Decimal(1), timestamp=START + timedelta(minutes=minutes))
+
+
+def flatten(chunks):
+    return [c for chunk in chunks for c in chunk]
+
+
+def saved(path):
+    return flatten(iter_history_chunks(path))
+
+
+def test_writers_append_and_read_each_other(tmp_path):
+    path = tmp_path / "history.csv"
+    first, second = SharedHistoryFile(path), SharedHistoryFile(path)
+    first.record([make(1), make(2)])
+    assert first.write() == 2
+    assert first.write() == 0
+    second.record([make(3)])
+    second.write()
+    first.record([make(4)])
+    first.write()
+
+    # Each side only gets the rows the other one wrote
+    assert [c.operand1 for c in flatten(first.iter_new())] == [3]
+    assert [c.operand1 for c in flatten(second.iter_new(chunk_size=1))] == [1, 2, 4]
+    assert flatten(first.iter_new()) == []
+    assert [c.operand1 for c in saved(path)] == [1, 2, 3, 4]
+
+
+def test_rows_read_during_writes_are_bounded(tmp_path):
+    path = tmp_path / "history.csv"
+    first, second = SharedHistoryFile(path, max_incoming=3), SharedHistoryFile(path, max_incoming=3)
+    for i in range(20):
+        first.record([make(i)])
+        first.write()
+        second.record([make(100 + i)])
+        second.write()
+    assert len(first._incoming) == 3
+    # The last three rows read while writing, then the one written since
+    assert [c.operand1 for c in flatten(first.iter_new())] == [116, 117, 118, 119]
+    assert flatten(first.iter_new()) == []
+
+
+def test_write_drops_row_cut_off_by_a_crash(tmp_path):
+    path = tmp_path / "history.csv"
+    shared = SharedHistoryFile(path)
+    shared.record([make(1)])
+    shared.write()
+    with open(path, "a") as f:
+        f.write("add,2,1,3,2025-01")
+    reader = SharedHistoryFile(path)
+    assert [c.operand1 for c in flatten(reader.iter_new())] == [1]
+    shared.record([make(5)])
+    shared.write()
+    assert [c.operand1 for c in flatten(reader.iter_new())] == [5]
+    assert [c.operand1 for c in saved(path)] == [1, 5]
+
+
+def _append_many(path, worker, count):
+    shared = SharedHistoryFile(path)
+    for i in range(count):
+        shared.record([make(worker * 1000 + i)])
+        shared.write()
+
+
+def test_concurrent_processes_keep_every_row(tmp_path):
+    path = tmp_path / "history.csv"
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=_append_many, args=(path, worker, 50)) for worker in range(4)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join(30)
+        assert process.exitcode == 0
+    values = sorted(int(c.operand1) for c in saved(path))
+    assert values == sorted(worker * 1000 + i for worker in range(4) for i in range(50))
+
+
+@pytest.fixture
+def shared_config(tmp_path, monkeypatch):
+    monkeypatch.setenv('CALCULATOR_HISTORY_DIR', str(tmp_path / "history"))
+    monkeypatch.setenv('CALCULATOR_HISTORY_FILE', str(tmp_path / "history/calculator_history.csv"))
+    return lambda **kwargs: CalculatorConfig(
+        base_dir=tmp_path, history_shared=True, load_verify_sample=0, **kwargs)
+
+
+def test_calculators_merge_on_load(shared_config):
+    add = OperationFactory.create_operation('add')
+    first, second = Calculator(shared_config()), Calculator(shared_config())
+    first.set_operation(add)
+    second.set_operation(add)
+    first.perform_operation(1, 1)
+    second.perform_operation(2, 2)
+    first.save_history()
+    second.save_history()
+    first.perform_operation(3, 3)
+    first.save_history()
+
+    first.load_history()
+    second.load_history()
+    assert [c.result for c in first.history] == [2, 6, 4]
+    assert [c.result for c in second.history] == [4, 2, 6]
+    assert [c.result for c in Calculator(shared_config()).history] == [2, 4, 6]
+
+
+def test_shared_history_drops_evicted_rows_without_archiving(shared_config):
+    calc = Calculator(shared_config(max_history_size=3))
+    calc.perform_many(OperationFactory.create_operation('add'), range(5), [1] * 5)
+    assert len(calc.history) == 3
+    calc.save_history()
+    assert not calc.config.history_archive_file.exists()
+    assert len(saved(calc.config.history_file)) == 5
+    assert len(Calculator(shared_config(max_history_size=3)).history) == 3
+    assert calc.export_history(calc.config.history_dir / "all.csv", include_archive=True) == 5
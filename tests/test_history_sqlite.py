@@ -0,0 +1,94 @@
+import sqlite3
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from app.calculation import Calculation
+from app.history_index import parse_filter
+from app.history_sqlite import SQLiteHistoryStore
+
+START = datetime(2025, 1, 1)
+
+
+def make(operation, a, b, minutes=0):
+    return Calculation(operation, Decimal(a), Decimal(b), timestamp=START + timedelta(minutes=minutes))
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteHistoryStore(tmp_path / "history.db", batch_size=3)
+    yield store
+    store.close()
+
+
+def rows(store):
+    with sqlite3.connect(store.path) as connection:
+        return connection.execute("SELECT position, operation, operand1, result FROM history ORDER BY position").fetchall()
+
+
+def test_uses_wal_mode(store):
+    with sqlite3.connect(store.path) as connection:
+        assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_sync_writes_only_changes(store):
+    history = [make('add', i, 1, i) for i in range(7)]
+    assert store.sync(history) == 7
+    assert store.sync(history) == 0
+    history.append(make('add', 7, 1, 7))
+    assert store.sync(history) == 1
+    assert len(store) == 8
+    assert store.load(100) == history
+
+
+def test_sync_truncates_after_undo(store):
+    history = [make('add', i, 1, i) for i in range(5)]
+    store.sync(history)
+    # Undo two calculations, then perform a different one
+    del history[3:]
+    history.append(make('multiply', 2, 2, 10))
+    assert store.sync(history) == 1
+    assert [row[:3] for row in rows(store)] == [(0, 'add', '0'), (1, 'add', '1'), (2, 'add', '2'), (3, 'multiply', '2')]
+
+
+def test_archive_and_load_tail(tmp_path, store):
+    history = [make('add', i, 1, i) for i in range(6)]
+    store.sync(history)
+    store.archive(history[:2])
+    assert store.start == 2
+    assert len(store) == 4
+
+    reopened = SQLiteHistoryStore(tmp_path / "history.db")
+    assert reopened.start == 2
+    assert reopened.load(3) == history[3:]
+    assert reopened.start == 3
+    assert [c for chunk in reopened.iter_chunks(2, archived=True) for c in chunk] == history[:3]
+    assert [c for chunk in reopened.iter_chunks(2) for c in chunk] == history[3:]
+    # Clearing the live history keeps the archive
+    assert reopened.sync([]) == 0
+    assert [row[0] for row in rows(reopened)] == [0, 1, 2]
+    reopened.close()
+
+
+def test_search(store):
+    history = [make(['add', 'multiply'][i % 2], i, 3, i) for i in range(20)]
+    store.sync(history)
+
+    total, page = store.search([parse_filter("op=multiply")], start=2, count=3)
+    assert total == 10
+    assert [position for position, _ in page] == [5, 7, 9]
+    assert page[0][1] == history[5]
+
+    total, page = store.search([parse_filter("result>=30"), parse_filter("result<45"), parse_filter("op=multiply")])
+    expected = [i for i, c in enumerate(history) if c.operation == 'multiply' and 30 <= c.result < 45]
+    assert [position for position, _ in page] == expected
+    assert total == len(expected)
+
+    total, _ = store.search([parse_filter("time>=2025-01-01T00:15"), parse_filter("time<2025-01-01T00:18")])
+    assert total == 3
+
+    # Exact Decimal comparison, even where floats cannot tell values apart
+    store.sync(history + [make('add', '0.10000000000000000001', 0, 30)])
+    assert store.search([parse_filter("a>0.1"), parse_filter("a<0.2")])[0] == 1
+    assert store.search([parse_filter("a>0.10000000000000000001")])[0] == 19
@@ -0,0 +1,70 @@
+import gzip
+import lzma
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pandas as pd
+import pytest
+
+from app.calculation import Calculation
+from app.history_stream import history_compression, iter_history_chunks, open_history_file, write_history
+
+
+def make_history(count):
+    start = datetime(2025, 1, 1)
+    return [
+        Calculation('divide', Decimal(i), Decimal(7), timestamp=start + timedelta(seconds=i))
+        for i in range(count)
+    ]
+
+
+@pytest.mark.parametrize("name", ["history.csv", "history.csv.gz", "history.csv.xz"])
+def test_round_trip_in_chunks(tmp_path, name):
+    path = tmp_path / name
+    history = make_history(25)
+    assert write_history(path, iter(history)) == 25
+    chunks = list(iter_history_chunks(path, chunk_size=10))
+    assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+    loaded = [c for chunk in chunks for c in chunk]
+    assert loaded == history
+    assert [c.timestamp for c in loaded] == [c.timestamp for c in history]
+
+
+def test_compression_follows_suffix(tmp_path):
+    assert history_compression(tmp_path / "h.csv") is None
+    write_history(tmp_path / "h.csv.gz", make_history(3))
+    write_history(tmp_path / "h.csv.xz", make_history(3))
+    with gzip.open(tmp_path / "h.csv.gz", "rt") as f:
+        assert f.readline() == "operation,operand1,operand2,result,timestamp\n"
+    with lzma.open(tmp_path / "h.csv.xz", "rt") as f:
+        assert f.readline() == "operation,operand1,operand2,result,timestamp\n"
+    with open_history_file(tmp_path / "h.csv.gz") as f:
+        assert len(f.readlines()) == 4
+
+
+def test_matches_pandas_layout(tmp_path):
+    history = make_history(3)
+    write_history(tmp_path / "streamed.csv", history)
+    pd.DataFrame([{
+        'operation': c.operation,
+        'operand1': str(c.operand1),
+        'operand2': str(c.operand2),
+        'result': str(c.result),
+        'timestamp': c.timestamp.isoformat(),
+    } for c in history]).to_csv(tmp_path / "pandas.csv", index=False)
+    assert (tmp_path / "streamed.csv").read_text() == (tmp_path / "pandas.csv").read_text()
+
+
+def test_failed_write_keeps_existing_file(tmp_path):
+    path = tmp_path / "history.csv"
+    write_history(path, make_history(2))
+    original = path.read_text()
+
+    def broken():
+        yield from make_history(1)
+        raise RuntimeError("disk full")
+
+    with pytest.raises(RuntimeError):
+        write_history(path, broken())
+    assert path.read_text() == original
+    assert list(tmp_path.iterdir()) == [path]
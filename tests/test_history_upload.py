@@ -0,0 +1,54 @@
+import pytest
+
+from app import models
+from app.exceptions import ValidationError
+from app.history_upload import MAX_LINE_LENGTH, HistoryUpload
+
+
+def test_feed_parses_rows_split_across_chunks():
+    upload = HistoryUpload(user_id=7)
+    data = "﻿operation,operand1,operand2,result,timestamp\r\nMultiply,1.5,2,3,2025-01-01T10:00:00\r\n"
+    encoded = data.encode()
+    rows = []
+    for i in range(len(encoded)):
+        rows.extend(upload.feed(encoded[i:i + 1]))
+    rows.extend(upload.feed(b"", final=True))
+
+    assert len(rows) == 1
+    assert rows[0]["type"] == models.OperationType.MULTIPLY
+    assert (rows[0]["a"], rows[0]["b"], rows[0]["result"], rows[0]["user_id"]) == (1.5, 2.0, 3.0, 7)
+    assert rows[0]["created_at"].isoformat() == "2025-01-01T10:00:00"
+
+
+def test_feed_counts_rows_it_cannot_store():
+    upload = HistoryUpload(user_id=1)
+    rows = upload.feed(
+        b"operation,operand1,operand2,result,timestamp\n"
+        b"root,9,2,3,2025-01-01T00:00:00\n"
+        b"add,99999999,1,100000000,2025-01-01T00:00:00\n"
+        b"subtract,1,2\n"
+        b"add,1,2,3,\n",
+        final=True,
+    )
+    assert len(rows) == 1
+    assert upload.progress() == {"rows": 4, "imported": 0, "invalid": 2, "unsupported": {"root": 1}}
+
+
+def test_feed_rejects_files_without_history_columns():
+    with pytest.raises(ValidationError, match="operand1"):
+        HistoryUpload(user_id=1).feed(b"operation,a,b,result\n")
+    with pytest.raises(ValidationError):
+        HistoryUpload(user_id=1).feed(b"", final=True)
+
+
+def test_feed_rejects_overlong_lines():
+    upload = HistoryUpload(user_id=1)
+    upload.feed(b"operation,operand1,operand2,result,timestamp\nadd,1,")
+    chunk = b"1" * 1024
+    with pytest.raises(ValidationError, match="longer than"):
+        # A line without a newline is not buffered past the limit
+        for _ in range(MAX_LINE_LENGTH // len(chunk) + 1):
+            upload.feed(chunk)
+    assert len(upload._tail) <= MAX_LINE_LENGTH + len(chunk)
+    with pytest.raises(ValidationError, match="longer than"):
+        HistoryUpload(user_id=1).feed(b"add," + b"1" * MAX_LINE_LENGTH + b"\n")
@@ -37,6 +37,31 @@ def test_api_root(client):
     assert response.status_code == 200
     assert response.json()["result"] == 4
 
+def test_api_power_beyond_float_range(client):
+    response = client.get("/calculate/power?a=10&b=400")
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Result is not a finite number"
+
+def test_api_evaluate(client):
+    response = client.post("/evaluate", json={"expression": "power(x, 2) + root(16, 2)", "variables": {"x": 3}})
+    assert response.status_code == 200
+    assert response.json()["result"] == 13
+
+def test_api_evaluate_bindings(client):
+    response = client.post("/evaluate", json={"expression": "a / b", "bindings": [{"a": 1, "b": 2}, {"a": 1, "b": 0}]})
+    assert response.status_code == 200
+    assert response.json() == {"results": [0.5, None], "errors": {"1": "Division by zero"}}
+
+def test_api_evaluate_non_finite_results(client):
+    response = client.post("/evaluate", json={"expression": "power(10, 400)"})
+    assert response.status_code == 400
+    response = client.post("/evaluate", json={"expression": "power(10, x)", "bindings": [{"x": 2}, {"x": 400}]})
+    assert response.json() == {"results": [100.0, None], "errors": {"1": "Result is not a finite number"}}
+
+def test_api_evaluate_invalid(client):
+    response = client.post("/evaluate", json={"expression": "1 +"})
+    assert response.status_code == 400
+
 def test_api_modulus(client):
     response = client.get("/calculate/modulus?a=10&b=3")
     assert response.status_code == 200
@@ -56,3 +81,28 @@ def test_api_integerdivision(client):
     response = client.get("/calculate/integerdivision?a=10&b=3")
     assert response.status_code == 200
     assert response.json()["result"] == 3
+
+def test_api_does_not_mutate_shared_calculator(client):
+    import main
+    before = main.calc.operation_strategy
+    response = client.get("/calculate/add?a=1&b=2")
+    assert response.status_code == 200
+    assert main.calc.operation_strategy is before
+    assert main.history_sink.flush(timeout=5)
+    assert main.calc.history[-1].result == 3
+
+def test_api_unknown_operation(client):
+    response = client.get("/calculate/unknown?a=1&b=2")
+    assert response.status_code == 400
+
+def test_metrics_endpoint(client):
+    client.get("/calculate/add?a=1&b=2")
+    client.get("/calculate/divide?a=1&b=0")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'calculator_operation_seconds_count{operation="add"}' in body
+    assert 'calculator_operation_errors_total{operation="divide"}' in body
+    assert 'http_requests_total{method="GET",route="/calculate/{op_name}",status="400"}' in body
+    assert 'http_request_seconds_count{method="GET",route="/calculate/{op_name}"}' in body
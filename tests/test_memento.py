@@ -1,4 +1,4 @@
-from app.calculator_memento import CalculatorMemento
+from app.calculator_memento import CalculatorMemento, HistoryTimeline
 from app.calculation import Calculation
 import datetime
 
@@ -26,3 +26,14 @@ def test_memento_empty_history_to_dict():
     data = memento.to_dict()
     assert data["history"] == []
     assert "timestamp" in data
+
+
+def test_memento_snapshot_of_shared_timeline():
+    calcs = [Calculation(operation="add", operand1=i, operand2=1) for i in range(3)]
+    timeline = HistoryTimeline(list(calcs))
+    memento = CalculatorMemento(timeline=timeline, position=1)
+    timeline.seek(0)
+    assert timeline.history == []
+    assert memento.history == calcs[:1]
+    assert memento.restore().history == calcs[:1]
+    assert memento.to_dict()["history"] == [calcs[0].to_dict()]
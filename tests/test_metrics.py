@@ -0,0 +1,81 @@
+import threading
+
+import pytest
+
+from app.metrics import MetricsRegistry
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+
+def test_counter(registry):
+    counter = registry.counter("ops_total", "Operations", ("operation",))
+    counter.inc("add")
+    counter.inc("add", amount=2)
+    counter.inc("divide")
+    assert counter.value("add") == 3
+    assert registry.render().splitlines() == [
+        "# HELP ops_total Operations",
+        "# TYPE ops_total counter",
+        'ops_total{operation="add"} 3',
+        'ops_total{operation="divide"} 1',
+    ]
+
+
+def test_histogram(registry):
+    histogram = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3):
+        histogram.observe(value, "/a")
+    assert histogram.count("/a") == 4
+    assert histogram.quantile(0.5, "/a") == 0.1
+    assert histogram.quantile(0.95, "/a") == float("inf")
+    assert registry.render().splitlines()[2:] == [
+        'latency_seconds_bucket{route="/a",le="0.1"} 2',
+        'latency_seconds_bucket{route="/a",le="1"} 3',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 4',
+        'latency_seconds_sum{route="/a"} 3.65',
+        'latency_seconds_count{route="/a"} 4',
+    ]
+    assert registry.summary_lines() == ["latency_seconds[/a]: count=4 avg=912.500ms p50<=100ms p95<=infms"]
+
+
+def test_label_values_are_escaped(registry):
+    counter = registry.counter("c", "C", ("path",))
+    counter.inc('a"b\\c')
+    assert 'c{path="a\\"b\\\\c"} 1' in registry.render()
+
+
+def test_disabled_registry_records_nothing():
+    registry = MetricsRegistry(enabled=False)
+    counter = registry.counter("c", "C")
+    histogram = registry.histogram("h", "H")
+    counter.inc()
+    histogram.observe(1.0)
+    assert counter.value() == 0
+    assert histogram.count() == 0
+
+
+def test_duplicate_metric(registry):
+    registry.counter("c", "C")
+    with pytest.raises(ValueError, match="already registered"):
+        registry.histogram("c", "C")
+
+
+def test_series_recorded_on_other_threads_are_merged(registry):
+    counter = registry.counter("c", "C")
+    histogram = registry.histogram("h", "H", buckets=(1.0,))
+    def work():
+        for _ in range(100):
+            counter.inc()
+            histogram.observe(0.5)
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert counter.value() == 400
+    assert histogram.count() == 400
+    registry.clear()
+    assert counter.value() == 0
@@ -1,6 +1,10 @@
+import numpy as np
 import pytest
 from decimal import Decimal
 from app.operations import OperationFactory
+from app.calculation_factory import CalculationFactory, perform_calculation
+from app.models import OperationType
+from app.result_cache import ResultCache
 from app.exceptions import OperationError
 from app.operations import (
     RootOperation,
@@ -71,4 +75,64 @@ def test_absolute_difference_positive_result():
 def test_absolute_difference_negative_result():
     op = AbsoluteDifferenceOperation()
     result = op.execute(Decimal('3'), Decimal('7'))
-    assert result == Decimal('4')
\ No newline at end of file
+    assert result == Decimal('4')
+
+@pytest.mark.parametrize("name", [
+    "add", "subtract", "multiply", "divide", "power", "root",
+    "modulus", "integerdivision", "percentage", "absolutedifference",
+])
+def test_array_kernel_matches_decimal(name):
+    op = OperationFactory.create_operation(name)
+    a = [Decimal('7'), Decimal('-7'), Decimal('2.5')]
+    b = [Decimal('2'), Decimal('3'), Decimal('4')]
+    expected = []
+    for x, y in zip(a, b):
+        try:
+            expected.append(float(op.execute(x, y)))
+        except OperationError:
+            expected.append(None)
+    a_arr = np.array([float(x) for x in a])
+    b_arr = np.array([float(y) for y in b])
+    with np.errstate(all="ignore"):
+        values = op.execute_array(a_arr, b_arr)
+    invalid = np.zeros(len(a), dtype=bool)
+    for mask, _ in op.invalid_array(a_arr, b_arr):
+        invalid |= mask
+    for value, bad, want in zip(values, invalid, expected):
+        if want is None:
+            assert bad
+        else:
+            assert value == pytest.approx(want)
+
+def test_factory_returns_shared_instances():
+    op = OperationFactory.create_operation("power")
+    assert op is OperationFactory.create_operation("POWER")
+    assert op is OperationFactory.create_operation("Power")
+    assert op is OperationFactory.create_operation("pOwEr")
+
+def test_get_executor_dispatch():
+    assert OperationFactory.get_executor("add")(Decimal("2"), Decimal("3")) == Decimal("5")
+    assert OperationFactory.get_executor("MoDuLuS")(Decimal("10"), Decimal("3")) == Decimal("1")
+    with pytest.raises(ValueError, match="Unknown operation"):
+        OperationFactory.get_executor("unknown_op")
+
+def test_calculation_factory_returns_shared_instance():
+    operation = CalculationFactory.create_operation("ADD")
+    assert operation is CalculationFactory.create_operation("add")
+    assert operation is CalculationFactory.create_operation(OperationType.ADD)
+
+def test_perform_calculation_case_insensitive():
+    assert perform_calculation(Decimal("6"), Decimal("3"), "DIVIDE") == Decimal("2")
+    assert perform_calculation(Decimal("6"), Decimal("3"), "subtract") == Decimal("3")
+
+def test_perform_calculation_unsupported():
+    with pytest.raises(ValueError, match="Unsupported operation"):
+        perform_calculation(Decimal("1"), Decimal("1"), "POWER")
+    with pytest.raises(ValueError, match="Unsupported operation"):
+        CalculationFactory.create_operation("modulo")
+
+def test_perform_calculation_with_cache():
+    cache = ResultCache()
+    assert perform_calculation(Decimal("6"), Decimal("3"), "divide", cache=cache) == Decimal("2")
+    assert perform_calculation(Decimal("6"), Decimal("3"), "DIVIDE", cache=cache) == Decimal("2")
+    assert (cache.hits, cache.misses) == (1, 1)
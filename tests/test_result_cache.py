@@ -0,0 +1,66 @@
+from decimal import Decimal, localcontext
+from unittest.mock import Mock
+
+import pytest
+
+from app.result_cache import ResultCache
+
+
+def test_hits_and_misses():
+    cache = ResultCache(max_size=4)
+    execute = Mock(side_effect=lambda a, b: a + b)
+    assert cache.execute("add", execute, Decimal("1"), Decimal("2")) == Decimal("3")
+    # Operands are compared by value
+    assert cache.execute("add", execute, Decimal("1.0"), Decimal("2")) == Decimal("3")
+    assert execute.call_count == 1
+    assert cache.stats() == {'size': 1, 'hits': 1, 'misses': 1, 'evictions': 0, 'expirations': 0}
+
+
+def test_precision_is_part_of_the_key():
+    cache = ResultCache()
+    divide = lambda a, b: a / b
+    with localcontext(prec=5):
+        assert str(cache.execute("divide", divide, Decimal(1), Decimal(3))) == "0.33333"
+    with localcontext(prec=3):
+        assert str(cache.execute("divide", divide, Decimal(1), Decimal(3))) == "0.333"
+    assert cache.misses == 2
+
+
+def test_lru_eviction():
+    cache = ResultCache(max_size=2)
+    add = cache.wrap("add", lambda a, b: a + b)
+    add(1, 1)
+    add(2, 2)
+    add(1, 1)  # refreshes (1, 1)
+    add(3, 3)  # evicts (2, 2)
+    assert cache.evictions == 1
+    add(1, 1)
+    add(2, 2)
+    assert (cache.hits, cache.misses) == (2, 4)
+
+
+def test_ttl_expiry():
+    now = [0.0]
+    cache = ResultCache(ttl=10, clock=lambda: now[0])
+    add = cache.wrap("add", lambda a, b: a + b)
+    add(1, 1)
+    now[0] = 5
+    add(1, 1)
+    now[0] = 11
+    add(1, 1)
+    assert (cache.hits, cache.misses, cache.expirations) == (1, 2, 1)
+
+
+def test_errors_are_not_cached():
+    cache = ResultCache()
+    execute = Mock(side_effect=ZeroDivisionError)
+    for _ in range(2):
+        with pytest.raises(ZeroDivisionError):
+            cache.execute("divide", execute, 1, 0)
+    assert execute.call_count == 2
+    assert len(cache) == 0
+
+
+def test_invalid_size():
+    with pytest.raises(ValueError, match="max_size must be positive"):
+        ResultCache(max_size=0)